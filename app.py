@@ -1,32 +1,236 @@
-from flask import Flask, request, jsonify
-from functools import wraps
+from flask import Flask, Response, g, request, jsonify, make_response, stream_with_context
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial, wraps
+import atexit
+import json
+import math
+import threading
+import time
 import traceback
 
+import numpy as np
+
 from config import Config
 from utils.audio_processor import AudioProcessor
 from feature_extraction import FeatureExtractor
 from utils.explanation_generator import ExplanationGenerator
 from model import VoiceDetectionModel
+from cascade import CASCADE_DECISIONS, DuplicateLookup, ScreeningModel
+from utils.batch_scheduler import BatchScheduler
+from utils.result_cache import cache_key, config_fingerprint, create_result_cache, file_version
+from utils.pcm_store import PcmStore, content_key
+from utils.embedding_store import EmbeddingStore
+from utils.metrics import (
+    MODEL_LOAD_SECONDS, QUEUE_DEPTH, REGISTRY, REJECTED_REQUESTS, REQUESTS_IN_FLIGHT, StageTimer, outcome_for_status
+)
+from utils.overload import Deadline, DeadlineExceeded, DegradationPolicy, request_timeout
+from utils.runtime import configure_worker
+from utils.startup import StartupTracker
+from utils.streaming import StreamSession
+from utils.vad import trim_silence
 
 app = Flask(__name__)
 config = Config()
 
+# Content types accepted by /api/voice-detection besides base64 JSON
+UPLOAD_MIMETYPES = ('audio/mpeg', 'audio/mp3', 'multipart/form-data')
+
+startup = StartupTracker()
+
+# Thread counts, affinity and the forward-pass guard; under gunicorn each
+# worker applies them after forking instead.
+if not config.DEFER_RUNTIME_SETUP:
+    configure_worker(config)
+
 # Initialize components
-audio_processor = AudioProcessor(target_sr=config.SAMPLE_RATE)
-feature_extractor = FeatureExtractor(
-    model_name=config.WAVLM_MODEL, 
-    device=config.DEVICE,
-    enable_wavlm=False
-)
-explanation_generator = ExplanationGenerator()
-try:
-    detection_model = VoiceDetectionModel(
-        model_path=config.MODEL_PATH,
-        device=config.DEVICE
+with startup.phase("components"):
+    audio_processor = AudioProcessor(target_sr=config.SAMPLE_RATE, decoder=config.AUDIO_DECODER)
+    feature_extractor = FeatureExtractor(
+        model_name=config.WAVLM_MODEL, 
+        device=config.DEVICE,
+        enable_wavlm=config.EMBEDDINGS_ENABLED
     )
+    explanation_generator = ExplanationGenerator()
+
+# Handcrafted features run on their own threads, overlapping model inference.
+feature_pool = None
+if config.PIPELINE_FEATURES:
+    feature_pool = ThreadPoolExecutor(max_workers=config.FEATURE_WORKERS, thread_name_prefix="features")
+
+# Batch requests decode their clips in parallel.
+decode_pool = ThreadPoolExecutor(max_workers=config.DECODE_WORKERS, thread_name_prefix="decode")
+
+model_load_started = time.perf_counter()
+try:
+    with startup.phase("model_load"):
+        detection_model = VoiceDetectionModel(
+            model_path=config.MODEL_PATH,
+            device=config.DEVICE,
+            backend=config.INFERENCE_BACKEND,
+            onnx_path=config.ONNX_MODEL_PATH,
+            quantized_path=config.QUANTIZED_MODEL_PATH,
+            onnx_threads=config.ONNX_INTRA_OP_THREADS,
+            model_dir=config.LOCAL_MODEL_DIR
+        )
 except Exception as e:
     detection_model = None
     print(f"Failed to initialize detection model: {str(e)}")
+MODEL_LOAD_SECONDS.set(time.perf_counter() - model_load_started)
+
+# Concurrent requests are micro-batched into one forward pass when enabled.
+inference_model = detection_model
+if detection_model is not None and config.BATCHING_ENABLED:
+    inference_model = BatchScheduler(
+        detection_model,
+        max_batch_size=config.BATCH_MAX_SIZE,
+        max_wait_ms=config.BATCH_MAX_WAIT_MS
+    )
+    QUEUE_DEPTH.set_function(lambda: inference_model.queue_depth)
+
+# Live streams always score through a scheduler, so windows from concurrent
+# streams share forward passes (with request batching on, the same queue).
+stream_scheduler = None
+if detection_model is not None and config.STREAMING_ENABLED:
+    if isinstance(inference_model, BatchScheduler):
+        stream_scheduler = inference_model
+    else:
+        stream_scheduler = BatchScheduler(
+            detection_model,
+            max_batch_size=config.BATCH_MAX_SIZE,
+            max_wait_ms=config.BATCH_MAX_WAIT_MS
+        )
+
+# A chunked HTTP stream holds one gunicorn thread for the whole call, so the
+# sync server keeps STREAM_RESERVED_THREADS free for detection and health
+# checks (the ASGI server has its own limit, as streams hold no thread there).
+http_stream_limit = min(config.STREAM_MAX_SESSIONS, max(0, config.WEB_THREADS - config.STREAM_RESERVED_THREADS))
+stream_slots = threading.BoundedSemaphore(http_stream_limit) if http_stream_limit > 0 else None
+
+# Easy clips are decided from handcrafted features before the large model.
+screening_model = None
+if config.CASCADE_ENABLED:
+    try:
+        screening_model = ScreeningModel(
+            config.SCREENING_MODEL_PATH,
+            low_threshold=config.CASCADE_LOW_THRESHOLD,
+            high_threshold=config.CASCADE_HIGH_THRESHOLD
+        )
+    except Exception as e:
+        print(f"Failed to load screening model, cascade disabled: {str(e)}")
+
+# Replays of already scored clips are matched by embedding and reuse the verdict.
+# Every worker process keeps its own in-memory index and saves it to its own shard.
+duplicate_lookup = None
+if config.DUPLICATE_LOOKUP_ENABLED:
+    if config.EMBEDDINGS_ENABLED:
+        duplicate_lookup = DuplicateLookup(
+            lambda: feature_extractor.embedding_dim,
+            config.DUPLICATE_INDEX_PATH,
+            threshold=config.DUPLICATE_SIMILARITY_THRESHOLD,
+            nlist=config.DUPLICATE_INDEX_NLIST,
+            pq_m=config.DUPLICATE_INDEX_PQ_M,
+            nprobe=config.DUPLICATE_INDEX_NPROBE,
+            save_every=config.DUPLICATE_INDEX_SAVE_EVERY,
+            worker_getter=lambda: config.WORKER_INDEX
+        )
+        # Clips learned since the last periodic save would otherwise be lost on shutdown
+        atexit.register(duplicate_lookup.flush)
+    else:
+        print("Duplicate lookup needs EMBEDDINGS_ENABLED=true, tier disabled")
+
+
+result_cache = None
+result_fingerprint = ""
+if config.RESULT_CACHE_ENABLED:
+    result_cache = create_result_cache(
+        config.RESULT_CACHE_PATH,
+        max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+        max_bytes=int(config.RESULT_CACHE_MAX_MB * 1024 * 1024),
+        ttl_seconds=config.RESULT_CACHE_TTL
+    )
+    # Everything that changes a verdict or its explanation; part of every cache key
+    result_fingerprint = config_fingerprint({
+        "model": detection_model.version if detection_model is not None else None,
+        "backend": config.INFERENCE_BACKEND,
+        "artifact": {
+            "onnx": file_version(config.ONNX_MODEL_PATH),
+            "quantized": file_version(config.QUANTIZED_MODEL_PATH),
+        }.get(config.INFERENCE_BACKEND),
+        "vad": [config.VAD_FRAME_MS, config.VAD_THRESHOLD_DB, config.VAD_RANGE_DB, config.VAD_PADDING_MS]
+        if config.VAD_ENABLED else None,
+        "windows": [config.WINDOWED_MIN_SECONDS, config.WINDOW_SECONDS, config.WINDOW_OVERLAP_SECONDS,
+                    config.WINDOW_AGGREGATE] if config.WINDOWED_INFERENCE else None,
+        "screening": [file_version(config.SCREENING_MODEL_PATH), screening_model.low_threshold,
+                      screening_model.high_threshold] if screening_model is not None else None,
+        "duplicate": config.DUPLICATE_SIMILARITY_THRESHOLD if duplicate_lookup is not None else None,
+        "features": config.FEATURE_MAX_SECONDS,
+        "sample_rate": config.SAMPLE_RATE,
+    })
+
+pcm_store = None
+if config.PCM_STORE_PATH:
+    pcm_store = PcmStore(
+        config.PCM_STORE_PATH,
+        max_bytes=int(config.PCM_STORE_MAX_MB * 1024 * 1024),
+        segment_bytes=int(config.PCM_STORE_SEGMENT_MB * 1024 * 1024),
+        dtype=config.PCM_STORE_DTYPE,
+        sample_rate=config.SAMPLE_RATE
+    )
+
+# Under load, requests skip handcrafted features or score a truncated clip.
+degradation_policy = DegradationPolicy(
+    generic_explanation_at=config.DEGRADE_EXPLANATION_AT,
+    truncate_at=config.DEGRADE_TRUNCATE_AT,
+    truncate_seconds=config.DEGRADE_TRUNCATE_SECONDS
+)
+
+# Opened on first use: the row width comes from the lazily loaded WavLM backbone.
+embedding_store = None
+embedding_store_lock = threading.Lock()
+
+
+def _embedding_store():
+    global embedding_store
+    if not config.EMBEDDING_STORE_PATH:
+        return None
+
+    with embedding_store_lock:
+        if embedding_store is None:
+            embedding_store = EmbeddingStore(
+                config.EMBEDDING_STORE_PATH,
+                dim=feature_extractor.embedding_dim,
+                dtype=config.EMBEDDING_DTYPE,
+                model_name=config.WAVLM_MODEL
+            )
+    return embedding_store
+
+
+def warm_up():
+    """Run a synthetic clip through every stage, then report ready.
+
+    Called at import, or after fork in each gunicorn worker when the model is
+    preloaded (OpenMP thread pools must not be started before forking).
+    """
+    if detection_model is None:
+        return
+
+    if config.WARMUP_ENABLED:
+        with startup.phase("warmup"):
+            detection_model.warmup()
+            clip = audio_processor.preprocess_audio(
+                (0.01 * np.random.default_rng(0).standard_normal(config.SAMPLE_RATE)).astype(np.float32),
+                config.SAMPLE_RATE
+            )
+            features = feature_extractor.extract_handcrafted_features(clip, config.SAMPLE_RATE)
+            if screening_model is not None:
+                screening_model.decide(features)
+
+    startup.mark_ready()
+    print(f"Startup phases (s): {startup.phases}")
+
+
+if not config.DEFER_WARMUP:
+    warm_up()
 
 
 # API Key Authentication Decorator
@@ -45,15 +249,470 @@ def require_api_key(f):
     return decorated_function
 
 
+def instrumented(endpoint):
+    """Time a detection endpoint and publish its stage timings.
+
+    The wrapped view records stages on ``g.timer`` and sets ``g.language`` once
+    the language is validated, and ``g.cache_hit`` on cache hits.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            g.timer = StageTimer()
+            g.language = None
+            g.cache_hit = False
+
+            REQUESTS_IN_FLIGHT.inc()
+            try:
+                response = make_response(f(*args, **kwargs))
+            finally:
+                REQUESTS_IN_FLIGHT.dec()
+
+            outcome = outcome_for_status(response.status_code, g.cache_hit)
+            g.timer.record(endpoint, g.language or "unknown", outcome)
+
+            if config.SERVER_TIMING_HEADER or request.headers.get('x-server-timing') == '1':
+                response.headers['Server-Timing'] = g.timer.server_timing()
+            return response
+        return decorated_function
+    return decorator
+
+
+def _success_response(language, classification, confidence, explanation, segments=None, speech_ratio=None,
+                      decision_tier=None, duplicate_of=None, degraded=None, scored_seconds=None):
+    response = {
+        "status": "success",
+        "language": language,
+        "classification": classification,
+        "confidenceScore": round(float(confidence), 2)
+    }
+    if explanation is not None:
+        response["explanation"] = explanation
+    if segments is not None:
+        response["segments"] = segments
+    if speech_ratio is not None:
+        response["speechRatio"] = round(float(speech_ratio), 3)
+    if decision_tier is not None:
+        response["decisionTier"] = decision_tier
+    if duplicate_of is not None:
+        response["duplicateOf"] = {
+            "key": duplicate_of["key"],
+            "similarity": round(float(duplicate_of["similarity"]), 4)
+        }
+    if degraded:
+        response["degraded"] = degraded
+    if scored_seconds is not None:
+        response["scoredSeconds"] = round(float(scored_seconds), 2)
+    return response
+
+
+def _parse_detection_item(data) -> tuple:
+    """Validate one detection payload and decode its base64 audio.
+
+    Returns:
+        Tuple of (language, audio_bytes, include_explanation)
+
+    Raises:
+        ValueError: with a client-facing message if the payload is invalid
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Invalid API key or malformed request")
+
+    # Validate required fields
+    required_fields = ['language', 'audioFormat', 'audioBase64']
+    missing_fields = [field for field in required_fields if field not in data]
+
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+
+    language = data['language']
+    audio_format = data['audioFormat']
+    include_explanation = data.get('includeExplanation', True)
+
+    # Validate language
+    if language not in config.SUPPORTED_LANGUAGES:
+        raise ValueError(f"Unsupported language. Must be one of: {', '.join(config.SUPPORTED_LANGUAGES)}")
+
+    # Validate audio format
+    if not isinstance(audio_format, str) or audio_format.lower() != 'mp3':
+        raise ValueError("Only MP3 format is supported")
+
+    if not isinstance(include_explanation, bool):
+        raise ValueError("includeExplanation must be a boolean")
+
+    # Decode base64 audio
+    audio_bytes = audio_processor.decode_base64_audio(data['audioBase64'])
+
+    return language, audio_bytes, include_explanation
+
+
+def _parse_upload_request() -> tuple:
+    """Validate a raw audio/mpeg body or multipart upload.
+
+    The body is read once into a single buffer (no JSON string, no base64
+    copy). Language and includeExplanation come from the x-language header,
+    the query string or, for multipart, the form fields.
+
+    Returns:
+        Tuple of (language, audio_bytes, include_explanation)
+
+    Raises:
+        ValueError: with a client-facing message if the upload is invalid
+    """
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('audio')
+        if upload is None:
+            raise ValueError("Missing required fields: audio")
+        audio_bytes = upload.read()
+        fields = request.form
+    else:
+        audio_bytes = request.get_data(cache=False)
+        fields = {}
+
+    language = request.headers.get('x-language') or request.args.get('language') or fields.get('language')
+    include_explanation = (request.args.get('includeExplanation') or fields.get('includeExplanation') or 'true').lower()
+
+    if not language:
+        raise ValueError("Missing required fields: language")
+
+    # Validate language
+    if language not in config.SUPPORTED_LANGUAGES:
+        raise ValueError(f"Unsupported language. Must be one of: {', '.join(config.SUPPORTED_LANGUAGES)}")
+
+    if include_explanation not in ('true', 'false'):
+        raise ValueError("includeExplanation must be a boolean")
+
+    if not audio_bytes:
+        raise ValueError("Request body must contain MP3 audio")
+
+    return language, audio_bytes, include_explanation == 'true'
+
+
+def _cached_result(key, include_explanation):
+    """Return a cached result usable for this request, or None."""
+    if key is None:
+        return None
+
+    cached = result_cache.get(key)
+    if cached is not None and (cached["explanation"] is not None or not include_explanation):
+        return cached
+    return None
+
+
+def _decode_audio(audio_bytes: bytes) -> tuple:
+    """Decode MP3 bytes, reading from and filling the PCM store when enabled."""
+    if pcm_store is None:
+        return audio_processor.load_audio_from_bytes(audio_bytes)
+
+    key = content_key(audio_bytes)
+    audio_data = pcm_store.get(key)
+    if audio_data is not None:
+        return audio_data, pcm_store.sample_rate
+
+    audio_data, sr = audio_processor.load_audio_from_bytes(audio_bytes)
+    try:
+        pcm_store.put(key, audio_data)
+    except Exception as e:
+        print(f"Failed to store decoded audio: {str(e)}")
+    return audio_data, sr
+
+
+def _load_clip(audio_bytes: bytes, timer: StageTimer) -> tuple:
+    """Decode, validate and preprocess one MP3 clip; raises ValueError on bad audio.
+
+    Returns:
+        Tuple of (audio_data, sr, speech_ratio); with VAD_ENABLED only the
+        speech regions are kept, otherwise speech_ratio is None
+    """
+    # Load audio from bytes
+    try:
+        with timer.stage("decode"):
+            audio_data, sr = _decode_audio(audio_bytes)
+    except Exception as e:
+        raise ValueError(f"Failed to load audio: {str(e)}")
+
+    # Validate audio duration
+    audio_processor.validate_audio_duration(
+        audio_data, sr,
+        min_duration=config.MIN_AUDIO_LENGTH,
+        max_duration=config.MAX_AUDIO_LENGTH
+    )
+
+    # Preprocess audio
+    audio_data = audio_processor.preprocess_audio(audio_data, sr)
+
+    speech_ratio = None
+    if config.VAD_ENABLED:
+        with timer.stage("vad"):
+            audio_data, speech_ratio = trim_silence(
+                audio_data, sr,
+                min_speech_seconds=config.MIN_AUDIO_LENGTH,
+                frame_ms=config.VAD_FRAME_MS,
+                threshold_db=config.VAD_THRESHOLD_DB,
+                range_db=config.VAD_RANGE_DB,
+                padding_ms=config.VAD_PADDING_MS
+            )
+
+    return audio_data, sr, speech_ratio
+
+
+def _extract_features(audio_data, sr, timer: StageTimer) -> dict:
+    with timer.stage("features"):
+        return feature_extractor.extract_handcrafted_features(audio_data, sr, max_seconds=config.FEATURE_MAX_SECONDS)
+
+
+def _submit_features(audio_data, sr, timer: StageTimer) -> Future:
+    """Start handcrafted feature extraction (no audio modification)."""
+    if feature_pool is not None:
+        return feature_pool.submit(_extract_features, audio_data, sr, timer)
+
+    future = Future()
+    future.set_result(_extract_features(audio_data, sr, timer))
+    return future
+
+
+def _finish_result(classification, confidence, features_future, key, timer: StageTimer, segments=None,
+                   speech_ratio=None, decision_tier=None, duplicate_of=None, degraded=None,
+                   scored_seconds=None) -> dict:
+    """Build the explanation once features are ready and cache the result.
+
+    Degraded results are not cached, so the full answer is computed once the
+    load drops.
+    """
+    explanation = None
+    if degraded and "generic_explanation" in degraded:
+        explanation = explanation_generator.generic_explanation(classification, confidence)
+    elif features_future is not None:
+        handcrafted_features = features_future.result()
+
+        with timer.stage("explanation"):
+            # Generate explanation
+            explanation = explanation_generator.generate_explanation(
+                classification, confidence, handcrafted_features
+            )
+
+            # Defensive cleanup for duplicated tokens
+            while "detected detected" in explanation:
+                explanation = explanation.replace("detected detected", "detected")
+            while "confirmed confirmed" in explanation:
+                explanation = explanation.replace("confirmed confirmed", "confirmed")
+
+    result = {
+        "classification": classification,
+        "confidence": float(confidence),
+        "explanation": explanation
+    }
+    if segments is not None:
+        result["segments"] = segments
+    if speech_ratio is not None:
+        result["speech_ratio"] = speech_ratio
+    if decision_tier is not None:
+        result["decision_tier"] = decision_tier
+        CASCADE_DECISIONS.inc(tier=decision_tier)
+    if duplicate_of is not None:
+        result["duplicate_of"] = {"key": duplicate_of["key"], "similarity": duplicate_of["similarity"]}
+    if degraded:
+        result["degraded"] = degraded
+        if scored_seconds is not None:
+            result["scored_seconds"] = scored_seconds
+    elif key is not None:
+        result_cache.set(key, result)
+    return result
+
+
+def _needs_features(include_explanation: bool) -> bool:
+    """Features are extracted for the explanation and for the screening tier."""
+    return include_explanation or screening_model is not None
+
+
+def _screen(features_future, timer: StageTimer):
+    """First cascade tier: (classification, confidence) for easy clips, None to escalate."""
+    if screening_model is None or features_future is None:
+        return None
+
+    features = features_future.result()
+    with timer.stage("screening"):
+        return screening_model.decide(features)
+
+
+def _lookup_duplicates(audio_batch: list, keys: list, sr: int, timer: StageTimer) -> list:
+    """Second cascade tier: embed the clips and look each one up among already scored clips.
+
+    Returns:
+        One (match, embedding) per clip; match is the verdict of a stored clip
+        at or above DUPLICATE_SIMILARITY_THRESHOLD (with its key and
+        similarity) or None, and both are None when the tier is disabled
+    """
+    if duplicate_lookup is None:
+        return [(None, None)] * len(audio_batch)
+
+    # Embeddings already in the store are not run through the backbone again
+    store = _embedding_store()
+    embeddings = [store.get(key) if store is not None else None for key in keys]
+    missing = [index for index, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        with timer.stage("embedding"):
+            vectors = feature_extractor.extract_wavlm_embeddings(
+                [audio_batch[index] for index in missing], sr, batch_size=config.EMBEDDING_BATCH_SIZE
+            )
+        for index, vector in zip(missing, vectors):
+            embeddings[index] = vector
+            if store is not None:
+                store.put(keys[index], vector)
+
+    with timer.stage("duplicate_lookup"):
+        return [(duplicate_lookup.match(embedding), embedding) for embedding in embeddings]
+
+
+def _remember(key, embedding, classification, confidence):
+    """Add a classifier verdict to the duplicate index (no-op when the tier is disabled)."""
+    if embedding is not None:
+        duplicate_lookup.remember(key, embedding, classification, confidence)
+
+
+def _escalated_tier():
+    """decisionTier for clips scored by the wav2vec2 classifier (None without a cascade)."""
+    return "model" if screening_model is not None or duplicate_lookup is not None else None
+
+
+def _use_windows(audio_data, sr) -> bool:
+    return config.WINDOWED_INFERENCE and len(audio_data) / sr > config.WINDOWED_MIN_SECONDS
+
+
+def _predict_windowed(audio_data, sr, language, deadline: Deadline | None = None) -> tuple:
+    """Score a long clip in overlapping windows; returns (classification, confidence, segments)."""
+    return detection_model.predict_windowed(
+        audio_data, sr, language,
+        window_seconds=config.WINDOW_SECONDS,
+        overlap_seconds=config.WINDOW_OVERLAP_SECONDS,
+        aggregate=config.WINDOW_AGGREGATE,
+        batch_size=config.WINDOW_BATCH_SIZE,
+        deadline=deadline
+    )
+
+
+def _predict_clip(audio_data, sr, language, deadline: Deadline) -> tuple:
+    """Score one clip, giving up at the deadline; returns (classification, confidence, segments)."""
+    if _use_windows(audio_data, sr):
+        return _predict_windowed(audio_data, sr, language, deadline)
+    if isinstance(inference_model, BatchScheduler):
+        # A cancelled clip still in the queue is dropped from its batch
+        classification, confidence = deadline.wait(inference_model.submit(audio_data, sr, language), "inference")
+    else:
+        classification, confidence = inference_model.predict(audio_data, sr, language)
+    return classification, confidence, None
+
+
+def _degrade(audio_data, sr, include_explanation) -> tuple:
+    """Apply the degradation modes the current load calls for and that change this request.
+
+    Returns:
+        Tuple of (audio_data, degraded, scored_seconds): the clip to score
+        (a central view when truncated), the applied modes, and the scored
+        length when truncated, else None
+    """
+    degraded, scored_seconds = [], None
+    for mode in degradation_policy.modes():
+        # With the cascade on, features feed the screening tier, which is cheaper than escalating
+        if mode == "generic_explanation" and include_explanation and screening_model is None:
+            degraded.append(mode)
+        elif mode == "truncated_audio" and len(audio_data) > degradation_policy.truncate_seconds * sr:
+            audio_data = degradation_policy.truncate(audio_data, sr)
+            scored_seconds = len(audio_data) / sr
+            degraded.append(mode)
+    degradation_policy.record(degraded)
+    return audio_data, degraded, scored_seconds
+
+
+def _plan_features(include_explanation: bool, degraded: list, deadline: Deadline) -> str | None:
+    """When handcrafted features run: "now" (alongside inference), "later" (after it) or None.
+
+    With little time left they only start once inference has succeeded, so a
+    request that expires at inference leaves no feature work behind.
+    """
+    if not _needs_features(include_explanation) or "generic_explanation" in degraded:
+        return None
+    # The screening tier needs them before anything else
+    if screening_model is None and deadline.nearly_spent(config.DEADLINE_FEATURES_RESERVE_SECONDS):
+        return "later"
+    return "now"
+
+
+def _retry_after_headers() -> dict:
+    return {"Retry-After": str(max(1, math.ceil(config.ASYNC_RETRY_AFTER)))}
+
+
+def _deadline_response():
+    REJECTED_REQUESTS.inc(reason="deadline")
+    return jsonify({
+        "status": "error",
+        "message": "Request deadline exceeded"
+    }), 503, _retry_after_headers()
+
+
+def _predict_many(audio_batch: list, sr: int, languages: list) -> list:
+    """Score several clips in real batches, through the scheduler when enabled."""
+    if isinstance(inference_model, BatchScheduler):
+        futures = [
+            inference_model.submit(audio_data, sr, language)
+            for audio_data, language in zip(audio_batch, languages)
+        ]
+        return [future.result() for future in futures]
+
+    results = []
+    for start in range(0, len(audio_batch), config.BATCH_MAX_SIZE):
+        end = start + config.BATCH_MAX_SIZE
+        results.extend(detection_model.predict_batch(audio_batch[start:end], sr, languages[start:end]))
+    return results
+
+
+def _explanation_features(item: dict):
+    return item["features"] if item["include_explanation"] else None
+
+
+def _prepare_batch_item(data, timer: StageTimer) -> dict:
+    """Parse, cache-check and decode one batch item (runs on the decode pool)."""
+    try:
+        with timer.stage("parse"):
+            language, audio_bytes, include_explanation = _parse_detection_item(data)
+
+        key = cache_key(audio_bytes, language, result_fingerprint) if result_cache is not None else None
+        prepared = {
+            "language": language,
+            "include_explanation": include_explanation,
+            "key": key,
+            "content_key": content_key(audio_bytes) if duplicate_lookup is not None else None,
+            "result": _cached_result(key, include_explanation)
+        }
+        if prepared["result"] is None:
+            prepared["audio"], prepared["sr"], prepared["speech_ratio"] = _load_clip(audio_bytes, timer)
+        return prepared
+    except ValueError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        print(f"Error preparing batch item: {str(e)}")
+        print(traceback.format_exc())
+        return {"error": "Internal server error occurred during processing"}
+
+
 @app.route('/api/voice-detection', methods=['POST'])
 @require_api_key
+@instrumented('detect')
 def detect_voice():
     """Main endpoint for voice detection"""
+    timer = g.timer
+    # Checked between stages: once it passes, the remaining stages are skipped
+    deadline = Deadline(
+        request_timeout(request.headers.get('x-request-timeout-ms'), config.REQUEST_DEADLINE_SECONDS)
+    )
+    features_future = None
     try:
-        # Parse request
-        data = request.get_json(silent=True)
+        # Parse request: raw MP3 body, multipart upload or base64 JSON
+        is_upload = request.mimetype in UPLOAD_MIMETYPES
+        with timer.stage("parse"):
+            data = None if is_upload else request.get_json(silent=True)
 
-        if data is None:
+        if data is None and not is_upload:
             return jsonify({
                 "status": "error",
                 "message": "Invalid API key or malformed request"
@@ -64,122 +723,422 @@ def detect_voice():
                 "status": "error",
                 "message": "Server misconfigured: model weights not loaded"
             }), 503
-        
-        # Validate required fields
-        required_fields = ['language', 'audioFormat', 'audioBase64']
-        missing_fields = [field for field in required_fields if field not in data]
-        
-        if missing_fields:
+
+        try:
+            with timer.stage("parse"):
+                if is_upload:
+                    language, audio_bytes, include_explanation = _parse_upload_request()
+                else:
+                    language, audio_bytes, include_explanation = _parse_detection_item(data)
+        except ValueError as e:
             return jsonify({
                 "status": "error",
-                "message": f"Missing required fields: {', '.join(missing_fields)}"
+                "message": str(e)
             }), 400
-        
-        language = data['language']
-        audio_format = data['audioFormat']
-        audio_base64 = data['audioBase64']
-        
-        # Validate language
-        if language not in config.SUPPORTED_LANGUAGES:
+
+        g.language = language
+
+        # Serve repeated submissions from the result cache
+        key = cache_key(audio_bytes, language, result_fingerprint) if result_cache is not None else None
+        cached = _cached_result(key, include_explanation)
+        if cached is not None:
+            g.cache_hit = True
+            return jsonify(_success_response(language, **cached)), 200
+
+        deadline.check("decode")
+        try:
+            audio_data, sr, speech_ratio = _load_clip(audio_bytes, timer)
+        except ValueError as e:
             return jsonify({
                 "status": "error",
-                "message": f"Unsupported language. Must be one of: {', '.join(config.SUPPORTED_LANGUAGES)}"
+                "message": str(e)
             }), 400
+
+        # Under load: generic explanation without features, or a truncated clip
+        audio_data, degraded, scored_seconds = _degrade(audio_data, sr, include_explanation)
+
+        # Handcrafted features run concurrently with inference, unless time is short
+        features_plan = _plan_features(include_explanation, degraded, deadline)
+        if features_plan == "now":
+            features_future = _submit_features(audio_data, sr, timer)
+
+        # Easy clips are decided by the screening tier, replays by the duplicate index
+        segments = None
+        duplicate = None
+        if screening_model is not None and features_future is not None:
+            deadline.wait(features_future, "screening")
+        decision = _screen(features_future, timer)
+        if decision is not None:
+            (classification, confidence), decision_tier = decision, "screening"
+        else:
+            clip_key = content_key(audio_bytes) if duplicate_lookup is not None else None
+            if duplicate_lookup is not None:
+                deadline.check("embedding")
+            duplicate, embedding = _lookup_duplicates([audio_data], [clip_key], sr, timer)[0]
+            if duplicate is not None:
+                classification, confidence = duplicate["classification"], duplicate["confidence"]
+                decision_tier = "duplicate"
+            else:
+                # Predict (long clips are scored in overlapping windows)
+                deadline.check("inference")
+                with timer.stage("inference"):
+                    classification, confidence, segments = _predict_clip(audio_data, sr, language, deadline)
+                decision_tier = _escalated_tier()
+                # Like the result cache, the index only learns verdicts of the full pipeline
+                if not degraded:
+                    _remember(clip_key, embedding, classification, confidence)
+
+        if features_plan == "later":
+            deadline.check("features")
+            features_future = _submit_features(audio_data, sr, timer)
+        if include_explanation and features_future is not None:
+            deadline.wait(features_future, "explanation")
+        result = _finish_result(
+            classification, confidence, features_future if include_explanation else None, key, timer,
+            segments, speech_ratio, decision_tier, duplicate, degraded, scored_seconds
+        )
+
+        # Return response
+        return jsonify(_success_response(language, **result)), 200
+
+    except DeadlineExceeded:
+        # Feature work still queued for this request is dropped (running work finishes)
+        if features_future is not None:
+            features_future.cancel()
+        return _deadline_response()
+
+    except Exception as e:
+        # Log error for debugging
+        print(f"Error in voice detection: {str(e)}")
+        print(traceback.format_exc())
         
-        # Validate audio format
-        if audio_format.lower() != 'mp3':
+        return jsonify({
+            "status": "error",
+            "message": "Internal server error occurred during processing"
+        }), 500
+
+
+@app.route('/api/voice-detection/batch', methods=['POST'])
+@require_api_key
+@instrumented('batch')
+def detect_voice_batch():
+    """Score many clips in one request, with per-item results and errors"""
+    timer = g.timer
+    try:
+        max_bytes = int(config.BATCH_REQUEST_MAX_MB * 1024 * 1024)
+        if request.content_length is None or request.content_length > max_bytes:
             return jsonify({
                 "status": "error",
-                "message": "Only MP3 format is supported"
-            }), 400
-        
-        # Decode base64 audio
-        try:
-            audio_bytes = audio_processor.decode_base64_audio(audio_base64)
-        except ValueError as e:
+                "message": f"Batch payload must declare a Content-Length of at most {max_bytes} bytes"
+            }), 413
+
+        data = request.get_json(silent=True)
+        items = data.get('items') if isinstance(data, dict) else None
+
+        if not isinstance(items, list) or not items:
             return jsonify({
                 "status": "error",
-                "message": str(e)
+                "message": "Request must contain a non-empty 'items' list"
             }), 400
-        
-        # Load audio from bytes
-        try:
-            audio_data, sr = audio_processor.load_audio_from_bytes(audio_bytes)
-        except Exception as e:
+
+        if len(items) > config.BATCH_REQUEST_MAX_ITEMS:
             return jsonify({
                 "status": "error",
-                "message": f"Failed to load audio: {str(e)}"
-            }), 400
+                "message": f"Too many items: {len(items)} (maximum {config.BATCH_REQUEST_MAX_ITEMS})"
+            }), 413
 
-        if language not in config.SUPPORTED_LANGUAGES:
+        if detection_model is None:
             return jsonify({
                 "status": "error",
-                "message": f"Unsupported language. Must be one of: {', '.join(config.SUPPORTED_LANGUAGES)}"
-            }), 400
-        
-        # Validate audio duration
-        try:
-            audio_processor.validate_audio_duration(
-                audio_data, sr, 
-                min_duration=config.MIN_AUDIO_LENGTH,
-                max_duration=config.MAX_AUDIO_LENGTH
+                "message": "Server misconfigured: model weights not loaded"
+            }), 503
+
+        # Decode every clip in parallel
+        prepared = list(decode_pool.map(partial(_prepare_batch_item, timer=timer), items))
+
+        pending = [item for item in prepared if "audio" in item]
+        for item in pending:
+            needs_features = _needs_features(item["include_explanation"])
+            item["features"] = _submit_features(item["audio"], item["sr"], timer) if needs_features else None
+
+        # Easy clips are decided by the screening tier
+        for item in pending:
+            decision = _screen(item["features"], timer)
+            if decision is not None:
+                item["result"] = _finish_result(
+                    *decision, _explanation_features(item), item["key"], timer,
+                    speech_ratio=item["speech_ratio"], decision_tier="screening"
+                )
+        pending = [item for item in pending if item["result"] is None]
+
+        # Replays of already scored clips take the stored verdict
+        lookups = _lookup_duplicates(
+            [item["audio"] for item in pending], [item["content_key"] for item in pending], config.SAMPLE_RATE, timer
+        )
+        for item, (duplicate, embedding) in zip(pending, lookups):
+            item["embedding"] = embedding
+            if duplicate is not None:
+                item["result"] = _finish_result(
+                    duplicate["classification"], duplicate["confidence"], _explanation_features(item), item["key"],
+                    timer, speech_ratio=item["speech_ratio"], decision_tier="duplicate", duplicate_of=duplicate
+                )
+        pending = [item for item in pending if item["result"] is None]
+
+        # Long clips are scored on their own in overlapping windows
+        for item in [item for item in pending if _use_windows(item["audio"], item["sr"])]:
+            with timer.stage("inference"):
+                classification, confidence, segments = _predict_windowed(item["audio"], item["sr"], item["language"])
+            _remember(item["content_key"], item["embedding"], classification, confidence)
+            item["result"] = _finish_result(
+                classification, confidence, _explanation_features(item), item["key"], timer,
+                segments, item["speech_ratio"], _escalated_tier()
             )
+        pending = [item for item in pending if item["result"] is None]
+
+        # Score clips in real batches (all clips share the target sample rate)
+        with timer.stage("inference"):
+            predictions = _predict_many(
+                [item["audio"] for item in pending],
+                config.SAMPLE_RATE,
+                [item["language"] for item in pending]
+            )
+        for item, (classification, confidence) in zip(pending, predictions):
+            _remember(item["content_key"], item["embedding"], classification, confidence)
+            item["result"] = _finish_result(
+                classification, confidence, _explanation_features(item), item["key"], timer,
+                speech_ratio=item["speech_ratio"], decision_tier=_escalated_tier()
+            )
+
+        results = []
+        for index, item in enumerate(prepared):
+            if "error" in item:
+                results.append({"index": index, "status": "error", "message": item["error"]})
+            else:
+                results.append({"index": index, **_success_response(item["language"], **item["result"])})
+
+        return jsonify({
+            "status": "success",
+            "results": results
+        }), 200
+
+    except Exception as e:
+        # Log error for debugging
+        print(f"Error in batch voice detection: {str(e)}")
+        print(traceback.format_exc())
+
+        return jsonify({
+            "status": "error",
+            "message": "Internal server error occurred during processing"
+        }), 500
+
+
+@app.route('/api/voice-embedding', methods=['POST'])
+@require_api_key
+@instrumented('embedding')
+def voice_embedding():
+    """Return the mean-pooled WavLM embedding of a clip"""
+    timer = g.timer
+    try:
+        if not config.EMBEDDINGS_ENABLED:
+            return jsonify({
+                "status": "error",
+                "message": "Embeddings are disabled on this server"
+            }), 404
+
+        # Same request formats as /api/voice-detection
+        try:
+            with timer.stage("parse"):
+                if request.mimetype in UPLOAD_MIMETYPES:
+                    language, audio_bytes, _ = _parse_upload_request()
+                else:
+                    data = request.get_json(silent=True)
+                    if data is None:
+                        raise ValueError("Invalid API key or malformed request")
+                    language, audio_bytes, _ = _parse_detection_item(data)
         except ValueError as e:
             return jsonify({
                 "status": "error",
                 "message": str(e)
             }), 400
-        
-        # Preprocess audio
-        audio_data = audio_processor.preprocess_audio(audio_data, sr)
 
-        # Extract handcrafted features for explanations (no audio modification)
-        handcrafted_features = feature_extractor.extract_handcrafted_features(audio_data, sr)
+        g.language = language
 
-        # Predict
-        classification, confidence = detection_model.predict(audio_data, sr, language)
-        
-        # Generate explanation
-        explanation = explanation_generator.generate_explanation(
-            classification, confidence, handcrafted_features
-        )
+        # Stored embeddings are returned without running the backbone
+        key = content_key(audio_bytes)
+        store = _embedding_store()
+        embedding = store.get(key) if store is not None else None
+        cached = embedding is not None
+        g.cache_hit = cached
 
-        # Defensive cleanup for duplicated tokens
-        while "detected detected" in explanation:
-            explanation = explanation.replace("detected detected", "detected")
-        while "confirmed confirmed" in explanation:
-            explanation = explanation.replace("confirmed confirmed", "confirmed")
-        
-        # Return response
-        response = {
+        if embedding is None:
+            try:
+                audio_data, sr, _ = _load_clip(audio_bytes, timer)
+            except ValueError as e:
+                return jsonify({
+                    "status": "error",
+                    "message": str(e)
+                }), 400
+
+            with timer.stage("embedding"):
+                embedding = feature_extractor.extract_wavlm_embeddings([audio_data], sr)[0]
+            if store is not None:
+                store.put(key, embedding)
+
+        return jsonify({
             "status": "success",
-            "language": language,
-            "classification": classification,
-            "confidenceScore": round(float(confidence), 2),
-            "explanation": explanation
-        }
-        
-        return jsonify(response), 200
-    
+            "key": key,
+            "model": config.WAVLM_MODEL,
+            "dimension": int(embedding.shape[0]),
+            "embedding": [round(float(value), 6) for value in embedding],
+            "cached": cached
+        }), 200
+
     except Exception as e:
         # Log error for debugging
-        print(f"Error in voice detection: {str(e)}")
+        print(f"Error in voice embedding: {str(e)}")
         print(traceback.format_exc())
-        
+
         return jsonify({
             "status": "error",
             "message": "Internal server error occurred during processing"
         }), 500
 
 
+def _open_stream(language, sample_format, sample_rate) -> StreamSession:
+    """Validate live stream parameters and start a session; raises ValueError."""
+    if not language:
+        raise ValueError("Missing required fields: language")
+    if language not in config.SUPPORTED_LANGUAGES:
+        raise ValueError(f"Unsupported language. Must be one of: {', '.join(config.SUPPORTED_LANGUAGES)}")
+    try:
+        sample_rate = int(sample_rate or config.SAMPLE_RATE)
+    except ValueError:
+        raise ValueError("sample_rate must be an integer")
+
+    return StreamSession(
+        (sample_format or "pcm_s16le").lower(), sample_rate, language, config.SAMPLE_RATE,
+        window_seconds=config.STREAM_WINDOW_SECONDS,
+        hop_seconds=config.STREAM_HOP_SECONDS,
+        min_seconds=config.MIN_AUDIO_LENGTH,
+        history=config.STREAM_HISTORY_WINDOWS
+    )
+
+
+def _score_stream_window(session: StreamSession, window, status: str = "partial") -> dict:
+    classification, confidence = stream_scheduler.predict(window, session.sr, session.language)
+    return session.record(classification, confidence, status)
+
+
+@app.route('/api/voice-stream', methods=['POST'])
+@require_api_key
+def voice_stream():
+    """Score a live call sent as a chunked request body, answering with NDJSON updates"""
+    if stream_scheduler is None:
+        return jsonify({
+            "status": "error",
+            "message": "Live streaming is unavailable on this server"
+        }), 503
+
+    if stream_slots is None:
+        return jsonify({
+            "status": "error",
+            "message": "HTTP live streaming is disabled on this server (WEB_THREADS too low); "
+                       "use the WebSocket with SERVE_MODE=asgi"
+        }), 503
+
+    if not stream_slots.acquire(blocking=False):
+        REJECTED_REQUESTS.inc(reason="streams_full")
+        return jsonify({
+            "status": "error",
+            "message": "Too many live streams, retry later"
+        }), 429, _retry_after_headers()
+
+    try:
+        session = _open_stream(
+            request.headers.get('x-language') or request.args.get('language'),
+            request.args.get('format'),
+            request.args.get('sample_rate')
+        )
+    except ValueError as e:
+        stream_slots.release()
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+
+    def generate():
+        try:
+            # One update per hop of new audio, then the final verdict at end of body
+            while True:
+                chunk = request.stream.read(config.STREAM_CHUNK_BYTES)
+                if not chunk:
+                    break
+                window = session.feed(chunk)
+                if window is not None:
+                    yield json.dumps(_score_stream_window(session, window)) + "\n"
+
+            window = session.finish()
+            if window is not None:
+                yield json.dumps(_score_stream_window(session, window, "final")) + "\n"
+            else:
+                yield json.dumps(session.verdict("final")) + "\n"
+        except ValueError as e:
+            yield json.dumps({"status": "error", "message": str(e)}) + "\n"
+        except Exception as e:
+            print(f"Error in voice stream: {str(e)}")
+            print(traceback.format_exc())
+            yield json.dumps({"status": "error", "message": "Internal server error occurred during processing"}) + "\n"
+        finally:
+            session.close()
+            stream_slots.release()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    response = {
         "status": "healthy",
         "service": "AI Voice Detection API",
         "supported_languages": config.SUPPORTED_LANGUAGES
-    }), 200
+    }
+    if result_cache is not None:
+        response["cache"] = result_cache.stats()
+    if pcm_store is not None:
+        response["pcm_store"] = pcm_store.stats()
+    if embedding_store is not None:
+        response["embedding_store"] = embedding_store.stats()
+    if duplicate_lookup is not None:
+        response["duplicate_index"] = duplicate_lookup.stats()
+    return jsonify(response), 200
+
+
+@app.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving HTTP"""
+    return jsonify({"status": "alive"}), 200
+
+
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: model loaded and warmed up"""
+    if detection_model is None:
+        return jsonify({
+            "status": "unavailable",
+            "message": "Server misconfigured: model weights not loaded"
+        }), 503
+
+    if not startup.ready:
+        return jsonify({"status": "starting", "startup": startup.phases}), 503
+
+    return jsonify({"status": "ready", "startup": startup.phases}), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,453 @@
+"""Asyncio serving mode for the detection API.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Serves /api/voice-detection (base64 JSON or raw audio/mpeg body) and the
+/health probes with the same components, validation and responses as the Flask
+app in app.py, which stays available through wsgi.py, plus live streams over a
+WebSocket at /api/voice-stream. Decoding and inference run on
+dedicated executors behind a bounded admission queue: when it is full the
+request is rejected at once with 429 and Retry-After instead of waiting in
+line, and every request has a deadline.
+"""
+import asyncio
+import json
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from app import (
+    _cached_result,
+    _degrade,
+    _escalated_tier,
+    _finish_result,
+    _load_clip,
+    _lookup_duplicates,
+    _open_stream,
+    _parse_detection_item,
+    _plan_features,
+    _predict_windowed,
+    _remember,
+    _retry_after_headers,
+    _screen,
+    _submit_features,
+    _success_response,
+    _use_windows,
+    cache_key,
+    config,
+    content_key,
+    detection_model,
+    duplicate_lookup,
+    inference_model,
+    pcm_store,
+    result_cache,
+    result_fingerprint,
+    screening_model,
+    startup,
+    stream_scheduler,
+)
+from utils.batch_scheduler import BatchScheduler
+from utils.metrics import REGISTRY, REJECTED_REQUESTS, REQUESTS_IN_FLIGHT, StageTimer, outcome_for_status
+from utils.overload import Deadline, DeadlineExceeded, request_timeout
+
+decode_executor = ThreadPoolExecutor(max_workers=config.DECODE_WORKERS, thread_name_prefix="asgi-decode")
+inference_executor = ThreadPoolExecutor(max_workers=config.ASYNC_INFERENCE_WORKERS, thread_name_prefix="asgi-inference")
+
+# WebSocket streams hold no thread between messages, so only STREAM_MAX_SESSIONS applies
+stream_slots = threading.BoundedSemaphore(config.STREAM_MAX_SESSIONS)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: dict | None = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class AdmissionQueue:
+    """Bounded count of admitted requests; rejects instead of queueing without limit.
+
+    Only touched from the event loop thread, so no lock is needed.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.limit:
+            return False
+        self.active += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+
+
+admission = AdmissionQueue(config.ASYNC_MAX_QUEUE)
+
+# Raw MP3 bodies; multipart uploads are only supported by the Flask app.
+RAW_AUDIO_MIMETYPES = ("audio/mpeg", "audio/mp3")
+
+
+async def _send_json(send, status: int, payload: dict, headers: dict | None = None):
+    body = json.dumps(payload).encode("utf-8")
+    raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode("latin-1"), str(value).encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_metrics(send):
+    """Prometheus metrics endpoint, as served by the Flask app."""
+    body = REGISTRY.render().encode("utf-8")
+    raw_headers = [(b"content-type", b"text/plain; version=0.0.4"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": 200, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _read_body(receive, limit: int) -> bytes:
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "Client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            raise HTTPError(413, f"Request body exceeds {limit} bytes")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _parse_raw_upload(body: bytes, headers: dict, query: dict) -> tuple:
+    """Validate a raw audio/mpeg body; language comes from x-language or the query."""
+    language = headers.get("x-language") or query.get("language", [None])[0]
+    include_explanation = query.get("includeExplanation", ["true"])[0].lower()
+
+    if not language:
+        raise ValueError("Missing required fields: language")
+    if language not in config.SUPPORTED_LANGUAGES:
+        raise ValueError(f"Unsupported language. Must be one of: {', '.join(config.SUPPORTED_LANGUAGES)}")
+    if include_explanation not in ("true", "false"):
+        raise ValueError("includeExplanation must be a boolean")
+    if not body:
+        raise ValueError("Request body must contain MP3 audio")
+
+    return language, body, include_explanation == "true"
+
+
+def _parse_json_body(body: bytes) -> tuple:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError("Invalid API key or malformed request")
+    return _parse_detection_item(data)
+
+
+async def _predict(audio_data, sr, language, deadline: Deadline) -> tuple:
+    loop = asyncio.get_running_loop()
+    if _use_windows(audio_data, sr):
+        return await loop.run_in_executor(inference_executor, _predict_windowed, audio_data, sr, language, deadline)
+
+    if isinstance(inference_model, BatchScheduler):
+        # The scheduler already owns a worker thread; just await its future.
+        classification, confidence = await asyncio.wrap_future(inference_model.submit(audio_data, sr, language))
+    else:
+        classification, confidence = await loop.run_in_executor(
+            inference_executor, inference_model.predict, audio_data, sr, language
+        )
+    return classification, confidence, None
+
+
+async def _detect(body: bytes, headers: dict, query: dict, timer: StageTimer, state: dict,
+                  deadline: Deadline) -> dict:
+    loop = asyncio.get_running_loop()
+    mimetype = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+
+    try:
+        with timer.stage("parse"):
+            if mimetype == "multipart/form-data":
+                raise HTTPError(415, "Multipart uploads are not supported in async mode; send a raw audio/mpeg body")
+            if mimetype in RAW_AUDIO_MIMETYPES:
+                language, audio_bytes, include_explanation = _parse_raw_upload(body, headers, query)
+            else:
+                language, audio_bytes, include_explanation = await loop.run_in_executor(
+                    decode_executor, _parse_json_body, body
+                )
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+
+    state["language"] = language
+
+    # Serve repeated submissions from the result cache
+    key = cache_key(audio_bytes, language, result_fingerprint) if result_cache is not None else None
+    cached = _cached_result(key, include_explanation)
+    if cached is not None:
+        state["cache_hit"] = True
+        return _success_response(language, **cached)
+
+    deadline.check("decode")
+    try:
+        audio_data, sr, speech_ratio = await loop.run_in_executor(decode_executor, _load_clip, audio_bytes, timer)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+
+    audio_data, degraded, scored_seconds = _degrade(audio_data, sr, include_explanation)
+
+    # Handcrafted features run concurrently with inference, unless time is short
+    features_plan = _plan_features(include_explanation, degraded, deadline)
+    features_future = _submit_features(audio_data, sr, timer) if features_plan == "now" else None
+    try:
+        decision = None
+        if screening_model is not None and features_future is not None:
+            await asyncio.wrap_future(features_future)
+            decision = _screen(features_future, timer)
+
+        duplicate = None
+        if decision is not None:
+            (classification, confidence), segments, decision_tier = decision, None, "screening"
+        else:
+            clip_key = content_key(audio_bytes) if duplicate_lookup is not None else None
+            if duplicate_lookup is not None:
+                deadline.check("embedding")
+                duplicate, embedding = (await loop.run_in_executor(
+                    inference_executor, _lookup_duplicates, [audio_data], [clip_key], sr, timer
+                ))[0]
+            else:
+                embedding = None
+
+            if duplicate is not None:
+                classification, confidence, segments = duplicate["classification"], duplicate["confidence"], None
+                decision_tier = "duplicate"
+            else:
+                deadline.check("inference")
+                with timer.stage("inference"):
+                    classification, confidence, segments = await _predict(audio_data, sr, language, deadline)
+                decision_tier = _escalated_tier()
+                # Like the result cache, the index only learns verdicts of the full pipeline
+                if not degraded:
+                    _remember(clip_key, embedding, classification, confidence)
+
+        if features_plan == "later":
+            deadline.check("features")
+            features_future = _submit_features(audio_data, sr, timer)
+        if features_future is not None:
+            await asyncio.wrap_future(features_future)
+
+        result = _finish_result(
+            classification, confidence, features_future if include_explanation else None, key, timer,
+            segments, speech_ratio, decision_tier, duplicate, degraded, scored_seconds
+        )
+    except (asyncio.CancelledError, DeadlineExceeded):
+        # Feature work still queued for this request is dropped (running work finishes)
+        if features_future is not None:
+            features_future.cancel()
+        raise
+
+    return _success_response(language, **result)
+
+
+def _deadline(headers: dict) -> float:
+    """Per-request deadline in seconds: client hint (x-request-timeout-ms) capped by config."""
+    return request_timeout(headers.get("x-request-timeout-ms"), config.ASYNC_REQUEST_TIMEOUT)
+
+
+async def _handle_detection(scope, receive, send, headers: dict):
+    api_key = headers.get("x-api-key")
+    if not api_key or api_key != config.API_SECRET_KEY:
+        await _send_json(send, 401, {"status": "error", "message": "Invalid API key or malformed request"})
+        return
+
+    if detection_model is None:
+        await _send_json(send, 503, {"status": "error", "message": "Server misconfigured: model weights not loaded"})
+        return
+
+    retry_after = _retry_after_headers()
+    if not admission.try_acquire():
+        REJECTED_REQUESTS.inc(reason="queue_full")
+        await _send_json(send, 429, {"status": "error", "message": "Server is busy, retry later"}, retry_after)
+        return
+
+    timer = StageTimer()
+    state = {"language": None, "cache_hit": False}
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    status, extra_headers = 200, {}
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        body = await _read_body(receive, int(config.ASYNC_MAX_BODY_MB * 1024 * 1024))
+        # The deadline is also checked between stages, so work running on
+        # executor threads stops at the next stage once it has passed
+        timeout = _deadline(headers)
+        payload = await asyncio.wait_for(
+            _detect(body, headers, query, timer, state, Deadline(timeout)), timeout=timeout or None
+        )
+    except HTTPError as e:
+        status, extra_headers = e.status, e.headers
+        payload = {"status": "error", "message": e.message}
+    except (asyncio.TimeoutError, DeadlineExceeded):
+        REJECTED_REQUESTS.inc(reason="deadline")
+        status, extra_headers = 503, retry_after
+        payload = {"status": "error", "message": "Request deadline exceeded"}
+    except Exception as e:
+        print(f"Error in voice detection: {str(e)}")
+        print(traceback.format_exc())
+        status = 500
+        payload = {"status": "error", "message": "Internal server error occurred during processing"}
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        admission.release()
+
+    timer.record("detect", state["language"] or "unknown", outcome_for_status(status, state["cache_hit"]))
+    if config.SERVER_TIMING_HEADER or headers.get("x-server-timing") == "1":
+        extra_headers = {**extra_headers, "Server-Timing": timer.server_timing()}
+    await _send_json(send, status, payload, extra_headers)
+
+
+async def _send_text(send, payload: dict):
+    await send({"type": "websocket.send", "text": json.dumps(payload)})
+
+
+async def _score_stream_window(session, window, status: str = "partial") -> dict:
+    # Awaiting the scheduler future keeps executor threads free, so windows from
+    # every open stream can meet in one batch.
+    future = stream_scheduler.submit(window, session.sr, session.language)
+    classification, confidence = await asyncio.wrap_future(future)
+    return session.record(classification, confidence, status)
+
+
+async def _handle_stream(scope, receive, send, headers: dict):
+    """Live call over a WebSocket: binary audio frames in, JSON verdict updates out.
+
+    The client sends a text "end" message to get the final verdict; the
+    server then closes the socket.
+    """
+    if (await receive())["type"] != "websocket.connect":
+        return
+
+    api_key = headers.get("x-api-key")
+    if not api_key or api_key != config.API_SECRET_KEY:
+        await send({"type": "websocket.close", "code": 1008})
+        return
+    if stream_scheduler is None:
+        await send({"type": "websocket.close", "code": 1011})
+        return
+    if not stream_slots.acquire(blocking=False):
+        REJECTED_REQUESTS.inc(reason="streams_full")
+        await send({"type": "websocket.close", "code": 1013})
+        return
+
+    loop = asyncio.get_running_loop()
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    session = None
+    await send({"type": "websocket.accept"})
+    try:
+        session = _open_stream(
+            headers.get("x-language") or query.get("language", [None])[0],
+            query.get("format", [None])[0],
+            query.get("sample_rate", [None])[0]
+        )
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes"):
+                window = await loop.run_in_executor(decode_executor, session.feed, message["bytes"])
+                if window is not None:
+                    await _send_text(send, await _score_stream_window(session, window))
+            elif (message.get("text") or "").strip().lower() == "end":
+                window = await loop.run_in_executor(decode_executor, session.finish)
+                if window is not None:
+                    await _send_text(send, await _score_stream_window(session, window, "final"))
+                else:
+                    await _send_text(send, session.verdict("final"))
+                await send({"type": "websocket.close", "code": 1000})
+                return
+    except ValueError as e:
+        await _send_text(send, {"status": "error", "message": str(e)})
+        await send({"type": "websocket.close", "code": 1007})
+    except Exception as e:
+        print(f"Error in voice stream: {str(e)}")
+        print(traceback.format_exc())
+        await _send_text(send, {"status": "error", "message": "Internal server error occurred during processing"})
+        await send({"type": "websocket.close", "code": 1011})
+    finally:
+        if session is not None:
+            await loop.run_in_executor(decode_executor, session.close)
+        stream_slots.release()
+
+
+async def _handle_health(send):
+    response = {
+        "status": "healthy",
+        "service": "AI Voice Detection API",
+        "supported_languages": config.SUPPORTED_LANGUAGES,
+        "queue": {"active": admission.active, "limit": admission.limit}
+    }
+    if result_cache is not None:
+        response["cache"] = result_cache.stats()
+    if pcm_store is not None:
+        response["pcm_store"] = pcm_store.stats()
+    if duplicate_lookup is not None:
+        response["duplicate_index"] = duplicate_lookup.stats()
+    await _send_json(send, 200, response)
+
+
+async def _handle_readiness(send):
+    if detection_model is None:
+        await _send_json(send, 503, {"status": "unavailable", "message": "Server misconfigured: model weights not loaded"})
+    elif not startup.ready:
+        await _send_json(send, 503, {"status": "starting", "startup": startup.phases})
+    else:
+        await _send_json(send, 200, {"status": "ready", "startup": startup.phases})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            decode_executor.shutdown(wait=False)
+            inference_executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] not in ("http", "websocket"):
+        return
+
+    headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+    if scope["type"] == "websocket":
+        if scope["path"] == "/api/voice-stream":
+            await _handle_stream(scope, receive, send, headers)
+        else:
+            await receive()
+            await send({"type": "websocket.close", "code": 1000})
+        return
+
+    route = (scope["method"], scope["path"])
+
+    if route == ("POST", "/api/voice-detection"):
+        await _handle_detection(scope, receive, send, headers)
+    elif route == ("GET", "/health"):
+        await _handle_health(send)
+    elif route == ("GET", "/health/live"):
+        await _send_json(send, 200, {"status": "alive"})
+    elif route == ("GET", "/health/ready"):
+        await _handle_readiness(send)
+    elif route == ("GET", "/metrics"):
+        await _send_metrics(send)
+    else:
+        await _send_json(send, 404, {"status": "error", "message": "Not found"})
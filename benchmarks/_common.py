@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_AUDIO = os.path.join(REPO_ROOT, "tests", "test_audio.mp3")
+
+
+def read_sample_bytes(path: str = SAMPLE_AUDIO) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def mp3_clip(seconds: float, path: str = SAMPLE_AUDIO) -> bytes:
+    """Build an MP3 clip of the requested length by looping a sample file."""
+    from pydub import AudioSegment
+
+    sample = AudioSegment.from_file(path, format="mp3")
+    target_ms = int(seconds * 1000)
+    clip = sample
+    while len(clip) < target_ms:
+        clip += sample
+    buffer = io.BytesIO()
+    clip[:target_ms].export(buffer, format="mp3")
+    return buffer.getvalue()
+
+
+def synthetic_audio(seconds: float, sr: int = 16000, seed: int = 0) -> np.ndarray:
+    """Voice-like test signal: a wandering harmonic tone with syllable-rate envelope and noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    audio = 0.3 * envelope * voiced + 0.01 * rng.standard_normal(t.shape)
+    return audio.astype(np.float32)
+
+
+def measure(fn, repeat: int = 5, warmup: int = 1) -> dict:
+    """Time ``fn`` and return latency statistics in milliseconds."""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "min_ms": round(samples[0], 3),
+        "max_ms": round(samples[-1], 3),
+        "runs": repeat,
+    }
+
+
+def percentile(sorted_samples: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, -(-len(sorted_samples) * q // 100))
+    return sorted_samples[int(rank) - 1]
+
+
+def run_metadata() -> dict:
+    """Where and on what code a benchmark ran, stored with its results."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(path: str, benchmark: str, params: dict, results: list, key_fields: tuple | None = None,
+                 metrics: tuple | None = None, higher_is_better: tuple = ()):
+    """Write results as JSON for comparison across commits (see benchmarks.compare).
+
+    Benchmarks whose entries are not identified by compare.KEY_FIELDS, or
+    not measured in compare.COMPARED_METRICS, name their own: ``key_fields``
+    identify an entry, ``metrics`` are compared (dotted names reach into
+    nested dicts) and ``higher_is_better`` lists those that regress when they
+    drop (besides *_rps).
+    """
+    data = {"benchmark": benchmark, "meta": run_metadata(), "params": params, "results": results}
+    if key_fields is not None or metrics is not None:
+        data["compare"] = {
+            "key_fields": list(key_fields) if key_fields is not None else None,
+            "metrics": list(metrics) if metrics is not None else None,
+            "higher_is_better": list(higher_is_better),
+        }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    print(f"Wrote {path}")
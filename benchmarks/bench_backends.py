@@ -0,0 +1,83 @@
+"""Compare accuracy and latency of the inference backends on local clips.
+
+Every backend scores the same clips; agreement and AI-probability drift are
+reported against the fp32 pipeline backend. Backends that cannot be loaded
+(e.g. no exported ONNX graph) are skipped.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_backends
+    python -m benchmarks.bench_backends --clips path/to/clips --repeat 5
+"""
+import argparse
+import glob
+import json
+import os
+
+from benchmarks._common import SAMPLE_AUDIO, measure
+from config import Config
+from model import INFERENCE_BACKENDS, VoiceDetectionModel
+from utils.audio_processor import AudioProcessor
+
+
+def load_clips(directory: str | None) -> dict:
+    paths = [SAMPLE_AUDIO]
+    if directory:
+        paths = sorted(glob.glob(os.path.join(directory, "**", "*.mp3"), recursive=True))
+
+    processor = AudioProcessor(target_sr=Config.SAMPLE_RATE)
+    clips = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            clips[path] = processor.load_audio_from_bytes(f.read())
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", help="Directory of MP3 clips (defaults to tests/test_audio.mp3)")
+    parser.add_argument("--backends", nargs="+", default=list(INFERENCE_BACKENDS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips)
+    scores = {}
+    report = []
+
+    for backend in args.backends:
+        try:
+            model = VoiceDetectionModel(
+                model_path=Config.MODEL_PATH,
+                device=Config.DEVICE,
+                backend=backend,
+                onnx_path=Config.ONNX_MODEL_PATH,
+                quantized_path=Config.QUANTIZED_MODEL_PATH,
+                onnx_threads=Config.ONNX_INTRA_OP_THREADS,
+            )
+        except Exception as e:
+            print(f"{backend:<10} skipped: {e}")
+            continue
+
+        latencies = []
+        scores[backend] = {}
+        for path, (audio, sr) in clips.items():
+            (audio_at_rate,), model_sr = model._to_model_rate([audio], sr)
+            scores[backend][path] = model._ai_probability(model._forward([audio_at_rate], model_sr)[0])
+            latencies.append(measure(lambda: model.predict(audio, sr, "English"), repeat=args.repeat)["mean_ms"])
+
+        report.append({"backend": backend, "mean_latency_ms": round(sum(latencies) / len(latencies), 2)})
+
+    reference = scores.get("pipeline")
+    for entry in report:
+        backend_scores = scores[entry["backend"]]
+        if reference:
+            diffs = [abs(backend_scores[path] - reference[path]) for path in clips]
+            agree = [(backend_scores[path] >= 0.5) == (reference[path] >= 0.5) for path in clips]
+            entry["agreement"] = round(sum(agree) / len(agree), 4)
+            entry["max_probability_diff"] = round(max(diffs), 4)
+        print(json.dumps(entry))
+
+    print(json.dumps({"clips": len(clips), "results": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
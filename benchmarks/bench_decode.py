@@ -0,0 +1,39 @@
+"""Compare per-clip MP3 decode latency across AudioProcessor backends.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_decode --lengths 5 30 60 --repeat 10
+"""
+import argparse
+import json
+
+from benchmarks._common import measure, mp3_clip
+from utils.audio_processor import DECODER_BACKENDS, AudioProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=float, nargs="+", default=[5, 30, 60], help="Clip lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--backends", nargs="+", default=list(DECODER_BACKENDS))
+    args = parser.parse_args()
+
+    results = []
+    for seconds in args.lengths:
+        clip = mp3_clip(seconds)
+        for backend in args.backends:
+            processor = AudioProcessor(target_sr=16000, decoder=backend)
+            try:
+                processor.load_audio_from_bytes(clip)
+            except ValueError as e:
+                print(f"{seconds:>5.0f}s  {backend:<10}  unavailable ({e})")
+                continue
+
+            stats = measure(lambda: processor.load_audio_from_bytes(clip), repeat=args.repeat)
+            results.append({"seconds": seconds, "backend": backend, **stats})
+            print(f"{seconds:>5.0f}s  {backend:<10}  mean {stats['mean_ms']:8.2f} ms  p50 {stats['p50_ms']:8.2f} ms")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark the single-STFT handcrafted feature extractor against the legacy one.
+
+Checks that every feature matches the legacy implementation within tolerance
+and reports the speedup across clip lengths.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_features --lengths 1 10 30 60
+"""
+import argparse
+import json
+
+import librosa
+import numpy as np
+
+from benchmarks._common import measure, synthetic_audio
+from feature_extraction import FeatureExtractor
+
+
+def legacy_extract_handcrafted_features(audio_data: np.ndarray, sr: int) -> dict:
+    """Reference copy of the original per-feature STFT implementation."""
+    features = {}
+
+    mfccs = librosa.feature.mfcc(y=audio_data, sr=sr, n_mfcc=40)
+    features['mfcc_mean'] = np.mean(mfccs, axis=1)
+    features['mfcc_std'] = np.std(mfccs, axis=1)
+
+    pitches, magnitudes = librosa.piptrack(y=audio_data, sr=sr)
+    pitch_values = []
+    for t in range(pitches.shape[1]):
+        index = magnitudes[:, t].argmax()
+        pitch = pitches[index, t]
+        if pitch > 0:
+            pitch_values.append(pitch)
+
+    if len(pitch_values) > 0:
+        features['pitch_mean'] = np.mean(pitch_values)
+        features['pitch_std'] = np.std(pitch_values)
+        features['pitch_range'] = np.max(pitch_values) - np.min(pitch_values)
+    else:
+        features['pitch_mean'] = 0
+        features['pitch_std'] = 0
+        features['pitch_range'] = 0
+
+    spectral_centroids = librosa.feature.spectral_centroid(y=audio_data, sr=sr)[0]
+    features['spectral_centroid_mean'] = np.mean(spectral_centroids)
+    features['spectral_centroid_std'] = np.std(spectral_centroids)
+
+    spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=sr)[0]
+    features['spectral_rolloff_mean'] = np.mean(spectral_rolloff)
+
+    zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
+    features['zcr_mean'] = np.mean(zcr)
+    features['zcr_std'] = np.std(zcr)
+
+    rms = librosa.feature.rms(y=audio_data)[0]
+    features['energy_mean'] = np.mean(rms)
+    features['energy_std'] = np.std(rms)
+
+    return features
+
+
+def max_relative_error(expected: dict, actual: dict) -> float:
+    worst = 0.0
+    for name, value in expected.items():
+        value = np.asarray(value, dtype=np.float64)
+        other = np.asarray(actual[name], dtype=np.float64)
+        scale = np.maximum(np.abs(value), 1e-3)
+        worst = max(worst, float(np.max(np.abs(value - other) / scale)))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=float, nargs="+", default=[1, 10, 30, 60], help="Clip lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rtol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    sr = 16000
+    extractor = FeatureExtractor(enable_wavlm=False)
+    results = []
+
+    for seconds in args.lengths:
+        audio = synthetic_audio(seconds, sr)
+
+        error = max_relative_error(
+            legacy_extract_handcrafted_features(audio, sr),
+            extractor.extract_handcrafted_features(audio, sr),
+        )
+        if error > args.rtol:
+            raise SystemExit(f"{seconds}s clip: features differ from legacy by {error:.2e} (rtol {args.rtol})")
+
+        legacy = measure(lambda: legacy_extract_handcrafted_features(audio, sr), repeat=args.repeat)
+        current = measure(lambda: extractor.extract_handcrafted_features(audio, sr), repeat=args.repeat)
+        speedup = legacy["mean_ms"] / current["mean_ms"]
+        results.append({
+            "seconds": seconds,
+            "legacy": legacy,
+            "single_stft": current,
+            "speedup": round(speedup, 2),
+            "max_relative_error": error,
+        })
+        print(f"{seconds:>5.0f}s  legacy {legacy['mean_ms']:8.2f} ms  single-STFT {current['mean_ms']:8.2f} ms  x{speedup:.2f}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
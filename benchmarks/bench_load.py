@@ -0,0 +1,134 @@
+"""Load-test /api/voice-detection at one or more concurrency levels.
+
+Each level sends --requests requests from --concurrency client threads, each
+holding one keep-alive connection, and reports throughput, p50/p95/p99
+latency and errors by status. With --serve the Flask app is started
+in-process on the --url port first, otherwise a running server is targeted.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_load --serve --concurrency 1 4 16 --output results/load.json
+    python -m benchmarks.bench_load --url http://localhost:5000 --mode raw --seconds 30
+"""
+import argparse
+import base64
+import http.client
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks._common import mp3_clip, percentile, save_results
+from config import Config
+
+
+def build_request(mode: str, clip: bytes, api_key: str, language: str) -> tuple:
+    """Return (path, body, headers) for one detection request."""
+    headers = {"x-api-key": api_key}
+    if mode == "raw":
+        headers["Content-Type"] = "audio/mpeg"
+        return f"/api/voice-detection?language={language}", clip, headers
+
+    headers["Content-Type"] = "application/json"
+    body = json.dumps({
+        "language": language,
+        "audioFormat": "mp3",
+        "audioBase64": base64.b64encode(clip).decode("utf-8"),
+    }).encode("utf-8")
+    return "/api/voice-detection", body, headers
+
+
+def serve_in_process(host: str, port: int):
+    from werkzeug.serving import make_server
+
+    from app import app
+
+    server = make_server(host, port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="bench-load-server", daemon=True).start()
+    return server
+
+
+def run_level(url: str, concurrency: int, total: int, request_parts: tuple) -> dict:
+    path, body, headers = request_parts
+    target = urlsplit(url)
+    local = threading.local()
+
+    def send(_):
+        if not hasattr(local, "connection"):
+            local.connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=300)
+        start = time.perf_counter()
+        try:
+            local.connection.request("POST", path, body=body, headers=headers)
+            response = local.connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            local.connection.close()
+            del local.connection
+            status = "connection_error"
+        return status, (time.perf_counter() - start) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(send, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for status, latency in outcomes if status == 200)
+    statuses = Counter(str(status) for status, _ in outcomes)
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": {status: count for status, count in statuses.items() if status != "200"},
+        "throughput_rps": round(len(latencies) / elapsed, 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--serve", action="store_true", help="Start the Flask app in-process on the --url port")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Clip length, looped from tests/test_audio.mp3")
+    parser.add_argument("--mode", choices=["json", "raw"], default="json", help="base64 JSON or raw audio/mpeg body")
+    parser.add_argument("--language", default="English")
+    parser.add_argument("--api-key", default=Config.API_SECRET_KEY)
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed requests before the first level")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    server = None
+    if args.serve:
+        target = urlsplit(args.url)
+        server = serve_in_process(target.hostname, target.port or 80)
+
+    request_parts = build_request(args.mode, mp3_clip(args.seconds), args.api_key, args.language)
+    if args.warmup:
+        run_level(args.url, 1, args.warmup, request_parts)
+
+    results = []
+    for concurrency in args.concurrency:
+        entry = {"mode": args.mode, "seconds": args.seconds, **run_level(args.url, concurrency, args.requests, request_parts)}
+        results.append(entry)
+        print(
+            f"c={concurrency:<4} {entry['throughput_rps']:8.2f} req/s  p50 {entry['p50_ms']:9.2f} ms  "
+            f"p95 {entry['p95_ms']:9.2f} ms  p99 {entry['p99_ms']:9.2f} ms  errors {entry['errors']}"
+        )
+
+    if server is not None:
+        server.shutdown()
+
+    if args.output:
+        save_results(args.output, "load", {key: value for key, value in vars(args).items() if key != "api_key"}, results)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
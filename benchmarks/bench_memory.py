@@ -0,0 +1,172 @@
+"""Measure per-request memory of the decode + predict path, before and after zero-copy.
+
+For each clip length, a fresh subprocess runs base64 decode, MP3 decode and
+model inference ``--concurrency`` times in parallel and reports the
+tracemalloc peak (Python and NumPy allocations) and the peak RSS growth above
+the idle process. ``legacy`` reproduces the previous path (pydub
+AudioSegment with set_channels/set_frame_rate, get_array_of_samples,
+np.array, astype and division, then the transformers pipeline); ``current``
+is the server's default path: AudioProcessor with AUDIO_DECODER, then the
+BatchScheduler (with BATCHING_ENABLED) or VoiceDetectionModel.predict, both
+feeding the model from reused per-thread buffers.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_memory --output results/memory.json
+    python -m benchmarks.bench_memory --lengths 10 60 --concurrency 1 4
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks._common import mp3_clip, save_results
+from config import Config
+from utils.audio_processor import AudioProcessor, resolve_ffmpeg
+from utils.batch_scheduler import BatchScheduler
+
+PATHS = ("legacy", "current")
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc; 0 elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+class RssSampler:
+    """Polls RSS on a background thread and keeps the peak."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+def legacy_decode(audio_bytes: bytes, sr: int) -> np.ndarray:
+    from pydub import AudioSegment
+
+    resolve_ffmpeg()
+    audio_segment = AudioSegment.from_file(io.BytesIO(audio_bytes), format="mp3")
+    if audio_segment.channels > 1:
+        audio_segment = audio_segment.set_channels(1)
+    audio_segment = audio_segment.set_frame_rate(sr)
+    samples = np.array(audio_segment.get_array_of_samples())
+    return samples.astype(np.float32) / (1 << 15)
+
+
+def run_child(path: str, seconds: float, concurrency: int, repeat: int):
+    """One measurement in this (fresh) process; prints a JSON line."""
+    from benchmarks.bench_stages import load_model
+
+    sr = Config.SAMPLE_RATE
+    processor = AudioProcessor(target_sr=sr, decoder=Config.AUDIO_DECODER)
+    model = load_model()
+    inference_model = model
+    if Config.BATCHING_ENABLED:
+        inference_model = BatchScheduler(
+            model, max_batch_size=Config.BATCH_MAX_SIZE, max_wait_ms=Config.BATCH_MAX_WAIT_MS
+        )
+    if path == "legacy" and model.classifier is None:
+        raise SystemExit("The legacy path runs the transformers pipeline: use INFERENCE_BACKEND=pipeline or quantized")
+    audio_base64 = base64.b64encode(mp3_clip(seconds)).decode("utf-8")
+
+    def request():
+        audio_bytes = processor.decode_base64_audio(audio_base64)
+        if path == "legacy":
+            audio_data = legacy_decode(audio_bytes, sr)
+            return model.classifier({"array": audio_data, "sampling_rate": sr})[0]["score"]
+        audio_data, _ = processor.load_audio_from_bytes(audio_bytes)
+        return inference_model.predict(audio_data, sr, "English")[1]
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    # Warm up every thread (allocator pools, per-thread buffers, lazy imports)
+    list(pool.map(lambda _: request(), range(concurrency)))
+
+    traced_peaks, rss_growth, latencies = [], [], []
+    for _ in range(repeat):
+        idle_rss = rss_bytes()
+        tracemalloc.start()
+        started = time.perf_counter()
+        with RssSampler() as sampler:
+            list(pool.map(lambda _: request(), range(concurrency)))
+        latencies.append((time.perf_counter() - started) * 1000)
+        traced_peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        rss_growth.append(sampler.peak - idle_rss)
+    pool.shutdown()
+
+    mb = 1024 * 1024
+    print(json.dumps({
+        "path": path,
+        "seconds": seconds,
+        "concurrency": concurrency,
+        "traced_peak_mb_per_request": round(min(traced_peaks) / concurrency / mb, 2),
+        "rss_growth_mb": round(min(rss_growth) / mb, 2),
+        "latency_ms": round(min(latencies), 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=float, nargs="+", default=[10, 30, 60], help="Clip lengths in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--child", nargs=3, metavar=("PATH", "SECONDS", "CONCURRENCY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], float(args.child[1]), int(args.child[2]), args.repeat)
+        return
+
+    results = []
+    for seconds in args.lengths:
+        for concurrency in args.concurrency:
+            for path in args.paths:
+                # A fresh interpreter per run, so allocator state and RSS do not carry over
+                completed = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_memory", "--repeat", str(args.repeat),
+                     "--child", path, str(seconds), str(concurrency)],
+                    capture_output=True, text=True, check=True
+                )
+                entry = json.loads(completed.stdout.strip().splitlines()[-1])
+                results.append(entry)
+                print(json.dumps(entry))
+
+    if args.output:
+        save_results(
+            args.output, "memory", vars(args), results, key_fields=("path", "seconds", "concurrency"),
+            metrics=("traced_peak_mb_per_request", "rss_growth_mb", "latency_ms")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Micro-benchmark every stage of the detection pipeline across clip lengths.
+
+Times decode_base64_audio, load_audio_from_bytes, extract_handcrafted_features,
+VoiceDetectionModel.predict and generate_explanation on clips looped from
+tests/test_audio.mp3 ("mp3") and on synthetic voice-like audio ("synthetic",
+which has no MP3 bytes and so skips the two decode stages).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_stages --output results/stages.json
+    python -m benchmarks.bench_stages --lengths 1 10 --sources synthetic --skip-model
+"""
+import argparse
+import base64
+import json
+
+from benchmarks._common import measure, mp3_clip, save_results, synthetic_audio
+from config import Config
+from feature_extraction import FeatureExtractor
+from utils.audio_processor import AudioProcessor
+from utils.explanation_generator import ExplanationGenerator
+
+
+def load_model():
+    from model import VoiceDetectionModel
+
+    return VoiceDetectionModel(
+        model_path=Config.MODEL_PATH,
+        device=Config.DEVICE,
+        backend=Config.INFERENCE_BACKEND,
+        onnx_path=Config.ONNX_MODEL_PATH,
+        quantized_path=Config.QUANTIZED_MODEL_PATH,
+        onnx_threads=Config.ONNX_INTRA_OP_THREADS,
+        model_dir=Config.LOCAL_MODEL_DIR
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=float, nargs="+", default=[1, 5, 10, 30, 60], help="Clip lengths in seconds")
+    parser.add_argument("--sources", nargs="+", choices=["mp3", "synthetic"], default=["mp3", "synthetic"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-model", action="store_true", help="Do not load the model or time predict")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    sr = Config.SAMPLE_RATE
+    processor = AudioProcessor(target_sr=sr, decoder=Config.AUDIO_DECODER)
+    extractor = FeatureExtractor(enable_wavlm=False)
+    explanation_generator = ExplanationGenerator()
+    model = None if args.skip_model else load_model()
+
+    results = []
+    for source in args.sources:
+        for seconds in args.lengths:
+            stages = {}
+            if source == "mp3":
+                clip = mp3_clip(seconds)
+                audio_base64 = base64.b64encode(clip).decode("utf-8")
+                stages["decode_base64_audio"] = lambda: processor.decode_base64_audio(audio_base64)
+                stages["load_audio_from_bytes"] = lambda: processor.load_audio_from_bytes(clip)
+                audio, _ = processor.load_audio_from_bytes(clip)
+            else:
+                audio = synthetic_audio(seconds, sr)
+
+            features = extractor.extract_handcrafted_features(audio, sr)
+            stages["extract_handcrafted_features"] = lambda: extractor.extract_handcrafted_features(audio, sr)
+            classification, confidence = "AI_GENERATED", 0.9
+            if model is not None:
+                classification, confidence = model.predict(audio, sr, "English")
+                stages["predict"] = lambda: model.predict(audio, sr, "English")
+            stages["generate_explanation"] = lambda: explanation_generator.generate_explanation(
+                classification, confidence, features
+            )
+
+            for stage, fn in stages.items():
+                stats = measure(fn, repeat=args.repeat)
+                results.append({"stage": stage, "source": source, "seconds": seconds, **stats})
+                print(f"{source:<10} {seconds:>5.0f}s  {stage:<30} mean {stats['mean_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms")
+
+    if args.output:
+        save_results(args.output, "stages", vars(args), results)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
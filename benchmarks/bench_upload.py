@@ -0,0 +1,85 @@
+"""Compare request parse and decode cost for base64 JSON, raw and multipart uploads.
+
+Builds the three request bodies for the same MP3 clip, then times how long the
+server-side parsing takes (JSON + base64 decode, raw body read, multipart file
+read) with and without MP3 decoding. The model is not loaded.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_upload --lengths 5 30 60
+"""
+import argparse
+import base64
+import io
+import json
+
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from benchmarks._common import measure, mp3_clip
+from utils.audio_processor import AudioProcessor
+
+
+def build_requests(clip: bytes) -> dict:
+    audio_base64 = base64.b64encode(clip).decode("utf-8")
+    payload = json.dumps({"language": "English", "audioFormat": "mp3", "audioBase64": audio_base64})
+    return {
+        "json": dict(method="POST", data=payload, content_type="application/json"),
+        "raw": dict(method="POST", data=clip, content_type="audio/mpeg", query_string={"language": "English"}),
+        "multipart": dict(method="POST", data={"language": "English", "audio": (io.BytesIO(clip), "clip.mp3")}),
+    }
+
+
+def parse(kind: str, environ: dict, processor: AudioProcessor) -> bytes:
+    request = Request(environ)
+    if kind == "json":
+        data = request.get_json()
+        return processor.decode_base64_audio(data["audioBase64"])
+    if kind == "raw":
+        return request.get_data(cache=False)
+    return request.files["audio"].read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=float, nargs="+", default=[5, 30, 60], help="Clip lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    processor = AudioProcessor(target_sr=16000)
+    results = []
+
+    for seconds in args.lengths:
+        clip = mp3_clip(seconds)
+        for kind, request_args in build_requests(clip).items():
+            built = EnvironBuilder(**request_args).get_environ()
+            body = built["wsgi.input"].read()
+            content_type = built["CONTENT_TYPE"]
+
+            def environ():
+                # Fresh input stream per run; the body bytes are built once.
+                return EnvironBuilder(
+                    method="POST", input_stream=io.BytesIO(body), content_type=content_type,
+                    content_length=len(body), query_string=request_args.get("query_string"),
+                ).get_environ()
+
+            parse_only = measure(lambda: parse(kind, environ(), processor), repeat=args.repeat)
+            with_decode = measure(
+                lambda: processor.load_audio_from_bytes(parse(kind, environ(), processor)), repeat=args.repeat
+            )
+            results.append({
+                "seconds": seconds,
+                "format": kind,
+                "body_bytes": len(body),
+                "parse": parse_only,
+                "parse_and_decode": with_decode,
+            })
+            print(
+                f"{seconds:>5.0f}s  {kind:<9}  body {len(body) / 1024:9.1f} KiB  "
+                f"parse {parse_only['mean_ms']:8.2f} ms  parse+decode {with_decode['mean_ms']:8.2f} ms"
+            )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
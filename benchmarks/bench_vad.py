@@ -0,0 +1,85 @@
+"""Measure what VAD silence trimming saves on clips padded with silence.
+
+The sample clip is split into chunks with stretches of low-level noise
+inserted between them, for several silence fractions. Each clip is scored
+untrimmed and trimmed; the report shows VAD cost, inference latency and the
+AI-probability shift caused by trimming.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_vad
+    python -m benchmarks.bench_vad --silence 0 0.5 0.8 --repeat 5
+"""
+import argparse
+import json
+
+import numpy as np
+
+from benchmarks._common import measure, read_sample_bytes
+from config import Config
+from model import VoiceDetectionModel
+from utils.audio_processor import AudioProcessor
+from utils.vad import trim_silence
+
+
+def with_silence(audio: np.ndarray, sr: int, fraction: float, chunks: int = 4, seed: int = 0) -> np.ndarray:
+    """Interleave ``chunks`` pieces of ``audio`` with noise so that ``fraction`` of the result is silence."""
+    if fraction <= 0:
+        return audio
+    rng = np.random.default_rng(seed)
+    gap = int(len(audio) * fraction / (1 - fraction) / chunks)
+    parts = []
+    for piece in np.array_split(audio, chunks):
+        parts.append((0.0005 * rng.standard_normal(gap)).astype(np.float32))
+        parts.append(piece)
+    return np.concatenate(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--silence", type=float, nargs="+", default=[0.0, 0.25, 0.5, 0.75])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = AudioProcessor(target_sr=Config.SAMPLE_RATE)
+    speech, sr = processor.load_audio_from_bytes(read_sample_bytes())
+    model = VoiceDetectionModel(model_path=Config.MODEL_PATH, device=Config.DEVICE)
+
+    def ai_probability(audio):
+        (audio_at_rate,), model_sr = model._to_model_rate([audio], sr)
+        return model._ai_probability(model._forward([audio_at_rate], model_sr)[0])
+
+    vad_options = {
+        "frame_ms": Config.VAD_FRAME_MS,
+        "threshold_db": Config.VAD_THRESHOLD_DB,
+        "range_db": Config.VAD_RANGE_DB,
+        "padding_ms": Config.VAD_PADDING_MS,
+    }
+
+    results = []
+    for fraction in args.silence:
+        clip = with_silence(speech, sr, fraction)
+        trimmed, speech_ratio = trim_silence(clip, sr, **vad_options)
+
+        full_probability = ai_probability(clip)
+        trimmed_probability = ai_probability(trimmed)
+        entry = {
+            "silence_fraction": fraction,
+            "seconds": round(len(clip) / sr, 2),
+            "trimmed_seconds": round(len(trimmed) / sr, 2),
+            "speech_ratio": round(speech_ratio, 3),
+            "vad": measure(lambda: trim_silence(clip, sr, **vad_options), repeat=args.repeat),
+            "full": measure(lambda: model.predict(clip, sr, "English"), repeat=args.repeat),
+            "trimmed": measure(lambda: model.predict(trimmed, sr, "English"), repeat=args.repeat),
+            "full_ai_probability": round(full_probability, 4),
+            "trimmed_ai_probability": round(trimmed_probability, 4),
+            "probability_shift": round(trimmed_probability - full_probability, 4),
+        }
+        entry["speedup"] = round(entry["full"]["mean_ms"] / (entry["trimmed"]["mean_ms"] + entry["vad"]["mean_ms"]), 2)
+        results.append(entry)
+        print(json.dumps(entry))
+
+    print(json.dumps({"clip_seconds": round(len(speech) / sr, 2), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
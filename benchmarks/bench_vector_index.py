@@ -0,0 +1,95 @@
+"""Measure duplicate-index query latency and recall against index size.
+
+Builds VectorIndex instances over synthetic embeddings (clustered around
+"speaker" centres like real WavLM vectors, so the IVF buckets have structure)
+for each size and configuration: exact (flat), IVF and IVF-PQ. Queries are
+slightly perturbed copies of indexed vectors, i.e. near-duplicate replays;
+recall@1 is the share of queries whose top hit matches the exact search.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_vector_index --output results/vector_index.json
+    python -m benchmarks.bench_vector_index --sizes 1000 10000 --nlist 64 --pq-m 48
+"""
+import argparse
+import itertools
+import json
+import time
+
+import numpy as np
+
+from benchmarks._common import measure, save_results
+from utils.vector_index import VectorIndex
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    return centres[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def index_bytes(index: VectorIndex) -> int:
+    return int(index._vectors.nbytes + index._codes.nbytes + index._assign.nbytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=768, help="Embedding width (768 for wavlm-base-plus)")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF buckets (default: about 4 * sqrt(size))")
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--pq-m", type=int, default=96, help="PQ bytes per vector")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    results = []
+    for size in args.sizes:
+        vectors = clustered_vectors(size, args.dim, clusters=max(size // 50, 1))
+        keys = [f"clip-{i}" for i in range(size)]
+        picked = rng.integers(0, size, size=args.queries)
+        queries = vectors[picked] + 0.05 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+        nlist = args.nlist or int(4 * np.sqrt(size))
+        configs = {
+            "flat": {},
+            "ivf": {"nlist": nlist, "nprobe": args.nprobe},
+            "ivf_pq": {"nlist": nlist, "nprobe": args.nprobe, "pq_m": args.pq_m},
+        }
+
+        exact_top = None
+        for name, options in configs.items():
+            started = time.perf_counter()
+            index = VectorIndex(args.dim, train_size=size, **options)
+            index.add(vectors, keys)
+            build_seconds = time.perf_counter() - started
+
+            cycle = itertools.cycle(queries)
+            latency = measure(lambda: index.search(next(cycle), k=1), repeat=args.queries)
+            top = [index.search(query, k=1)[0][1] for query in queries]
+            if exact_top is None:
+                exact_top = top
+
+            entry = {
+                "size": size,
+                "index": name,
+                **options,
+                "build_seconds": round(build_seconds, 3),
+                "bytes_per_vector": round(index_bytes(index) / size, 1),
+                "recall_at_1": round(float(np.mean([a == b for a, b in zip(top, exact_top)])), 4),
+                "query": latency,
+            }
+            results.append(entry)
+            print(json.dumps(entry))
+
+    if args.output:
+        save_results(
+            args.output, "vector_index", vars(args), results, key_fields=("size", "index"),
+            metrics=("query.p50_ms", "query.p95_ms", "recall_at_1", "bytes_per_vector", "build_seconds"),
+            higher_is_better=("recall_at_1",)
+        )
+
+
+if __name__ == "__main__":
+    main()
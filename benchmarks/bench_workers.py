@@ -0,0 +1,54 @@
+"""Report per-worker memory for a running gunicorn server (Linux only).
+
+RSS counts shared pages in every process; PSS splits them between sharers and
+USS (private memory) is what each extra worker really costs. With
+PRELOAD_MODEL=true a worker's USS should be a small fraction of the model size.
+
+Usage (from the repository root, while gunicorn is running):
+    python -m benchmarks.bench_workers <gunicorn master pid>
+"""
+import argparse
+import json
+import os
+
+
+def memory_kib(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].rstrip(":") in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_mib": round(values.get("Rss", 0) / 1024, 1),
+        "pss_mib": round(values.get("Pss", 0) / 1024, 1),
+        "uss_mib": round((values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)) / 1024, 1),
+    }
+
+
+def children(pid: int) -> list:
+    pids = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            pids.extend(int(child) for child in f.read().split())
+    return pids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("master_pid", type=int)
+    args = parser.parse_args()
+
+    report = {"master": {"pid": args.master_pid, **memory_kib(args.master_pid)}, "workers": []}
+    for pid in children(args.master_pid):
+        report["workers"].append({"pid": pid, **memory_kib(pid)})
+
+    workers = report["workers"]
+    if workers:
+        report["total_pss_mib"] = round(report["master"]["pss_mib"] + sum(w["pss_mib"] for w in workers), 1)
+        report["mean_worker_uss_mib"] = round(sum(w["uss_mib"] for w in workers) / len(workers), 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
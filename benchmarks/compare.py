@@ -0,0 +1,92 @@
+"""Compare two saved benchmark result files and flag regressions.
+
+Entries are matched on their identifying fields: KEY_FIELDS, or the
+key_fields a benchmark saved with its results. Latencies regress when they
+grow and throughput (*_rps, or metrics saved as higher_is_better) when it
+drops by more than --tolerance. Exits with status 1 if anything regressed,
+so it can gate CI, and with an error if two entries of a file share a key.
+
+Usage (from the repository root):
+    python -m benchmarks.compare results/base.json results/head.json --tolerance 0.1
+"""
+import argparse
+import json
+
+KEY_FIELDS = ("stage", "source", "backend", "mode", "seconds", "concurrency")
+COMPARED_METRICS = ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def entry_key(entry: dict, key_fields=KEY_FIELDS) -> tuple:
+    return tuple((name, entry[name]) for name in key_fields if name in entry)
+
+
+def metric_value(entry: dict, name: str):
+    """Value of a metric; dotted names ("query.p50_ms") reach into nested dicts."""
+    value = entry
+    for part in name.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def index_entries(data: dict, key_fields, path: str) -> dict:
+    """Map each entry's key to the entry; two entries with one key cannot be compared."""
+    entries = {}
+    for entry in data["results"]:
+        key = entry_key(entry, key_fields)
+        if key in entries:
+            raise SystemExit(f"{path}: several entries share the key {dict(key) or '(none)'}; "
+                             f"the benchmark must save key_fields that identify each entry")
+        entries[key] = entry
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative change before flagging")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    if base["benchmark"] != head["benchmark"]:
+        raise SystemExit(f"Different benchmarks: {base['benchmark']} vs {head['benchmark']}")
+    print(f"{base['benchmark']}: {base['meta'].get('commit')} -> {head['meta'].get('commit')}")
+
+    spec = head.get("compare") or {}
+    key_fields = spec.get("key_fields") or KEY_FIELDS
+    metrics = spec.get("metrics") or COMPARED_METRICS
+    higher_is_better = set(spec.get("higher_is_better") or ())
+
+    base_entries = index_entries(base, key_fields, args.base)
+    head_entries = index_entries(head, key_fields, args.head)
+    regressions = 0
+    for key, entry in head_entries.items():
+        previous = base_entries.get(key)
+        if previous is None:
+            continue
+
+        label = " ".join(f"{name}={value}" for name, value in key)
+        for metric in metrics:
+            before, after = metric_value(previous, metric), metric_value(entry, metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            higher = metric.endswith("_rps") or metric in higher_is_better
+            regressed = change < -args.tolerance if higher else change > args.tolerance
+            regressions += regressed
+            marker = "REGRESSION" if regressed else ""
+            print(f"{label:<60} {metric:<15} {before:>10.2f} -> {after:>10.2f} ({change:+.1%}) {marker}")
+
+    print(f"{regressions} regression(s) beyond {args.tolerance:.0%}")
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
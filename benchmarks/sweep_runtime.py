@@ -0,0 +1,187 @@
+"""Sweep worker and thread settings on this machine and recommend the runtime config.
+
+Each combination of worker processes, torch intra-op threads per forward pass,
+MAX_CONCURRENT_FORWARDS and BATCHING_ENABLED is run for real: every worker is
+a separate process that applies the settings through utils.runtime.configure,
+loads the model and is driven by ``--clients`` request threads (like
+gunicorn's WEB_THREADS) scoring a synthetic clip the way the API does, through
+a BatchScheduler (predict_batch) when batching is on and predict when it is
+off. All workers start together, and throughput and latency percentiles are
+pooled across them.
+
+The recommendation is the highest throughput whose p95 latency fits
+--p95-budget-ms (or the best throughput overall when no budget is given),
+printed as environment variables. Each worker holds its own copy of the
+model, so the largest worker count needs that much free memory.
+
+Usage (from the repository root):
+    python -m benchmarks.sweep_runtime --output results/runtime.json
+    python -m benchmarks.sweep_runtime --workers 1 2 --threads 2 4 8 --guard 1 2 --batching on --p95-budget-ms 800
+"""
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks._common import percentile, save_results, synthetic_audio
+from config import Config
+from utils.batch_scheduler import BatchScheduler
+from utils.runtime import available_cpus, configure, worker_cpus
+
+BATCHING_MODES = ("on", "off")
+# Identify one combination in saved results (see benchmarks.compare)
+KEY_FIELDS = ("workers", "clients_per_worker", "intra_op_threads", "max_concurrent_forwards", "batching", "affinity")
+
+
+def run_child(workers: int, index: int, threads: int, guard: int, batching: str, affinity: str, clients: int,
+              duration: float, seconds: float):
+    """One worker process: configure, load, report ready, then serve until the duration is up."""
+    from benchmarks.bench_stages import load_model
+
+    applied = configure(
+        intra_op_threads=threads,
+        interop_threads=Config.TORCH_INTEROP_THREADS,
+        cpus=worker_cpus(affinity, index, workers),
+        max_concurrent_forwards=guard,
+        inference_mode=Config.INFERENCE_MODE,
+        workers=workers
+    )
+    model = load_model()
+    if batching == "on":
+        model = BatchScheduler(model, max_batch_size=Config.BATCH_MAX_SIZE, max_wait_ms=Config.BATCH_MAX_WAIT_MS)
+    clip = synthetic_audio(seconds, Config.SAMPLE_RATE)
+    model.predict(clip, Config.SAMPLE_RATE, "English")
+
+    print("ready", flush=True)
+    sys.stdin.readline()  # "go" from the parent once every worker is loaded
+
+    deadline = time.perf_counter() + duration
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            model.predict(clip, Config.SAMPLE_RATE, "English")
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    pool = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    print(json.dumps({"applied": applied, "latencies_ms": latencies}), flush=True)
+
+
+def run_combination(workers: int, threads: int, guard: int, batching: str, args) -> dict:
+    children = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.sweep_runtime", "--child",
+             str(workers), str(index), str(threads), str(guard), batching, args.affinity,
+             str(args.clients), str(args.duration), str(args.seconds)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for index in range(workers)
+    ]
+    for child in children:
+        if child.stdout.readline().strip() != "ready":
+            raise RuntimeError("A sweep worker failed to start")
+    for child in children:
+        child.stdin.write("go\n")
+        child.stdin.flush()
+
+    reports = []
+    for child in children:
+        reports.append(json.loads(child.stdout.readline()))
+        child.wait()
+
+    latencies = sorted(latency for report in reports for latency in report["latencies_ms"])
+    return {
+        "workers": workers,
+        "clients_per_worker": args.clients,
+        "intra_op_threads": threads,
+        "max_concurrent_forwards": guard,
+        "batching": batching,
+        "affinity": args.affinity,
+        "cpus": [report["applied"]["cpus"] for report in reports],
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / args.duration, 2),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+    }
+
+
+def recommend(results: list, p95_budget_ms: float | None) -> dict | None:
+    candidates = [r for r in results if r["requests"] and (p95_budget_ms is None or r["p95_ms"] <= p95_budget_ms)]
+    if not candidates:
+        return None
+    best = max(candidates, key=lambda r: (r["throughput_rps"], -r["p95_ms"]))
+    return {
+        "WEB_WORKERS": best["workers"],
+        "WEB_THREADS": best["clients_per_worker"],
+        "TORCH_INTRA_OP_THREADS": best["intra_op_threads"],
+        "MAX_CONCURRENT_FORWARDS": best["max_concurrent_forwards"],
+        "BATCHING_ENABLED": "true" if best["batching"] == "on" else "false",
+        "CPU_AFFINITY": best["affinity"],
+    }
+
+
+def main():
+    cpu_count = len(available_cpus())
+    powers = [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= cpu_count]
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[n for n in powers if n <= 4])
+    parser.add_argument("--threads", type=int, nargs="+", default=powers,
+                        help="Intra-op threads per forward pass (combinations over the CPU count are skipped)")
+    parser.add_argument("--guard", type=int, nargs="+", default=[1, 2], help="MAX_CONCURRENT_FORWARDS values")
+    parser.add_argument("--batching", nargs="+", choices=BATCHING_MODES, default=list(BATCHING_MODES),
+                        help="BATCHING_ENABLED values (on scores through the BatchScheduler, like the API default)")
+    parser.add_argument("--affinity", default="auto", help="CPU_AFFINITY for every run (none, auto or lists)")
+    parser.add_argument("--clients", type=int, default=Config.WEB_THREADS, help="Request threads per worker")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds per combination")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Clip length")
+    parser.add_argument("--p95-budget-ms", type=float, help="Only recommend settings within this p95 latency")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--child", nargs=9, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        workers, index, threads, guard, batching, affinity, clients, duration, seconds = args.child
+        run_child(int(workers), int(index), int(threads), int(guard), batching, affinity, int(clients),
+                  float(duration), float(seconds))
+        return
+
+    results = []
+    for workers, threads, guard, batching in itertools.product(args.workers, args.threads, args.guard, args.batching):
+        # Skip combinations that oversubscribe the machine by construction
+        if workers * threads * guard > cpu_count:
+            continue
+        entry = run_combination(workers, threads, guard, batching, args)
+        results.append(entry)
+        print(json.dumps(entry))
+
+    recommendation = recommend(results, args.p95_budget_ms)
+    if recommendation is None:
+        print("No combination met the p95 budget")
+    else:
+        print("Recommended settings:")
+        for name, value in recommendation.items():
+            print(f"{name}={value}")
+
+    if args.output:
+        # The recommendation is stored with the parameters; results are keyed on the swept settings
+        save_results(
+            args.output, "runtime_sweep", {**vars(args), "cpus": cpu_count, "recommendation": recommendation}, results,
+            key_fields=KEY_FIELDS, metrics=("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import glob
+import os
+import threading
+
+import numpy as np
+
+from utils.metrics import REGISTRY, Counter
+from utils.vector_index import VectorIndex
+
+CASCADE_DECISIONS = REGISTRY.register(Counter(
+    "voice_detection_cascade_decisions_total",
+    "Clips decided by each tier of the detection cascade",
+    ["tier"],
+))
+
+# Scalar handcrafted features, in the order they appear in the feature vector
+# after the 40 MFCC means and 40 MFCC standard deviations.
+SCALAR_FEATURES = (
+    "pitch_mean", "pitch_std", "pitch_range",
+    "spectral_centroid_mean", "spectral_centroid_std", "spectral_rolloff_mean",
+    "zcr_mean", "zcr_std", "energy_mean", "energy_std",
+)
+
+
+def feature_vector(features: dict) -> np.ndarray:
+    """Flatten extract_handcrafted_features output into a fixed-order vector."""
+    return np.concatenate([
+        np.asarray(features["mfcc_mean"], dtype=np.float64),
+        np.asarray(features["mfcc_std"], dtype=np.float64),
+        np.array([float(features[name]) for name in SCALAR_FEATURES]),
+    ])
+
+
+class ScreeningModel:
+    """First tier of the detection cascade: a small scikit-learn classifier.
+
+    Scores the handcrafted feature vector and decides the clip only when the AI
+    probability falls outside [low_threshold, high_threshold]; everything in
+    between escalates to the wav2vec2 classifier.
+    """
+
+    def __init__(self, path: str, low_threshold: float | None = None, high_threshold: float | None = None):
+        """Load a model written by scripts.train_screening.
+
+        Args:
+            path: joblib artifact holding the fitted estimator and the
+                calibrated thresholds
+            low_threshold: decide HUMAN at or below this AI probability
+                (defaults to the calibrated value)
+            high_threshold: decide AI_GENERATED at or above this AI probability
+                (defaults to the calibrated value)
+        """
+        import joblib
+
+        if not os.path.exists(path):
+            raise ValueError(
+                f"Screening model not found at {path}. Train it with: python -m scripts.train_screening <clips dir>"
+            )
+
+        artifact = joblib.load(path)
+        self.estimator = artifact["estimator"]
+        self.ai_index = list(self.estimator.classes_).index(1)
+        self.low_threshold = artifact["low_threshold"] if low_threshold is None else low_threshold
+        self.high_threshold = artifact["high_threshold"] if high_threshold is None else high_threshold
+
+        if not 0.0 <= self.low_threshold <= self.high_threshold <= 1.0:
+            raise ValueError("Cascade thresholds must satisfy 0 <= low <= high <= 1")
+
+    def ai_probability(self, features: dict) -> float:
+        return float(self.estimator.predict_proba(feature_vector(features)[None, :])[0, self.ai_index])
+
+    def decide(self, features: dict):
+        """Return (classification, confidence) when confident, else None to escalate."""
+        ai_probability = self.ai_probability(features)
+        if ai_probability >= self.high_threshold:
+            return "AI_GENERATED", ai_probability
+        if ai_probability <= self.low_threshold:
+            return "HUMAN", 1.0 - ai_probability
+        return None
+
+
+class DuplicateLookup:
+    """Cascade tier that answers replays of clips the classifier already scored.
+
+    WavLM embeddings of scored clips are kept with their verdicts in a
+    VectorIndex. A new clip whose embedding matches a known clip at or above
+    the similarity threshold takes that clip's verdict without running the
+    classifier. The index is created with dim_getter() dimensions (the
+    backbone is loaded lazily) on first use.
+
+    Worker processes each learn their own clips, so each saves to its own
+    shard next to index_path (``<index>.worker<worker_getter()><ext>``) every
+    save_every inserts and on flush(). Loading merges index_path (as seeded
+    by scripts/build_duplicate_index.py) with every shard, by key.
+    """
+
+    def __init__(self, dim_getter, index_path: str, threshold: float = 0.97,
+                 nlist: int = 0, pq_m: int = 0, nprobe: int = 8, save_every: int = 100, worker_getter=lambda: 0):
+        self.dim_getter = dim_getter
+        self.worker_getter = worker_getter
+        self.index_path = index_path
+        self.threshold = threshold
+        self.index_options = {"nlist": nlist, "pq_m": pq_m, "nprobe": nprobe}
+        self.save_every = save_every
+
+        self._index = None
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+    @property
+    def index(self) -> VectorIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = self._load()
+            return self._index
+
+    @property
+    def shard_path(self) -> str:
+        root, ext = os.path.splitext(self.index_path)
+        return f"{root}.worker{self.worker_getter()}{ext}"
+
+    def _load(self) -> VectorIndex:
+        index = None
+        if self.index_path:
+            root, ext = os.path.splitext(self.index_path)
+            paths = [self.index_path] if os.path.exists(self.index_path) else []
+            paths += sorted(glob.glob(f"{glob.escape(root)}.worker*{ext}"))
+            for path in paths:
+                loaded = VectorIndex.load(path)
+                if index is None:
+                    index = loaded
+                else:
+                    index.merge(loaded)
+        return index if index is not None else VectorIndex(self.dim_getter(), **self.index_options)
+
+    def match(self, embedding: np.ndarray):
+        """Return the closest known clip's verdict if it is similar enough, else None."""
+        hits = self.index.search(embedding, k=1)
+        if not hits or hits[0][0] < self.threshold:
+            return None
+        similarity, key, verdict = hits[0]
+        return {"key": key, "similarity": similarity, **verdict}
+
+    def remember(self, key: str, embedding: np.ndarray, classification: str, confidence: float):
+        index = self.index
+        index.add(embedding, [key], [{"classification": classification, "confidence": float(confidence)}])
+
+        with self._lock:
+            self._unsaved += 1
+            save = self._unsaved >= self.save_every
+        if save:
+            self.flush()
+
+    def flush(self):
+        """Save this worker's shard if clips were added since the last save (also run at exit)."""
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, 0
+        if unsaved and self.index_path and self._index is not None:
+            self._index.save(self.shard_path)
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            "entries": len(index) if index is not None else 0,
+            "trained": index.trained if index is not None else False,
+            "threshold": self.threshold,
+        }
@@ -13,14 +13,132 @@ class Config:
     
     # Audio Processing
     SAMPLE_RATE = 16000
-    MAX_AUDIO_LENGTH = 60  # seconds
+    MAX_AUDIO_LENGTH = float(os.getenv('MAX_AUDIO_LENGTH', '60'))  # seconds
     MIN_AUDIO_LENGTH = 1   # seconds
+    AUDIO_DECODER = os.getenv('AUDIO_DECODER', 'auto')  # auto, soundfile, torchaudio or ffmpeg
+
+    # Silence trimming (off by default: audio is scored unmodified)
+    VAD_ENABLED = os.getenv('VAD_ENABLED', 'false').lower() == 'true'
+    VAD_FRAME_MS = float(os.getenv('VAD_FRAME_MS', '30'))
+    VAD_THRESHOLD_DB = float(os.getenv('VAD_THRESHOLD_DB', '-50'))  # dBFS floor
+    VAD_RANGE_DB = float(os.getenv('VAD_RANGE_DB', '35'))  # below the loudest frame
+    VAD_PADDING_MS = float(os.getenv('VAD_PADDING_MS', '200'))
     
     # Model Configuration
     WAVLM_MODEL = "microsoft/wavlm-base-plus"
     MODEL_PATH = os.getenv('MODEL_PATH', "models/wav2vec_aasist.pth")
     DEVICE = "cuda" if os.getenv('USE_GPU', 'false').lower() == 'true' else "cpu"
+
+    # Startup
+    LOCAL_MODEL_DIR = os.getenv('LOCAL_MODEL_DIR', "models/deepfake-classifier")  # baked by scripts.build_model
+    WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+    DEFER_WARMUP = os.getenv('DEFER_WARMUP', 'false').lower() == 'true'  # gunicorn.conf.py defers it to post_fork when preloading
+
+    # Inference Backend: pipeline (fp32), quantized (dynamic int8) or onnx
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'pipeline')
+    ONNX_MODEL_PATH = os.getenv('ONNX_MODEL_PATH', "models/deepfake-classifier.onnx")
+    QUANTIZED_MODEL_PATH = os.getenv('QUANTIZED_MODEL_PATH', "models/deepfake-classifier-int8.pt")
+    ONNX_INTRA_OP_THREADS = int(os.getenv('ONNX_INTRA_OP_THREADS', '0'))  # 0 = runtime default
+
+    # Detection cascade: a screening model on handcrafted features decides easy
+    # clips; the rest escalate to the wav2vec2 classifier
+    CASCADE_ENABLED = os.getenv('CASCADE_ENABLED', 'false').lower() == 'true'
+    SCREENING_MODEL_PATH = os.getenv('SCREENING_MODEL_PATH', "models/screening.joblib")
+    # Empty = use the thresholds calibrated by scripts.train_screening
+    CASCADE_LOW_THRESHOLD = float(os.getenv('CASCADE_LOW_THRESHOLD')) if os.getenv('CASCADE_LOW_THRESHOLD') else None
+    CASCADE_HIGH_THRESHOLD = float(os.getenv('CASCADE_HIGH_THRESHOLD')) if os.getenv('CASCADE_HIGH_THRESHOLD') else None
+
+    # Dynamic Batching (concurrent requests share one forward pass)
+    BATCHING_ENABLED = os.getenv('BATCHING_ENABLED', 'true').lower() == 'true'
+    BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', '8'))
+    BATCH_MAX_WAIT_MS = float(os.getenv('BATCH_MAX_WAIT_MS', '10'))
     
+    # Windowed Inference (long clips are scored in overlapping windows)
+    WINDOWED_INFERENCE = os.getenv('WINDOWED_INFERENCE', 'true').lower() == 'true'
+    WINDOWED_MIN_SECONDS = float(os.getenv('WINDOWED_MIN_SECONDS', '60'))  # clips longer than this use windows
+    FEATURE_MAX_SECONDS = float(os.getenv('FEATURE_MAX_SECONDS', '60'))  # handcrafted features use a central excerpt
+    WINDOW_SECONDS = float(os.getenv('WINDOW_SECONDS', '10'))
+    WINDOW_OVERLAP_SECONDS = float(os.getenv('WINDOW_OVERLAP_SECONDS', '2'))
+    WINDOW_AGGREGATE = os.getenv('WINDOW_AGGREGATE', 'mean')  # mean, max or vote
+    WINDOW_BATCH_SIZE = int(os.getenv('WINDOW_BATCH_SIZE', '4'))
+
+    # Pipelined Execution (handcrafted features overlap model inference)
+    PIPELINE_FEATURES = os.getenv('PIPELINE_FEATURES', 'true').lower() == 'true'
+    FEATURE_WORKERS = int(os.getenv('FEATURE_WORKERS', '4'))
+
+    # Batch Endpoint
+    BATCH_REQUEST_MAX_ITEMS = int(os.getenv('BATCH_REQUEST_MAX_ITEMS', '32'))
+    BATCH_REQUEST_MAX_MB = float(os.getenv('BATCH_REQUEST_MAX_MB', '32'))
+    DECODE_WORKERS = int(os.getenv('DECODE_WORKERS', '4'))
+
+    # Result Cache (repeated submissions skip decode and inference)
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_PATH = os.getenv('RESULT_CACHE_PATH', '')  # sqlite file shared by workers; empty = in-memory
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '1024'))
+    RESULT_CACHE_MAX_MB = float(os.getenv('RESULT_CACHE_MAX_MB', '16'))
+    RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '3600'))  # seconds
+
+    # Decoded PCM store (memory-mapped, shared by workers and batch scoring); empty = disabled
+    PCM_STORE_PATH = os.getenv('PCM_STORE_PATH', '')
+    PCM_STORE_MAX_MB = float(os.getenv('PCM_STORE_MAX_MB', '4096'))
+    PCM_STORE_SEGMENT_MB = float(os.getenv('PCM_STORE_SEGMENT_MB', '256'))
+    PCM_STORE_DTYPE = os.getenv('PCM_STORE_DTYPE', 'float32')  # float32 (zero-copy reads) or int16
+
+    # WavLM embeddings (backbone loaded on first use)
+    EMBEDDINGS_ENABLED = os.getenv('EMBEDDINGS_ENABLED', 'true').lower() == 'true'
+    EMBEDDING_STORE_PATH = os.getenv('EMBEDDING_STORE_PATH', 'data/embeddings')  # empty = do not store
+    EMBEDDING_DTYPE = os.getenv('EMBEDDING_DTYPE', 'float16')  # float16 or float32
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '8'))
+
+    # Near-duplicate lookup (cascade tier over WavLM embeddings of scored clips)
+    DUPLICATE_LOOKUP_ENABLED = os.getenv('DUPLICATE_LOOKUP_ENABLED', 'false').lower() == 'true'
+    DUPLICATE_INDEX_PATH = os.getenv('DUPLICATE_INDEX_PATH', 'data/duplicate_index.npz')  # empty = in memory only
+    DUPLICATE_SIMILARITY_THRESHOLD = float(os.getenv('DUPLICATE_SIMILARITY_THRESHOLD', '0.97'))  # cosine
+    DUPLICATE_INDEX_NLIST = int(os.getenv('DUPLICATE_INDEX_NLIST', '0'))  # IVF buckets, 0 = exact search
+    DUPLICATE_INDEX_PQ_M = int(os.getenv('DUPLICATE_INDEX_PQ_M', '0'))  # PQ bytes per vector, 0 = raw float32
+    DUPLICATE_INDEX_NPROBE = int(os.getenv('DUPLICATE_INDEX_NPROBE', '8'))
+    DUPLICATE_INDEX_SAVE_EVERY = int(os.getenv('DUPLICATE_INDEX_SAVE_EVERY', '100'))  # inserts between saves
+
+    # Live streaming (/api/voice-stream)
+    STREAMING_ENABLED = os.getenv('STREAMING_ENABLED', 'true').lower() == 'true'
+    STREAM_MAX_SESSIONS = int(os.getenv('STREAM_MAX_SESSIONS', '32'))  # open streams per worker
+    STREAM_RESERVED_THREADS = int(os.getenv('STREAM_RESERVED_THREADS', '2'))  # WEB_THREADS kept free of HTTP streams
+    STREAM_WINDOW_SECONDS = float(os.getenv('STREAM_WINDOW_SECONDS', '4'))  # audio scored per update (ring size)
+    STREAM_HOP_SECONDS = float(os.getenv('STREAM_HOP_SECONDS', '2'))  # new audio between updates
+    STREAM_HISTORY_WINDOWS = int(os.getenv('STREAM_HISTORY_WINDOWS', '5'))  # windows averaged into the verdict
+    STREAM_CHUNK_BYTES = int(os.getenv('STREAM_CHUNK_BYTES', '16384'))  # HTTP body read size
+
+    # Runtime tuning (utils/runtime.py), applied per worker process
+    TORCH_INTRA_OP_THREADS = int(os.getenv('TORCH_INTRA_OP_THREADS', '0'))  # 0 = worker CPUs / MAX_CONCURRENT_FORWARDS
+    TORCH_INTEROP_THREADS = int(os.getenv('TORCH_INTEROP_THREADS', '1'))  # 0 = torch default
+    CPU_AFFINITY = os.getenv('CPU_AFFINITY', 'none')  # none, auto (split CPUs across workers) or CPU list(s)
+    MAX_CONCURRENT_FORWARDS = int(os.getenv('MAX_CONCURRENT_FORWARDS', '1'))  # per worker, 0 = unlimited
+    INFERENCE_MODE = os.getenv('INFERENCE_MODE', 'true').lower() == 'true'  # torch.inference_mode over no_grad
+    DEFER_RUNTIME_SETUP = os.getenv('DEFER_RUNTIME_SETUP', 'false').lower() == 'true'  # gunicorn.conf.py applies it in post_fork
+
+    # Deadlines and load-based degradation (utils/overload.py)
+    REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', '60'))  # 0 = only x-request-timeout-ms
+    DEADLINE_FEATURES_RESERVE_SECONDS = float(os.getenv('DEADLINE_FEATURES_RESERVE_SECONDS', '2'))  # features wait below
+    DEGRADE_EXPLANATION_AT = int(os.getenv('DEGRADE_EXPLANATION_AT', '0'))  # requests in flight, 0 = off
+    DEGRADE_TRUNCATE_AT = int(os.getenv('DEGRADE_TRUNCATE_AT', '0'))  # requests in flight, 0 = off
+    DEGRADE_TRUNCATE_SECONDS = float(os.getenv('DEGRADE_TRUNCATE_SECONDS', '10'))  # audio scored when truncating
+
+    # Gunicorn Workers (gunicorn.conf.py)
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '1'))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '4'))
+    PRELOAD_MODEL = os.getenv('PRELOAD_MODEL', 'true').lower() == 'true'  # load once, fork workers sharing the weights
+    WORKER_INDEX = int(os.getenv('WORKER_INDEX', '0'))  # gunicorn.conf.py sets it per worker in post_fork
+
+    # Async Serving (asgi.py)
+    ASYNC_MAX_QUEUE = int(os.getenv('ASYNC_MAX_QUEUE', '16'))  # admitted requests before 429
+    ASYNC_INFERENCE_WORKERS = int(os.getenv('ASYNC_INFERENCE_WORKERS', '2'))
+    ASYNC_REQUEST_TIMEOUT = float(os.getenv('ASYNC_REQUEST_TIMEOUT', '30'))  # seconds
+    ASYNC_RETRY_AFTER = float(os.getenv('ASYNC_RETRY_AFTER', '1'))  # seconds, Retry-After of 429/503 (both servers)
+    ASYNC_MAX_BODY_MB = float(os.getenv('ASYNC_MAX_BODY_MB', '32'))
+
+    # Observability
+    SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'false').lower() == 'true'
+
     # Confidence Thresholds
     HIGH_CONFIDENCE_THRESHOLD = 0.85
     MEDIUM_CONFIDENCE_THRESHOLD = 0.65
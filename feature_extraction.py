@@ -1,71 +1,130 @@
+import threading
+
 import librosa
 import numpy as np
-import torch
-from transformers import Wav2Vec2FeatureExtractor, WavLMModel  # Changed import
+
+from utils.runtime import forward_pass
 
 class FeatureExtractor:
     def __init__(self, model_name="microsoft/wavlm-base-plus", device="cpu", enable_wavlm: bool = True):
-        """Initialize WavLM feature extractor"""
+        """Initialize the feature extractor.
+
+        The WavLM backbone is loaded lazily on the first embedding request, so
+        enabling it adds nothing to startup when embeddings are never used.
+        """
+        self.model_name = model_name
         self.device = device
         self.enable_wavlm = enable_wavlm
 
         self.processor = None
         self.model = None
+        self._load_lock = threading.Lock()
+
+    def _load_wavlm(self):
+        if not self.enable_wavlm:
+            raise RuntimeError("WavLM feature extraction is disabled")
+        if self.model is not None:
+            return
+
+        with self._load_lock:
+            if self.model is None:
+                # Lazy import to keep module import lightweight.
+                from transformers import Wav2Vec2FeatureExtractor, WavLMModel
+
+                self.processor = Wav2Vec2FeatureExtractor.from_pretrained(self.model_name)
+                model = WavLMModel.from_pretrained(self.model_name).to(self.device)
+                model.eval()
+                self.model = model
+
+    @property
+    def embedding_dim(self) -> int:
+        self._load_wavlm()
+        return self.model.config.hidden_size
 
-        if self.enable_wavlm:
-            # Use FeatureExtractor instead of Processor
-            self.processor = Wav2Vec2FeatureExtractor.from_pretrained(model_name)
-            self.model = WavLMModel.from_pretrained(model_name).to(device)
-            self.model.eval()
-    
     def extract_wavlm_features(self, audio_data: np.ndarray, sr: int) -> np.ndarray:
         """Extract WavLM embeddings from audio"""
-        if not self.enable_wavlm or self.processor is None or self.model is None:
-            raise RuntimeError("WavLM feature extraction is disabled")
+        return self.extract_wavlm_embeddings([audio_data], sr)
+
+    def extract_wavlm_embeddings(self, audio_batch: list, sr: int, batch_size: int = 8) -> np.ndarray:
+        """Mean-pooled WavLM embeddings for several clips, in batched forward passes.
+
+        Clips are sorted by length so each batch pads little. Pooling only
+        averages the frames that cover real samples, so an embedding does not
+        depend on the other clips in its batch.
+
+        Returns:
+            float32 array of shape (len(audio_batch), hidden_size)
+        """
+        self._load_wavlm()
+        if not audio_batch:
+            return np.zeros((0, self.model.config.hidden_size), dtype=np.float32)
 
         # Resample if necessary
         if sr != 16000:
-            audio_data = librosa.resample(audio_data, orig_sr=sr, target_sr=16000)
-        
-        # Process audio - corrected for feature extractor
-        inputs = self.processor(
-            audio_data, 
-            sampling_rate=16000, 
-            return_tensors="pt"
-        )
-        
-        # Move to device
-        input_values = inputs.input_values.to(self.device)
-        
-        # Extract features
-        with torch.no_grad():
-            outputs = self.model(input_values)
-            # Use last hidden state
-            hidden_states = outputs.last_hidden_state
-            
-            # Average pool across time dimension
-            features = torch.mean(hidden_states, dim=1)
-        
-        return features.cpu().numpy()
+            audio_batch = [librosa.resample(audio, orig_sr=sr, target_sr=16000) for audio in audio_batch]
+
+        # Models whose processor does not return a mask (e.g. wavlm-base-plus)
+        # expect zero padding without an attention mask in the forward pass.
+        pass_mask = getattr(self.processor, "return_attention_mask", False)
+
+        order = sorted(range(len(audio_batch)), key=lambda i: len(audio_batch[i]))
+        embeddings = np.zeros((len(audio_batch), self.model.config.hidden_size), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            group = order[start:start + batch_size]
+            inputs = self.processor(
+                [audio_batch[i] for i in group],
+                sampling_rate=16000,
+                padding=True,
+                return_attention_mask=True,
+                return_tensors="pt"
+            )
+            input_values = inputs.input_values.to(self.device)
+            attention_mask = inputs.attention_mask.to(self.device)
+
+            with forward_pass():
+                hidden_states = self.model(
+                    input_values, attention_mask=attention_mask if pass_mask else None
+                ).last_hidden_state
+
+                # Average pool across the valid frames of each clip
+                frame_mask = self.model._get_feature_vector_attention_mask(hidden_states.shape[1], attention_mask)
+                frame_mask = frame_mask.unsqueeze(-1).to(hidden_states.dtype)
+                pooled = (hidden_states * frame_mask).sum(dim=1) / frame_mask.sum(dim=1).clamp(min=1.0)
+
+            embeddings[group] = pooled.float().cpu().numpy()
+
+        return embeddings
     
-    def extract_handcrafted_features(self, audio_data: np.ndarray, sr: int) -> dict:
-        """Extract traditional audio features for explanation generation"""
+    def extract_handcrafted_features(self, audio_data: np.ndarray, sr: int, max_seconds: float | None = None) -> dict:
+        """Extract traditional audio features for explanation generation
+
+        The magnitude spectrogram is computed once and shared by the MFCC, pitch
+        and spectral features; all per-frame work is vectorized. With
+        max_seconds, longer clips are described by their central excerpt (a
+        view), so the spectrogram size is bounded whatever the clip length.
+        """
         features = {}
-        
+
+        if max_seconds and len(audio_data) > max_seconds * sr:
+            length = int(max_seconds * sr)
+            start = (len(audio_data) - length) // 2
+            audio_data = audio_data[start:start + length]
+
+        # Single STFT shared by every spectral feature (librosa defaults)
+        magnitude = np.abs(librosa.stft(audio_data, n_fft=2048, hop_length=512))
+
         # MFCC
-        mfccs = librosa.feature.mfcc(y=audio_data, sr=sr, n_mfcc=40)
+        mel = librosa.feature.melspectrogram(S=magnitude ** 2, sr=sr)
+        mfccs = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=40)
         features['mfcc_mean'] = np.mean(mfccs, axis=1)
         features['mfcc_std'] = np.std(mfccs, axis=1)
-        
-        # Pitch/F0
-        pitches, magnitudes = librosa.piptrack(y=audio_data, sr=sr)
-        pitch_values = []
-        for t in range(pitches.shape[1]):
-            index = magnitudes[:, t].argmax()
-            pitch = pitches[index, t]
-            if pitch > 0:
-                pitch_values.append(pitch)
-        
+
+        # Pitch/F0: strongest bin per frame, voiced frames only
+        pitches, magnitudes = librosa.piptrack(S=magnitude, sr=sr)
+        peak_bins = magnitudes.argmax(axis=0)
+        frame_pitches = pitches[peak_bins, np.arange(pitches.shape[1])]
+        pitch_values = frame_pitches[frame_pitches > 0]
+
         if len(pitch_values) > 0:
             features['pitch_mean'] = np.mean(pitch_values)
             features['pitch_std'] = np.std(pitch_values)
@@ -74,27 +133,27 @@ class FeatureExtractor:
             features['pitch_mean'] = 0
             features['pitch_std'] = 0
             features['pitch_range'] = 0
-        
+
         # Spectral features
-        spectral_centroids = librosa.feature.spectral_centroid(y=audio_data, sr=sr)[0]
+        spectral_centroids = librosa.feature.spectral_centroid(S=magnitude, sr=sr)[0]
         features['spectral_centroid_mean'] = np.mean(spectral_centroids)
         features['spectral_centroid_std'] = np.std(spectral_centroids)
-        
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=sr)[0]
+
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=sr)[0]
         features['spectral_rolloff_mean'] = np.mean(spectral_rolloff)
-        
+
         # Zero crossing rate
         zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
         features['zcr_mean'] = np.mean(zcr)
         features['zcr_std'] = np.std(zcr)
-        
-        # Energy/RMS
+
+        # Energy/RMS (time-domain framing, no STFT needed)
         rms = librosa.feature.rms(y=audio_data)[0]
         features['energy_mean'] = np.mean(rms)
         features['energy_std'] = np.std(rms)
-        
+
         return features
-    
+
     def extract_all_features(self, audio_data: np.ndarray, sr: int) -> tuple:
         """Extract both WavLM and handcrafted features"""
         wavlm_features = self.extract_wavlm_features(audio_data, sr)
@@ -0,0 +1,54 @@
+"""Gunicorn settings (loaded automatically from the working directory).
+
+With PRELOAD_MODEL enabled the master imports the app, and so loads the model
+weights, once before forking. Workers then share those pages copy-on-write,
+so each extra worker adds little RSS. Each worker applies the runtime
+settings (utils/runtime.py) after forking: its torch thread pools are sized
+to its share of the cores, optionally pinned to them with CPU_AFFINITY, so
+workers do not oversubscribe the CPU.
+
+The onnx backend is never preloaded: an ONNX Runtime session and its thread
+pools do not survive a fork, so each worker creates its own.
+"""
+import gc
+import itertools
+import os
+
+from config import Config
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = Config.WEB_WORKERS
+threads = Config.WEB_THREADS
+timeout = 180
+preload_app = Config.PRELOAD_MODEL and Config.INFERENCE_BACKEND != "onnx"
+
+# Thread pools and affinity are per worker, so they are set in post_fork.
+Config.DEFER_RUNTIME_SETUP = True
+
+if preload_app:
+    # Warm-up starts torch's OpenMP pool, which must not exist before forking;
+    # each worker warms up in post_fork instead.
+    Config.DEFER_WARMUP = True
+
+
+def pre_fork(server, worker):
+    # Move every object allocated so far (model included) out of the GC's
+    # reach, so collections in the workers do not touch and copy those pages.
+    gc.freeze()
+
+    # A replacement worker takes over the CPU slot of the one that exited.
+    taken = {getattr(other, "cpu_slot", None) for other in server.WORKERS.values()}
+    worker.cpu_slot = next(slot for slot in itertools.count() if slot not in taken)
+
+
+def post_fork(server, worker):
+    from utils.runtime import configure_worker
+
+    # Names this worker's duplicate index shard (see cascade.DuplicateLookup)
+    Config.WORKER_INDEX = worker.cpu_slot % workers
+    configure_worker(Config, Config.WORKER_INDEX, workers)
+
+    if preload_app:
+        from app import warm_up
+
+        warm_up()
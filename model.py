@@ -1,11 +1,47 @@
+import os
+import threading
+
+from utils.runtime import forward_pass
+
+MODEL_ID = "Gustking/wav2vec2-large-xlsr-deepfake-audio-classification"
+INFERENCE_BACKENDS = ("pipeline", "quantized", "onnx")
+
+
 class VoiceDetectionModel:
-    def __init__(self, model_path: str, device: str = "cpu"):
+    def __init__(self, model_path: str, device: str = "cpu", max_pad_ratio: float = 1.5,
+                 backend: str = "pipeline", onnx_path: str | None = None,
+                 quantized_path: str | None = None, onnx_threads: int = 0,
+                 model_dir: str | None = None):
         """Initialize a pretrained deepfake detector.
 
         Note: model_path is kept for backward compatibility with existing config,
-        but weights are loaded from Hugging Face at runtime.
+        but weights are loaded from Hugging Face at runtime unless a local copy
+        exists in model_dir.
+
+        Args:
+            model_dir: directory written by scripts.build_model; when present the
+                safetensors weights are memory-mapped from it with no hub lookup
+            backend: "pipeline" (fp32 transformers pipeline), "quantized" (dynamic
+                int8 PyTorch, CPU only) or "onnx" (exported ONNX Runtime graph)
+            onnx_path: ONNX graph written by scripts.export_model (onnx backend)
+            quantized_path: optional pre-quantized module written by
+                scripts.export_model; quantized on load when missing
+            onnx_threads: ONNX Runtime intra-op threads (0 = runtime default)
         """
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend}. Must be one of: {', '.join(INFERENCE_BACKENDS)}")
+
         self.device = device
+        self.max_pad_ratio = max_pad_ratio
+        self.backend = backend
+        self.classifier = None
+        self.session = None
+        self._buffers = threading.local()  # per-thread reusable model inputs
+        self.source = model_dir if model_dir and os.path.isdir(model_dir) else MODEL_ID
+
+        if backend == "onnx":
+            self._load_onnx(onnx_path, onnx_threads)
+            return
 
         # Lazy import to keep module import lightweight.
         from transformers import pipeline
@@ -13,10 +49,79 @@ class VoiceDetectionModel:
         device_arg = 0 if device == "cuda" else -1
         self.classifier = pipeline(
             task="audio-classification",
-            model="Gustking/wav2vec2-large-xlsr-deepfake-audio-classification",
+            model=self.source,
             device=device_arg,
         )
 
+        if backend == "quantized":
+            self.classifier.model = self._load_quantized(quantized_path)
+
+        self.feature_extractor = self.classifier.feature_extractor
+        self.id2label = self.classifier.model.config.id2label
+
+    def _load_quantized(self, quantized_path: str | None):
+        import torch
+
+        if self.device != "cpu":
+            raise ValueError("The quantized backend only runs on CPU")
+
+        if quantized_path and os.path.exists(quantized_path):
+            model = torch.load(quantized_path, map_location="cpu", weights_only=False)
+        else:
+            model = torch.ao.quantization.quantize_dynamic(
+                self.classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        return model.eval()
+
+    def _load_onnx(self, onnx_path: str | None, onnx_threads: int):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoFeatureExtractor
+
+        if not onnx_path or not os.path.exists(onnx_path):
+            raise ValueError(
+                f"ONNX model not found at {onnx_path}. Export it with: python -m scripts.export_model --format onnx"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if onnx_threads > 0:
+            options.intra_op_num_threads = onnx_threads
+
+        providers = ["CPUExecutionProvider"]
+        if self.device == "cuda":
+            providers.insert(0, "CUDAExecutionProvider")
+
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+        self.session_inputs = {node.name for node in self.session.get_inputs()}
+        self.feature_extractor = AutoFeatureExtractor.from_pretrained(self.source)
+        self.id2label = AutoConfig.from_pretrained(self.source).id2label
+
+    @property
+    def version(self) -> str:
+        """Identifies the loaded weights: source, hub revision and, for a local copy, its weights file."""
+        parts = [self.source]
+        if self.classifier is not None:
+            parts.append(getattr(self.classifier.model.config, "_commit_hash", None) or "")
+        weights = os.path.join(self.source, "model.safetensors")
+        if os.path.isfile(weights):
+            stat = os.stat(weights)
+            parts.append(f"{stat.st_size}-{stat.st_mtime_ns}")
+        return "@".join(parts)
+
+    def warmup(self, seconds: float = 1.0):
+        """Run single and batched inference on a synthetic clip.
+
+        Pays one-off graph, kernel and allocator setup before real traffic.
+        """
+        import numpy as np
+
+        sr = self.feature_extractor.sampling_rate
+        clip = (0.01 * np.random.default_rng(0).standard_normal(int(seconds * sr))).astype(np.float32)
+        self.predict(clip, sr, "English")
+        self.predict_batch([clip, clip[: len(clip) // 2]], sr)
+
     def _map_label_to_class(self, label: str) -> str:
         normalized = (label or "").strip().lower()
         if any(token in normalized for token in ["fake", "spoof", "ai", "synth", "generated"]):
@@ -37,14 +142,213 @@ class VoiceDetectionModel:
         Returns:
             Tuple of (classification, confidence_score)
         """
-        # transformers pipeline accepts {"array": np.ndarray, "sampling_rate": int}
-        results = self.classifier({"array": audio_data, "sampling_rate": sr})
+        audio_batch, sr = self._to_model_rate([audio_data], sr)
+        return self._top_prediction(self._forward(audio_batch, sr)[0])
+
+    def predict_batch(self, audio_batch: list, sr: int, languages: list | None = None) -> list:
+        """Predict several clips with padded, batched forward passes.
+
+        Clips are sorted by length and split into groups whose longest clip is at
+        most ``max_pad_ratio`` times the shortest, so padding stays cheap.
+
+        Args:
+            audio_batch: list of 1D float32 numpy arrays in range [-1, 1]
+            sr: sampling rate shared by every clip
+            languages: optional per-clip languages (currently not used by the model)
+
+        Returns:
+            List of (classification, confidence_score) tuples in input order
+        """
+        if not audio_batch:
+            return []
+
+        audio_batch, sr = self._to_model_rate(audio_batch, sr)
+
+        order = sorted(range(len(audio_batch)), key=lambda i: len(audio_batch[i]))
+        groups = []
+        for index in order:
+            if groups and len(audio_batch[index]) <= len(audio_batch[groups[-1][0]]) * self.max_pad_ratio:
+                groups[-1].append(index)
+            else:
+                groups.append([index])
+
+        results = [None] * len(audio_batch)
+        for group in groups:
+            probabilities = self._forward([audio_batch[i] for i in group], sr)
+            for index, row in zip(group, probabilities):
+                results[index] = self._top_prediction(row)
+
+        return results
+
+    def predict_windowed(self, audio_data, sr: int, language: str, window_seconds: float = 10.0,
+                         overlap_seconds: float = 2.0, aggregate: str = "mean", batch_size: int = 4, deadline=None):
+        """Score long audio in overlapping fixed-size windows.
+
+        Windows are sliced as views and scored ``batch_size`` at a time, so peak
+        memory depends on the window and batch size, not on the clip length.
+
+        Args:
+            audio_data: 1D float32 numpy array in range [-1, 1]
+            sr: sampling rate
+            language: one of the supported languages (currently not used by the model)
+            window_seconds: window length
+            overlap_seconds: overlap between consecutive windows
+            aggregate: "mean" or "max" of per-window AI probability, or "vote"
+                (fraction of windows classified as AI)
+            batch_size: windows per forward pass
+            deadline: optional utils.overload.Deadline, checked before each
+                batch of windows so expired requests stop early
+
+        Returns:
+            Tuple of (classification, confidence_score, segments) where segments is a
+            list of {"start", "end", "aiProbability"} dicts with times in seconds
+        """
+        if aggregate not in ("mean", "max", "vote"):
+            raise ValueError(f"Unknown window aggregate: {aggregate}")
+
+        (audio_data,), sr = self._to_model_rate([audio_data], sr)
+        window = max(1, int(window_seconds * sr))
+        hop = window - int(overlap_seconds * sr)
+        if hop <= 0:
+            raise ValueError("Window overlap must be shorter than the window")
+
+        total = len(audio_data)
+        starts = list(range(0, max(total - window, 0) + 1, hop))
+        if starts[-1] + window < total:
+            # Last window is aligned to the end so the tail is always scored.
+            starts.append(total - window)
+
+        segments = []
+        for offset in range(0, len(starts), batch_size):
+            if deadline is not None:
+                deadline.check("inference")
+            batch_starts = starts[offset:offset + batch_size]
+            probabilities = self._forward([audio_data[start:start + window] for start in batch_starts], sr)
+            for start, row in zip(batch_starts, probabilities):
+                segments.append({
+                    "start": round(start / sr, 2),
+                    "end": round(min(start + window, total) / sr, 2),
+                    "aiProbability": round(self._ai_probability(row), 4),
+                })
+
+        scores = [segment["aiProbability"] for segment in segments]
+        if aggregate == "max":
+            ai_probability = max(scores)
+        elif aggregate == "vote":
+            ai_probability = sum(score >= 0.5 for score in scores) / len(scores)
+        else:
+            ai_probability = sum(scores) / len(scores)
+
+        if ai_probability >= 0.5:
+            return "AI_GENERATED", ai_probability, segments
+        return "HUMAN", 1.0 - ai_probability, segments
+
+    def _to_model_rate(self, audio_batch: list, sr: int) -> tuple:
+        """Resample clips to the feature extractor's sampling rate if needed."""
+        target_sr = self.feature_extractor.sampling_rate
+        if sr == target_sr:
+            return audio_batch, sr
+
+        import librosa
+
+        return [librosa.resample(audio, orig_sr=sr, target_sr=target_sr) for audio in audio_batch], target_sr
+
+    def _normalize_into(self, audio_data, out):
+        """Apply the feature extractor's zero-mean, unit-variance normalization, writing only ``out``."""
+        import numpy as np
+
+        if getattr(self.feature_extractor, "do_normalize", False):
+            np.subtract(audio_data, np.float32(np.mean(audio_data, dtype=np.float32)), out=out)
+            # The values are centred, so the variance is a dot product (no temporary array).
+            variance = float(np.dot(out, out)) / max(len(out), 1)
+            out *= np.float32(1.0 / np.sqrt(variance + 1e-7))
+        else:
+            np.copyto(out, audio_data)
+
+    def _thread_buffer(self, name: str, size: int, dtype) -> "np.ndarray":
+        """This thread's reusable flat buffer, grown to the largest size seen."""
+        import numpy as np
+
+        buffer = getattr(self._buffers, name, None)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=dtype)
+            setattr(self._buffers, name, buffer)
+        return buffer[:size]
+
+    def _batch_inputs(self, audio_batch: list, with_mask: bool) -> tuple:
+        """Padded model inputs for a group of clips, in this thread's reusable buffers.
+
+        Replaces the transformers feature extractor, which copies every clip
+        several times (lists, padding, normalization, dtype and tensor
+        conversion): each clip is normalized straight into its row and the
+        padding is zeroed, as the feature extractor does with an attention mask.
+
+        Returns:
+            Tuple of (input_values, attention_mask) arrays of shape
+            (clips, longest clip); attention_mask is None unless with_mask
+        """
+        import numpy as np
+
+        rows, width = len(audio_batch), max(len(audio) for audio in audio_batch)
+        values = self._thread_buffer("input_values", rows * width, np.float32).reshape(rows, width)
+        for row, audio in zip(values, audio_batch):
+            self._normalize_into(audio, row[:len(audio)])
+            row[len(audio):] = 0.0
+
+        mask = None
+        if with_mask:
+            mask = self._thread_buffer("attention_mask", rows * width, np.int64).reshape(rows, width)
+            for row, audio in zip(mask, audio_batch):
+                row[:len(audio)] = 1
+                row[len(audio):] = 0
+        return values, mask
+
+    def _forward(self, audio_batch: list, sr: int):
+        """Run one padded forward pass and return per-clip class probabilities.
+
+        Used for single clips, scheduler batches and windows alike: the inputs
+        reach the model as zero-copy tensor (or ONNX input) views of the
+        per-thread buffers.
+        """
+        if self.session is not None:
+            input_values, mask = self._batch_inputs(audio_batch, "attention_mask" in self.session_inputs)
+            feed = {"input_values": input_values}
+            if mask is not None:
+                feed["attention_mask"] = mask
+            with forward_pass():
+                return self._softmax(self.session.run(["logits"], feed)[0])
+
+        import torch
+
+        input_values, mask = self._batch_inputs(
+            audio_batch, getattr(self.feature_extractor, "return_attention_mask", False)
+        )
+        inputs = {"input_values": torch.from_numpy(input_values).to(self.classifier.device)}
+        if mask is not None:
+            inputs["attention_mask"] = torch.from_numpy(mask).to(self.classifier.device)
+
+        with forward_pass():
+            logits = self.classifier.model(**inputs).logits
+
+        return torch.softmax(logits.float(), dim=-1).cpu().numpy()
+
+    @staticmethod
+    def _softmax(logits):
+        import numpy as np
 
-        if not results:
-            return "AI_GENERATED", 0.5
+        logits = logits.astype(np.float32)
+        logits -= logits.max(axis=-1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=-1, keepdims=True)
 
-        top = results[0]
-        classification = self._map_label_to_class(top.get("label"))
-        confidence = float(top.get("score", 0.0))
+    def _top_prediction(self, probabilities) -> tuple:
+        index = int(probabilities.argmax())
+        classification = self._map_label_to_class(self.id2label.get(index, str(index)))
+        return classification, float(probabilities[index])
 
-        return classification, confidence
+    def _ai_probability(self, probabilities) -> float:
+        """Total probability of every label that maps to AI_GENERATED."""
+        return float(sum(
+            probability for index, probability in enumerate(probabilities)
+            if self._map_label_to_class(self.id2label.get(index, str(index))) == "AI_GENERATED"
+        ))
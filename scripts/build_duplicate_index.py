@@ -0,0 +1,75 @@
+"""Build the near-duplicate index from bulk scoring results and stored embeddings.
+
+Joins the JSONL output of scripts.score_bulk with the embedding store (filled
+by scripts.extract_embeddings or the /api/voice-embedding endpoint) on the
+clip key and writes every scored clip with its verdict to
+DUPLICATE_INDEX_PATH, which the API loads at startup when
+DUPLICATE_LOOKUP_ENABLED is set. Clips without a stored embedding are skipped.
+
+Usage (from the repository root):
+    python -m scripts.extract_embeddings /data/archive
+    python -m scripts.score_bulk /data/archive --output results.jsonl
+    python -m scripts.build_duplicate_index results.jsonl
+"""
+import argparse
+import json
+
+from config import Config
+from utils.embedding_store import EmbeddingStore
+from utils.vector_index import VectorIndex
+
+
+def read_verdicts(path: str) -> dict:
+    """Map clip key to (classification, confidence) for every successful record."""
+    verdicts = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("status") == "success" and record.get("key"):
+                verdicts[record["key"]] = (record["classification"], float(record["confidenceScore"]))
+    return verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("results", help="JSONL output of scripts.score_bulk")
+    parser.add_argument("--store", default=Config.EMBEDDING_STORE_PATH, help="Embedding store directory")
+    parser.add_argument("--output", default=Config.DUPLICATE_INDEX_PATH, help="Index file to write")
+    parser.add_argument("--nlist", type=int, default=Config.DUPLICATE_INDEX_NLIST)
+    parser.add_argument("--pq-m", type=int, default=Config.DUPLICATE_INDEX_PQ_M)
+    parser.add_argument("--nprobe", type=int, default=Config.DUPLICATE_INDEX_NPROBE)
+    args = parser.parse_args()
+
+    if not args.store or not args.output:
+        raise SystemExit("Set EMBEDDING_STORE_PATH / DUPLICATE_INDEX_PATH or pass --store and --output")
+
+    verdicts = read_verdicts(args.results)
+    store = EmbeddingStore.open(args.store)
+    keys, _, matrix = store.items()
+
+    index = VectorIndex(store.dim, nlist=args.nlist, pq_m=args.pq_m, nprobe=args.nprobe)
+    rows = [row for row, key in enumerate(keys) if key in verdicts]
+    # Add in chunks so float16 rows are converted a slice at a time
+    for start in range(0, len(rows), 10000):
+        chunk = rows[start:start + 10000]
+        index.add(
+            matrix[chunk],
+            [keys[row] for row in chunk],
+            [{"classification": verdicts[keys[row]][0], "confidence": verdicts[keys[row]][1]} for row in chunk]
+        )
+    index.save(args.output)
+
+    print(json.dumps({
+        "scored_clips": len(verdicts),
+        "stored_embeddings": len(keys),
+        "indexed": len(index),
+        "missing_embeddings": len(verdicts) - len(index),
+        "trained": index.trained,
+        "output": args.output,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Bake the deepfake classifier into a local directory for fast cold starts.
+
+Writes the weights as safetensors together with the config and feature
+extractor, so the server memory-maps them from LOCAL_MODEL_DIR with no
+Hugging Face hub resolution at startup.
+
+Usage (from the repository root):
+    python -m scripts.build_model
+    python -m scripts.build_model --output /path/to/model-dir
+"""
+import argparse
+import os
+
+from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+
+from config import Config
+from model import MODEL_ID
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=Config.LOCAL_MODEL_DIR, help="Output directory (defaults to LOCAL_MODEL_DIR)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    AutoModelForAudioClassification.from_pretrained(MODEL_ID).save_pretrained(args.output, safe_serialization=True)
+    AutoFeatureExtractor.from_pretrained(MODEL_ID).save_pretrained(args.output)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
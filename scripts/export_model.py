@@ -0,0 +1,75 @@
+"""Export the deepfake classifier for the quantized and ONNX inference backends.
+
+Usage (from the repository root):
+    python -m scripts.export_model --format onnx
+    python -m scripts.export_model --format onnx --int8
+    python -m scripts.export_model --format quantized
+"""
+import argparse
+import os
+
+import torch
+from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+
+from config import Config
+from model import MODEL_ID
+
+
+def export_onnx(output: str, int8: bool, opset: int):
+    model = AutoModelForAudioClassification.from_pretrained(MODEL_ID).eval()
+    feature_extractor = AutoFeatureExtractor.from_pretrained(MODEL_ID)
+    use_attention_mask = getattr(feature_extractor, "return_attention_mask", False)
+
+    # Two clips of one second each; batch and length axes are exported as dynamic.
+    dummy = torch.zeros(2, feature_extractor.sampling_rate, dtype=torch.float32)
+    inputs = (dummy, torch.ones(dummy.shape, dtype=torch.int64)) if use_attention_mask else (dummy,)
+    input_names = ["input_values", "attention_mask"] if use_attention_mask else ["input_values"]
+    dynamic_axes = {name: {0: "batch", 1: "samples"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = output if not int8 else output.replace(".onnx", "-fp32.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            inputs,
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    print(f"Wrote {fp32_path}")
+
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(fp32_path, output, weight_type=QuantType.QInt8)
+        print(f"Wrote {output}")
+
+
+def export_quantized(output: str):
+    model = AutoModelForAudioClassification.from_pretrained(MODEL_ID).eval()
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    torch.save(quantized, output)
+    print(f"Wrote {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=["onnx", "quantized"], required=True)
+    parser.add_argument("--output", help="Output path (defaults to ONNX_MODEL_PATH / QUANTIZED_MODEL_PATH)")
+    parser.add_argument("--int8", action="store_true", help="Also apply ONNX Runtime dynamic int8 quantization")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    output = args.output or (Config.ONNX_MODEL_PATH if args.format == "onnx" else Config.QUANTIZED_MODEL_PATH)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    if args.format == "onnx":
+        export_onnx(output, args.int8, args.opset)
+    else:
+        export_quantized(output)
+
+
+if __name__ == "__main__":
+    main()
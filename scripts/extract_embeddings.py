@@ -0,0 +1,130 @@
+"""Extract WavLM clip embeddings in bulk into the embedding store.
+
+Reads a directory tree or CSV/JSONL manifest like scripts.score_bulk and
+decodes in the same process pool. Embeddings are computed in padded,
+length-sorted batches and stored under the clip's content hash, the key the
+/api/voice-embedding endpoint uses, so clips already in the store are not run
+through the backbone again. --output also exports every processed clip to an
+.npz file (ids, paths, keys, float32 embeddings) for retraining.
+
+Usage (from the repository root):
+    python -m scripts.extract_embeddings /data/archive --workers 8
+    python -m scripts.extract_embeddings manifest.csv --output embeddings.npz
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import Config
+from feature_extraction import FeatureExtractor
+from scripts.score_bulk import decode_entry, init_worker, open_pcm_store, read_entries, resolve_audio
+from utils.embedding_store import EmbeddingStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="Directory of MP3s, or a .csv / .jsonl manifest")
+    parser.add_argument("--store", default=Config.EMBEDDING_STORE_PATH, help="Embedding store directory")
+    parser.add_argument("--output", help="Also write the embeddings to this .npz file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Decode processes")
+    parser.add_argument("--batch-size", type=int, default=Config.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--max-seconds", type=float, default=Config.MAX_AUDIO_LENGTH, help="Longest clip accepted")
+    parser.add_argument("--pcm-store", default=Config.PCM_STORE_PATH, help="PCM store directory (empty = none)")
+    args = parser.parse_args()
+
+    if not args.store and not args.output:
+        raise SystemExit("Nothing to write: set EMBEDDING_STORE_PATH, --store or --output")
+
+    entries = read_entries(args.source, "English")
+    extractor = FeatureExtractor(model_name=Config.WAVLM_MODEL, device=Config.DEVICE)
+    store = None
+    if args.store:
+        store = EmbeddingStore(
+            args.store, dim=extractor.embedding_dim, dtype=Config.EMBEDDING_DTYPE, model_name=Config.WAVLM_MODEL
+        )
+    pcm_store = open_pcm_store(args.pcm_store)
+
+    exported = {"id": [], "path": [], "key": [], "embedding": []}
+    counts = {"computed": 0, "stored": 0, "error": 0}
+    started = time.perf_counter()
+    last_report = started
+
+    pending = deque()
+    remaining = iter(entries)
+    max_in_flight = max(args.batch_size, args.workers) * 2
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(False, args.pcm_store)) as pool:
+        def refill():
+            for entry in remaining:
+                pending.append(pool.submit(decode_entry, entry, args.max_seconds))
+                if len(pending) >= max_in_flight:
+                    break
+
+        refill()
+        done = 0
+        while pending:
+            batch = [pending.popleft().result() for _ in range(min(args.batch_size, len(pending)))]
+            refill()
+            done += len(batch)
+
+            counts["error"] += sum(1 for item in batch if "error" in item)
+            batch = [item for item in batch if "error" not in item]
+            embeddings = {}
+            if store is not None:
+                for item in batch:
+                    vector = store.get(item["key"])
+                    if vector is not None:
+                        embeddings[item["key"]] = vector
+                        counts["stored"] += 1
+
+            missing = [item for item in batch if item["key"] not in embeddings]
+            resolve_audio(missing, pcm_store)
+            vectors = extractor.extract_wavlm_embeddings(
+                [item["audio"] for item in missing], Config.SAMPLE_RATE, batch_size=args.batch_size
+            )
+            for item, vector in zip(missing, vectors):
+                embeddings[item["key"]] = vector
+                if store is not None:
+                    store.put(item["key"], vector, info=item["id"])
+            counts["computed"] += len(missing)
+
+            if args.output:
+                for item in batch:
+                    exported["id"].append(item["id"])
+                    exported["path"].append(item["path"])
+                    exported["key"].append(item["key"])
+                    exported["embedding"].append(embeddings[item["key"]])
+
+            now = time.perf_counter()
+            if now - last_report >= 10 or not pending:
+                print(f"{done}/{len(entries)} clips | {done / (now - started):.1f} clips/s | {counts}")
+                last_report = now
+
+    if args.output:
+        np.savez(
+            args.output,
+            ids=np.array(exported["id"]),
+            paths=np.array(exported["path"]),
+            keys=np.array(exported["key"]),
+            embeddings=np.stack(exported["embedding"]).astype(np.float32) if exported["embedding"]
+            else np.zeros((0, extractor.embedding_dim), dtype=np.float32),
+        )
+        print(f"Wrote {args.output}")
+
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "clips": len(entries),
+        **counts,
+        "seconds": round(elapsed, 2),
+        "clips_per_second": round(len(entries) / max(elapsed, 1e-9), 2),
+        "store": store.stats() if store is not None else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
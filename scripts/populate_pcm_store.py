@@ -0,0 +1,75 @@
+"""Pre-decode a directory (or manifest) of MP3s into the PCM store.
+
+Clips already in the store are skipped, so the tool can be rerun to top up a
+store after new files arrive.
+
+Usage (from the repository root):
+    python -m scripts.populate_pcm_store /data/archive --workers 8
+    python -m scripts.populate_pcm_store manifest.csv --store /var/cache/pcm
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config
+from scripts.score_bulk import open_pcm_store, read_entries
+
+_worker = {}
+
+
+def _init_worker(store_path: str):
+    from utils.audio_processor import AudioProcessor
+
+    _worker["processor"] = AudioProcessor(target_sr=Config.SAMPLE_RATE, decoder=Config.AUDIO_DECODER)
+    _worker["pcm_store"] = open_pcm_store(store_path)
+
+
+def _populate(path: str) -> str:
+    from utils.pcm_store import content_key
+
+    try:
+        with open(path, "rb") as f:
+            audio_bytes = f.read()
+        key = content_key(audio_bytes)
+        if key in _worker["pcm_store"]:
+            return "skipped"
+        audio_data, _ = _worker["processor"].load_audio_from_bytes(audio_bytes)
+        return "stored" if _worker["pcm_store"].put(key, audio_data) else "too_large"
+    except Exception as e:
+        print(f"{path}: {str(e)}")
+        return "error"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="Directory of MP3s, or a .csv / .jsonl manifest")
+    parser.add_argument("--store", default=Config.PCM_STORE_PATH, help="PCM store directory (defaults to PCM_STORE_PATH)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if not args.store:
+        raise SystemExit("Set PCM_STORE_PATH or pass --store")
+
+    paths = [path for _, path, _ in read_entries(args.source, "English")]
+    counts = {"stored": 0, "skipped": 0, "too_large": 0, "error": 0}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.store,)) as pool:
+        for done, outcome in enumerate(pool.map(_populate, paths, chunksize=16), start=1):
+            counts[outcome] += 1
+            if done % 1000 == 0:
+                print(f"{done}/{len(paths)} clips | {done / (time.perf_counter() - started):.1f} clips/s")
+
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "clips": len(paths),
+        **counts,
+        "seconds": round(elapsed, 2),
+        "clips_per_second": round(len(paths) / max(elapsed, 1e-9), 2),
+        "store": open_pcm_store(args.store).stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""Score archived MP3s in bulk without going through the HTTP API.
+
+Reads a directory tree of MP3s or a CSV/JSONL manifest (columns/fields:
+path, optional id and language). Clips are decoded, and their handcrafted
+features extracted, in a process pool. The model scores them in batches and
+results stream to JSONL or Parquet in input order.
+
+With a PCM store (--pcm-store, default PCM_STORE_PATH) decoded clips are
+read from and added to it, and workers hand clips to the scorer by key: the
+scorer reads them zero-copy from the memory-mapped store instead of receiving
+them through a pipe.
+
+A checkpoint next to the output records how far the run got, so an
+interrupted run picks up where it stopped when started again with the same
+arguments (pass --restart to start over).
+
+Usage (from the repository root):
+    python -m scripts.score_bulk /data/archive --output results.jsonl
+    python -m scripts.score_bulk manifest.csv --output results.parquet --workers 8 --explain
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config
+
+# Per-process components, created once by init_worker.
+_worker = {}
+
+
+def read_entries(source: str, language: str) -> list:
+    """List (id, path, language) for a directory tree or a CSV/JSONL manifest, in a stable order."""
+    if os.path.isdir(source):
+        paths = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(".mp3"))
+        return [(os.path.relpath(path, source), path, language) for path in paths]
+
+    base = os.path.dirname(os.path.abspath(source))
+    if source.endswith(".jsonl"):
+        with open(source) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    elif source.endswith(".csv"):
+        with open(source, newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        raise SystemExit(f"Unsupported source: {source} (expected a directory, .csv or .jsonl manifest)")
+
+    entries = []
+    for row in rows:
+        path = row["path"] if os.path.isabs(row["path"]) else os.path.join(base, row["path"])
+        entries.append((row.get("id") or row["path"], path, row.get("language") or language))
+    return entries
+
+
+def open_pcm_store(path: str):
+    from utils.pcm_store import PcmStore
+
+    if not path:
+        return None
+    return PcmStore(
+        path,
+        max_bytes=int(Config.PCM_STORE_MAX_MB * 1024 * 1024),
+        segment_bytes=int(Config.PCM_STORE_SEGMENT_MB * 1024 * 1024),
+        dtype=Config.PCM_STORE_DTYPE,
+        sample_rate=Config.SAMPLE_RATE
+    )
+
+
+def init_worker(explain: bool, pcm_store_path: str):
+    from feature_extraction import FeatureExtractor
+    from utils.audio_processor import AudioProcessor
+
+    _worker["processor"] = AudioProcessor(target_sr=Config.SAMPLE_RATE, decoder=Config.AUDIO_DECODER)
+    _worker["features"] = FeatureExtractor(device="cpu", enable_wavlm=False) if explain else None
+    _worker["pcm_store"] = open_pcm_store(pcm_store_path)
+
+
+def _decode_file(path: str, processor, pcm_store) -> tuple:
+    """Decode one file, through the PCM store when there is one.
+
+    Returns:
+        Tuple of (audio, sr, content key, whether the clip is in the PCM store)
+    """
+    from utils.pcm_store import content_key
+
+    with open(path, "rb") as f:
+        audio_bytes = f.read()
+    key = content_key(audio_bytes)
+    if pcm_store is None:
+        return (*processor.load_audio_from_bytes(audio_bytes), key, False)
+
+    audio_data = pcm_store.get(key)
+    if audio_data is not None:
+        return audio_data, Config.SAMPLE_RATE, key, True
+
+    audio_data, sr = processor.load_audio_from_bytes(audio_bytes)
+    return audio_data, sr, key, pcm_store.put(key, audio_data)
+
+
+def decode_entry(entry: tuple, max_seconds: float) -> dict:
+    """Decode one clip (and extract its features) in a worker set up by init_worker."""
+    item_id, path, language = entry
+    item = {"id": item_id, "path": path, "language": language}
+    try:
+        processor = _worker["processor"]
+        audio_data, sr, key, stored = _decode_file(path, processor, _worker["pcm_store"])
+        processor.validate_audio_duration(
+            audio_data, sr, min_duration=Config.MIN_AUDIO_LENGTH, max_duration=max_seconds
+        )
+        item["key"], item["sr"] = key, sr
+        if _worker["features"] is not None:
+            item["features"] = _worker["features"].extract_handcrafted_features(
+                audio_data, sr, max_seconds=Config.FEATURE_MAX_SECONDS
+            )
+        # Stored clips go back by key; the scorer maps them instead of unpickling a copy.
+        if stored:
+            item["in_pcm_store"] = True
+        else:
+            item["audio"] = audio_data
+    except Exception as e:
+        item["error"] = str(e)
+    return item
+
+
+def resolve_audio(items: list, pcm_store):
+    """Attach audio to items that came back by PCM store key."""
+    for item in items:
+        if not item.get("in_pcm_store"):
+            continue
+        item["audio"] = pcm_store.get(item["key"])
+        if item["audio"] is None:
+            # Evicted since the worker stored it; decode again here.
+            from utils.audio_processor import AudioProcessor
+
+            processor = AudioProcessor(target_sr=Config.SAMPLE_RATE, decoder=Config.AUDIO_DECODER)
+            item["audio"], item["sr"], _, _ = _decode_file(item["path"], processor, None)
+
+
+class JsonlSink:
+    """Appends one JSON object per line; resumes by truncating to the checkpointed size."""
+
+    def __init__(self, path: str, state: dict | None):
+        if state:
+            self.file = open(path, "r+b")
+            self.file.truncate(state["output_bytes"])
+            self.file.seek(state["output_bytes"])
+        else:
+            self.file = open(path, "wb")
+
+    def write(self, records: list):
+        self.file.write("".join(json.dumps(record) + "\n" for record in records).encode("utf-8"))
+
+    def flush(self) -> dict:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {"output_bytes": self.file.tell()}
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Writes one part file per flush into a directory; resumes by dropping unflushed parts."""
+
+    def __init__(self, path: str, state: dict | None):
+        import pyarrow  # noqa: F401  (fail fast when the optional dependency is missing)
+
+        self.path = path
+        self.parts = state["parts"] if state else 0
+        self.rows = []
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.startswith("part-") and int(name[5:10]) >= self.parts:
+                os.remove(os.path.join(path, name))
+
+    def write(self, records: list):
+        self.rows.extend(records)
+
+    def flush(self) -> dict:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.rows:
+            pq.write_table(pa.Table.from_pylist(self.rows), os.path.join(self.path, f"part-{self.parts:05d}.parquet"))
+            self.parts += 1
+            self.rows = []
+        return {"parts": self.parts}
+
+    def close(self):
+        pass
+
+
+def load_checkpoint(path: str, source: str, total: int) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint["source"] != os.path.abspath(source) or checkpoint["total"] != total:
+        raise SystemExit(f"Checkpoint {path} belongs to a different input; pass --restart to start over")
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+class BulkScorer:
+    """Scores decoded clips in batches with the same components as the API."""
+
+    def __init__(self, batch_size: int, explain: bool):
+        from model import VoiceDetectionModel
+        from utils.explanation_generator import ExplanationGenerator
+        from utils.runtime import configure_worker
+
+        configure_worker(Config)
+        self.model = VoiceDetectionModel(
+            model_path=Config.MODEL_PATH,
+            device=Config.DEVICE,
+            backend=Config.INFERENCE_BACKEND,
+            onnx_path=Config.ONNX_MODEL_PATH,
+            quantized_path=Config.QUANTIZED_MODEL_PATH,
+            onnx_threads=Config.ONNX_INTRA_OP_THREADS,
+            model_dir=Config.LOCAL_MODEL_DIR
+        )
+        self.explanation_generator = ExplanationGenerator() if explain else None
+        self.batch_size = batch_size
+
+    def score(self, items: list) -> list:
+        """Return one output record per item, in order."""
+        records = [{"id": item["id"], "path": item["path"], "language": item["language"]} for item in items]
+        clips = [index for index, item in enumerate(items) if "error" not in item]
+
+        long_clips = {
+            index for index in clips
+            if Config.WINDOWED_INFERENCE and len(items[index]["audio"]) / items[index]["sr"] > Config.WINDOWED_MIN_SECONDS
+        }
+        for index in sorted(long_clips):
+            item = items[index]
+            classification, confidence, segments = self.model.predict_windowed(
+                item["audio"], item["sr"], item["language"],
+                window_seconds=Config.WINDOW_SECONDS,
+                overlap_seconds=Config.WINDOW_OVERLAP_SECONDS,
+                aggregate=Config.WINDOW_AGGREGATE,
+                batch_size=Config.WINDOW_BATCH_SIZE
+            )
+            records[index].update(self._result(item, classification, confidence), segments=segments)
+
+        short_clips = [index for index in clips if index not in long_clips]
+        for start in range(0, len(short_clips), self.batch_size):
+            group = short_clips[start:start + self.batch_size]
+            predictions = self.model.predict_batch(
+                [items[index]["audio"] for index in group], Config.SAMPLE_RATE, [items[index]["language"] for index in group]
+            )
+            for index, (classification, confidence) in zip(group, predictions):
+                records[index].update(self._result(items[index], classification, confidence))
+
+        for record, item in zip(records, items):
+            if "error" in item:
+                record.update(status="error", message=item["error"])
+        return records
+
+    def _result(self, item: dict, classification: str, confidence: float) -> dict:
+        result = {
+            "status": "success",
+            "key": item["key"],
+            "classification": classification,
+            "confidenceScore": round(float(confidence), 4),
+            "durationSeconds": round(len(item["audio"]) / item["sr"], 2),
+        }
+        if self.explanation_generator is not None:
+            result["explanation"] = self.explanation_generator.generate_explanation(
+                classification, confidence, item["features"]
+            )
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="Directory of MP3s, or a .csv / .jsonl manifest")
+    parser.add_argument("--output", required=True, help="Results file: .jsonl, or .parquet (a directory of part files)")
+    parser.add_argument("--language", default="English", help="Language for entries that do not name one")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Decode processes")
+    parser.add_argument("--batch-size", type=int, default=Config.BATCH_MAX_SIZE)
+    parser.add_argument("--max-seconds", type=float, default=Config.MAX_AUDIO_LENGTH, help="Longest clip accepted")
+    parser.add_argument("--explain", action="store_true", help="Extract features and include explanations")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="Clips between checkpoints")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--pcm-store", default=Config.PCM_STORE_PATH, help="PCM store directory (empty = none)")
+    args = parser.parse_args()
+
+    entries = read_entries(args.source, args.language)
+    checkpoint_path = args.output + ".checkpoint"
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = load_checkpoint(checkpoint_path, args.source, len(entries))
+    start_index = checkpoint["next_index"] if checkpoint else 0
+
+    sink_class = ParquetSink if args.output.endswith(".parquet") else JsonlSink
+    sink = sink_class(args.output, checkpoint["sink"] if checkpoint else None)
+    scorer = BulkScorer(args.batch_size, args.explain)
+    pcm_store = open_pcm_store(args.pcm_store)
+    print(f"{len(entries)} clips, resuming at {start_index}" if start_index else f"{len(entries)} clips")
+
+    started = time.perf_counter()
+    last_report = started
+    done, audio_seconds, errors = 0, 0.0, 0
+    next_index = start_index
+    since_checkpoint = 0
+
+    # Decoding runs ahead of inference, but only by a bounded number of clips.
+    pending = deque()
+    remaining = iter(entries[start_index:])
+    max_in_flight = max(args.batch_size, args.workers) * 2
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(args.explain, args.pcm_store)) as pool:
+        def refill():
+            for entry in remaining:
+                pending.append(pool.submit(decode_entry, entry, args.max_seconds))
+                if len(pending) >= max_in_flight:
+                    break
+
+        refill()
+        while pending:
+            batch = [pending.popleft().result() for _ in range(min(args.batch_size, len(pending)))]
+            refill()
+
+            resolve_audio(batch, pcm_store)
+            records = scorer.score(batch)
+            sink.write(records)
+
+            next_index += len(batch)
+            done += len(batch)
+            since_checkpoint += len(batch)
+            errors += sum(1 for record in records if record["status"] == "error")
+            audio_seconds += sum(len(item["audio"]) / item["sr"] for item in batch if "audio" in item)
+
+            if since_checkpoint >= args.checkpoint_every or not pending:
+                save_checkpoint(checkpoint_path, {
+                    "source": os.path.abspath(args.source),
+                    "total": len(entries),
+                    "next_index": next_index,
+                    "sink": sink.flush(),
+                })
+                since_checkpoint = 0
+
+            now = time.perf_counter()
+            if now - last_report >= 10 or not pending:
+                elapsed = now - started
+                rate = done / elapsed
+                eta = (len(entries) - next_index) / rate if rate else 0.0
+                print(
+                    f"{next_index}/{len(entries)} clips ({errors} errors) | {rate:.1f} clips/s | "
+                    f"{audio_seconds / elapsed:.1f}x realtime | ETA {eta / 60:.1f} min"
+                )
+                last_report = now
+
+    sink.close()
+    print(json.dumps({
+        "clips": done,
+        "errors": errors,
+        "seconds": round(time.perf_counter() - started, 2),
+        "clips_per_second": round(done / max(time.perf_counter() - started, 1e-9), 2),
+        "output": args.output,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
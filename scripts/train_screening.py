@@ -0,0 +1,115 @@
+"""Train and calibrate the cascade's screening model on locally labelled clips.
+
+Clips are read from <clips dir>/human/**/*.mp3 and <clips dir>/ai/**/*.mp3.
+Thresholds are calibrated on out-of-fold probabilities: each is pushed as far
+as possible while the clips it decides keep at least --target-precision.
+
+Usage (from the repository root):
+    python -m scripts.train_screening data/labelled
+    python -m scripts.train_screening data/labelled --model gbm --target-precision 0.99
+"""
+import argparse
+import glob
+import json
+import os
+
+import joblib
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from cascade import feature_vector
+from config import Config
+from feature_extraction import FeatureExtractor
+from utils.audio_processor import AudioProcessor
+
+LABELS = {"human": 0, "ai": 1}
+
+
+def load_dataset(directory: str) -> tuple:
+    processor = AudioProcessor(target_sr=Config.SAMPLE_RATE, decoder=Config.AUDIO_DECODER)
+    extractor = FeatureExtractor(device="cpu", enable_wavlm=False)
+
+    vectors, labels = [], []
+    for name, label in LABELS.items():
+        paths = sorted(glob.glob(os.path.join(directory, name, "**", "*.mp3"), recursive=True))
+        for path in paths:
+            with open(path, "rb") as f:
+                audio_data, sr = processor.load_audio_from_bytes(f.read())
+            features = extractor.extract_handcrafted_features(audio_data, sr, max_seconds=Config.FEATURE_MAX_SECONDS)
+            vectors.append(feature_vector(features))
+            labels.append(label)
+        print(f"{name}: {len(paths)} clips")
+
+    return np.stack(vectors), np.array(labels)
+
+
+def build_estimator(kind: str):
+    if kind == "gbm":
+        return HistGradientBoostingClassifier(max_iter=200, learning_rate=0.1)
+    return make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000, class_weight="balanced"))
+
+
+def calibrate_threshold(probabilities: np.ndarray, correct: np.ndarray, target: float, descending: bool) -> tuple:
+    """Loosest threshold whose decided clips reach ``target`` precision.
+
+    Returns:
+        Tuple of (threshold, number of clips decided); the threshold is None
+        when no prefix reaches the target
+    """
+    order = np.argsort(-probabilities if descending else probabilities, kind="stable")
+    precision = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+    passing = np.flatnonzero(precision >= target)
+    if passing.size == 0:
+        return None, 0
+    k = int(passing[-1])
+    return float(probabilities[order[k]]), k + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clips", help="Directory with human/ and ai/ subdirectories of MP3 clips")
+    parser.add_argument("--model", choices=["logistic", "gbm"], default="logistic")
+    parser.add_argument("--target-precision", type=float, default=0.98)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--output", default=Config.SCREENING_MODEL_PATH, help="Output path (defaults to SCREENING_MODEL_PATH)")
+    args = parser.parse_args()
+
+    X, y = load_dataset(args.clips)
+    if len(set(y.tolist())) < 2:
+        raise SystemExit("Need labelled clips in both human/ and ai/")
+
+    folds = StratifiedKFold(n_splits=min(args.folds, int(np.bincount(y).min())), shuffle=True, random_state=0)
+    probabilities = cross_val_predict(build_estimator(args.model), X, y, cv=folds, method="predict_proba")[:, 1]
+
+    high, ai_decided = calibrate_threshold(probabilities, y == 1, args.target_precision, descending=True)
+    low, human_decided = calibrate_threshold(probabilities, y == 0, args.target_precision, descending=False)
+    high = 1.0 if high is None else high
+    low = 0.0 if low is None else low
+    # Overlapping regions (well separated data): the AI side is checked first anyway.
+    low = min(low, high)
+
+    estimator = build_estimator(args.model).fit(X, y)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    joblib.dump({"estimator": estimator, "low_threshold": low, "high_threshold": high}, args.output)
+
+    decided = (probabilities >= high) | (probabilities <= low)
+    tier_accuracy = float(((probabilities >= high) == (y == 1))[decided].mean()) if decided.any() else None
+    print(json.dumps({
+        "clips": int(len(y)),
+        "model": args.model,
+        "low_threshold": round(low, 4),
+        "high_threshold": round(high, 4),
+        "screening_coverage": round(float(decided.mean()), 4),
+        "screening_accuracy": None if tier_accuracy is None else round(tier_accuracy, 4),
+        "ai_decided": ai_decided,
+        "human_decided": human_decided,
+        "output": args.output,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 import io
 import base64
+import functools
 import librosa
 import numpy as np
 import shutil
+import subprocess
 import os
 
 try:
@@ -10,6 +12,28 @@ try:
 except Exception:
     AudioSegment = None
 
+try:
+    import soundfile as sf
+except Exception:
+    sf = None
+
+
+DECODER_BACKENDS = ("soundfile", "torchaudio", "ffmpeg")
+
+
+def pcm16_to_float32(data, out: np.ndarray | None = None) -> np.ndarray:
+    """Scale little-endian 16-bit PCM bytes to float32 in [-1, 1).
+
+    The bytes are viewed in place with np.frombuffer and scaled in one pass,
+    so the float32 result (written into ``out`` when given) is the only copy.
+    """
+    samples = np.frombuffer(data, dtype="<i2")
+    if out is None:
+        out = np.empty(len(samples), dtype=np.float32)
+    out = out[:len(samples)]
+    np.multiply(samples, np.float32(1.0 / 32768.0), out=out)
+    return out
+
 
 def _find_winget_ffmpeg_exe(exe_name: str) -> str | None:
     base = os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\WinGet\Packages")
@@ -36,10 +60,54 @@ def _find_winget_ffmpeg_exe(exe_name: str) -> str | None:
 
     return None
 
+
+@functools.lru_cache(maxsize=None)
+def resolve_ffmpeg() -> tuple:
+    """Locate ffmpeg/ffprobe once per process and point pydub at them.
+
+    Returns:
+        Tuple of (ffmpeg_path, ffprobe_path); either may be None if not found.
+    """
+    ffmpeg_path = shutil.which("ffmpeg") or _find_winget_ffmpeg_exe("ffmpeg.exe")
+    ffprobe_path = shutil.which("ffprobe") or _find_winget_ffmpeg_exe("ffprobe.exe")
+
+    if ffmpeg_path and not os.path.exists(ffmpeg_path):
+        ffmpeg_path = None
+    if ffprobe_path and not os.path.exists(ffprobe_path):
+        ffprobe_path = None
+
+    if ffmpeg_path or ffprobe_path:
+        bin_dir = os.path.dirname(ffmpeg_path or ffprobe_path)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+    if AudioSegment is not None:
+        if ffmpeg_path:
+            AudioSegment.converter = ffmpeg_path
+        if ffprobe_path:
+            AudioSegment.ffprobe = ffprobe_path
+
+    return ffmpeg_path, ffprobe_path
+
+
 class AudioProcessor:
-    def __init__(self, target_sr=16000):
+    def __init__(self, target_sr=16000, decoder: str = "auto"):
+        """Initialize the audio processor.
+
+        Args:
+            target_sr: sampling rate every decoded clip is resampled to
+            decoder: "auto" (in-process decoders first, ffmpeg as fallback) or one
+                of DECODER_BACKENDS to force a single backend
+        """
+        if decoder != "auto" and decoder not in DECODER_BACKENDS:
+            raise ValueError(f"Unknown audio decoder: {decoder}. Must be 'auto' or one of: {', '.join(DECODER_BACKENDS)}")
+
         self.target_sr = target_sr
-    
+        self.decoder = decoder
+        self.backends = DECODER_BACKENDS if decoder == "auto" else (decoder,)
+
+        # Resolve ffmpeg at startup instead of on every request.
+        if "ffmpeg" in self.backends:
+            resolve_ffmpeg()
+
     def decode_base64_audio(self, audio_base64: str) -> bytes:
         """Decode base64 string to audio bytes"""
         try:
@@ -54,55 +122,72 @@ class AudioProcessor:
             return audio_bytes
         except Exception as e:
             raise ValueError(f"Invalid base64 audio data: {str(e)}")
-    
-    def load_audio_from_bytes(self, audio_bytes: bytes) -> tuple:
-        """Load audio from MP3 bytes.
-        """
-        if AudioSegment is None:
-            raise ValueError(
-                "MP3 decoding is unavailable because pydub is not installed correctly. "
-                "Reinstall dependencies from requirement.txt."
-            )
-
-        ffmpeg_path = shutil.which("ffmpeg") or _find_winget_ffmpeg_exe("ffmpeg.exe")
-        ffprobe_path = shutil.which("ffprobe") or _find_winget_ffmpeg_exe("ffprobe.exe")
 
-        if ffmpeg_path and not os.path.exists(ffmpeg_path):
-            ffmpeg_path = None
-        if ffprobe_path and not os.path.exists(ffprobe_path):
-            ffprobe_path = None
-
-        if ffmpeg_path or ffprobe_path:
-            bin_dir = os.path.dirname(ffmpeg_path or ffprobe_path)
-            os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
-        if ffmpeg_path:
-            AudioSegment.converter = ffmpeg_path
-        if ffprobe_path:
-            AudioSegment.ffprobe = ffprobe_path
+    def load_audio_from_bytes(self, audio_bytes: bytes) -> tuple:
+        """Load audio from MP3 bytes as mono float32 PCM at target_sr.
 
-        if not ffmpeg_path or not ffprobe_path:
-            raise ValueError(
-                "MP3 decoding requires ffmpeg and ffprobe on PATH, but they were not found. "
+        Backends are tried in order; the ffmpeg subprocess path is only used
+        when the in-process decoders are unavailable or fail.
+        """
+        errors = []
+        for backend in self.backends:
+            try:
+                audio_data = getattr(self, f"_decode_{backend}")(audio_bytes)
+            except Exception as e:
+                errors.append(f"{backend}: {str(e)}")
+                continue
+            return audio_data, self.target_sr
+
+        raise ValueError("; ".join(errors))
+
+    def _resample(self, audio_data: np.ndarray, sr: int) -> np.ndarray:
+        if sr != self.target_sr:
+            audio_data = librosa.resample(audio_data, orig_sr=sr, target_sr=self.target_sr, res_type="soxr_hq")
+        return np.ascontiguousarray(audio_data, dtype=np.float32)
+
+    def _decode_soundfile(self, audio_bytes: bytes) -> np.ndarray:
+        if sf is None:
+            raise RuntimeError("soundfile is not installed")
+
+        data, sr = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+        audio_data = data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+        return self._resample(audio_data, sr)
+
+    def _decode_torchaudio(self, audio_bytes: bytes) -> np.ndarray:
+        # Lazy import: torchaudio is heavy and only needed when soundfile fails.
+        import torchaudio
+
+        waveform, sr = torchaudio.load(io.BytesIO(audio_bytes), format="mp3")
+        # .numpy() shares the tensor's memory; only a stereo downmix allocates
+        audio_data = (waveform[0] if waveform.shape[0] == 1 else waveform.mean(dim=0)).numpy()
+        return self._resample(audio_data, sr)
+
+    def _decode_ffmpeg(self, audio_bytes: bytes) -> np.ndarray:
+        ffmpeg_path, _ = resolve_ffmpeg()
+        if not ffmpeg_path:
+            raise RuntimeError(
+                "MP3 decoding requires ffmpeg on PATH, but it was not found. "
                 "Install FFmpeg and/or ensure it is available. If installed via winget, restart the server."
             )
 
+        # ffmpeg downmixes and resamples itself and writes raw 16-bit PCM to a
+        # pipe, which is scaled straight into the float32 result. This replaces
+        # pydub's AudioSegment, which kept several full copies of the clip.
         try:
-            audio_segment = AudioSegment.from_file(io.BytesIO(audio_bytes), format="mp3")
+            completed = subprocess.run(
+                [
+                    ffmpeg_path, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+                    "-f", "s16le", "-ac", "1", "-ar", str(self.target_sr), "pipe:1",
+                ],
+                input=audio_bytes, capture_output=True
+            )
         except FileNotFoundError as e:
-            raise ValueError(
-                "Failed to load audio: ffmpeg/ffprobe executable could not be invoked. "
-                f"ffmpeg_path={ffmpeg_path}, ffprobe_path={ffprobe_path}"
-            ) from e
+            raise RuntimeError(f"ffmpeg executable could not be invoked. ffmpeg_path={ffmpeg_path}") from e
 
-        if audio_segment.channels > 1:
-            audio_segment = audio_segment.set_channels(1)
+        if completed.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {completed.stderr.decode('utf-8', errors='replace').strip()}")
+        return pcm16_to_float32(completed.stdout)
 
-        audio_segment = audio_segment.set_frame_rate(self.target_sr)
-        samples = np.array(audio_segment.get_array_of_samples())
-        audio_data = samples.astype(np.float32) / (1 << 15)
-
-        return audio_data, self.target_sr
-    
     def validate_audio_duration(self, audio_data: np.ndarray, sr: int, 
                                min_duration: float = 1.0, 
                                max_duration: float = 60.0) -> bool:
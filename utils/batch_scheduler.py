@@ -0,0 +1,95 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    """Collects concurrent predict calls and runs them as one batched forward pass.
+
+    Request threads call ``predict`` (same contract as ``VoiceDetectionModel.predict``)
+    and block until a single background worker has scored their clip. The worker
+    waits up to ``max_wait_ms`` after the first queued clip, or until
+    ``max_batch_size`` clips are queued, then hands the whole batch to
+    ``model.predict_batch`` and fans the results back out.
+    """
+
+    def __init__(self, model, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, audio_data, sr: int, language: str) -> Future:
+        """Queue one clip for scoring and return a future for its prediction."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((audio_data, sr, language, future))
+        return future
+
+    def predict(self, audio_data, sr: int, language: str, timeout: float | None = None):
+        """Blocking drop-in replacement for ``VoiceDetectionModel.predict``."""
+        return self.submit(audio_data, sr, language).result(timeout=timeout)
+
+    def _ensure_worker(self):
+        # The worker is started lazily so the scheduler survives a fork
+        # (threads are not inherited by child processes).
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid != pid:
+                self._queue = queue.Queue()
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+            self._thread.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        # Drop requests whose caller has already given up.
+        return [item for item in batch if item[3].set_running_or_notify_cancel()]
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+
+            by_rate = {}
+            for item in batch:
+                by_rate.setdefault(item[1], []).append(item)
+
+            for sr, items in by_rate.items():
+                try:
+                    results = self.model.predict_batch(
+                        [item[0] for item in items], sr, [item[2] for item in items]
+                    )
+                except Exception as e:
+                    for item in items:
+                        item[3].set_exception(e)
+                    continue
+
+                for item, result in zip(items, results):
+                    item[3].set_result(result)
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+EMBEDDING_DTYPES = ("float16", "float32")
+
+
+class EmbeddingStore:
+    """Clip embeddings as fixed-width rows of one on-disk array, indexed by clip key.
+
+    Vectors are appended to ``vectors.bin`` (float16 by default, half the size
+    of float32) and read back through a memory map; a sqlite index maps each
+    key to its row and records the extra metadata given at insert time. The
+    store is shared by every process on the host, like PcmStore.
+    """
+
+    def __init__(self, path: str, dim: int, dtype: str = "float16", model_name: str = ""):
+        if dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unknown embedding dtype: {dtype}. Must be one of: {', '.join(EMBEDDING_DTYPES)}")
+
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.model_name = model_name
+        self.row_bytes = dim * self.dtype.itemsize
+        self.vectors_path = os.path.join(path, "vectors.bin")
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._mapped = None
+
+        os.makedirs(path, exist_ok=True)
+        self._check_format()
+
+    @classmethod
+    def open(cls, path: str) -> "EmbeddingStore":
+        """Open an existing store with the dimension, dtype and model recorded in it."""
+        index_path = os.path.join(path, "index.sqlite")
+        if not os.path.exists(index_path):
+            raise ValueError(f"No embedding store at {path}")
+
+        conn = sqlite3.connect(index_path)
+        try:
+            meta = dict(conn.execute("SELECT name, value FROM meta").fetchall())
+        finally:
+            conn.close()
+        return cls(path, dim=int(meta["dim"]), dtype=meta["dtype"], model_name=meta["model"])
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process; sqlite connections must not cross a fork.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.path, "index.sqlite"), timeout=10.0,
+                                   check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, row INTEGER UNIQUE NOT NULL, info TEXT, created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _check_format(self):
+        expected = {"dim": str(self.dim), "dtype": self.dtype.name, "model": self.model_name}
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for name, value in expected.items():
+                    conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES (?, ?)", (name, value))
+                stored = dict(conn.execute("SELECT name, value FROM meta").fetchall())
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        if any(stored.get(name) != value for name, value in expected.items()):
+            raise ValueError(f"Embedding store at {self.path} holds {stored}, expected {expected}")
+
+    def _matrix(self, rows: int) -> np.ndarray:
+        """Read-only (rows, dim) view of the vectors file, remapped when it has grown."""
+        if self._mapped is None or len(self._mapped) < rows:
+            if rows == 0:
+                return np.zeros((0, self.dim), dtype=self.dtype)
+            self._mapped = np.memmap(self.vectors_path, dtype=self.dtype, mode="r").reshape(-1, self.dim)
+        return self._mapped[:rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Return the stored embedding as float32, or None."""
+        with self._lock:
+            row = self._connection().execute("SELECT row FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            return self._matrix(row[0] + 1)[row[0]].astype(np.float32)
+
+    def put(self, key: str, vector: np.ndarray, info: str | None = None):
+        """Store one embedding; an existing key keeps its first vector."""
+        payload = np.asarray(vector, dtype=self.dtype).reshape(self.dim).tobytes()
+        with self._lock:
+            conn = self._connection()
+            # The write transaction also serializes appends across processes.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone() is None:
+                    row = conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM embeddings").fetchone()[0]
+                    # Rows past the indexed ones are from an aborted write and get overwritten.
+                    with open(self.vectors_path, "r+b" if os.path.exists(self.vectors_path) else "wb") as f:
+                        f.seek(row * self.row_bytes)
+                        f.write(payload)
+                    conn.execute(
+                        "INSERT INTO embeddings (key, row, info, created_at) VALUES (?, ?, ?, ?)",
+                        (key, row, info, time.time()),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def items(self) -> tuple:
+        """Every stored embedding: (keys, infos, read-only (n, dim) matrix) in insertion order."""
+        with self._lock:
+            rows = self._connection().execute("SELECT key, info FROM embeddings ORDER BY row").fetchall()
+            matrix = self._matrix(len(rows))
+        return [key for key, _ in rows], [info for _, info in rows], matrix
+
+    def stats(self) -> dict:
+        return {"entries": len(self), "dim": self.dim, "dtype": self.dtype.name, "model": self.model_name}
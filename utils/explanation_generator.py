@@ -61,3 +61,9 @@ class ExplanationGenerator:
             
             reason = " and ".join(explanations)
             return f"{reason.capitalize()} confirmed"
+
+    def generic_explanation(self, classification: str, confidence: float) -> str:
+        """Explanation without handcrafted features, used when the server sheds load"""
+        if classification == "AI_GENERATED":
+            return "Synthetic voice characteristics detected by the model"
+        return "Natural human speech characteristics confirmed by the model"
@@ -0,0 +1,212 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._function = function
+
+    def set_function(self, function):
+        """Read the value from ``function()`` at scrape time instead of storing it."""
+        self._function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        """Current value, for code that acts on it (e.g. load shedding)."""
+        if self._function is not None:
+            return float(self._function())
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list:
+        if self._function is not None:
+            self.set(self._function())
+        return super().render()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Minimal in-process registry rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "voice_detection_stage_seconds",
+    "Time spent in each detection stage",
+    ["stage", "language", "outcome"],
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "voice_detection_request_seconds",
+    "End-to-end detection request latency",
+    ["endpoint", "language", "outcome"],
+))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "voice_detection_requests_in_flight",
+    "Detection requests currently being processed",
+))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "voice_detection_batch_queue_depth",
+    "Clips waiting for the batch scheduler",
+))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "voice_detection_model_load_seconds",
+    "Time taken to load the detection model at startup",
+))
+REJECTED_REQUESTS = REGISTRY.register(Counter(
+    "voice_detection_rejected_total",
+    "Requests rejected by admission control or deadlines",
+    ["reason"],
+))
+
+
+def outcome_for_status(status_code: int, cache_hit: bool = False) -> str:
+    """Map an HTTP status to the outcome label used by the latency histograms."""
+    if status_code < 400:
+        return "cache_hit" if cache_hit else "success"
+    if status_code == 503:
+        return "unavailable"
+    if status_code < 500:
+        return "client_error"
+    return "server_error"
+
+
+class StageTimer:
+    """Accumulates per-stage wall time for one request (safe across threads)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def record(self, endpoint: str, language: str, outcome: str):
+        """Publish the stage and total timings to the histograms."""
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, stage=name, language=language, outcome=outcome)
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - self.started, endpoint=endpoint, language=language, outcome=outcome
+        )
+
+    def server_timing(self) -> str:
+        """Format the stage timings as a Server-Timing header value (milliseconds)."""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
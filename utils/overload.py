@@ -0,0 +1,125 @@
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+from utils.metrics import REGISTRY, REQUESTS_IN_FLIGHT, Counter, Gauge
+
+DEGRADATION_MODES = ("generic_explanation", "truncated_audio")
+
+DEGRADED_REQUESTS = REGISTRY.register(Counter(
+    "voice_detection_degraded_total",
+    "Detection requests served in a degraded mode under load",
+    ["mode"]
+))
+DEGRADATION_THRESHOLDS = REGISTRY.register(Gauge(
+    "voice_detection_degradation_threshold",
+    "Requests in flight at which each degradation mode starts (0 = disabled)",
+    ["mode"]
+))
+DEADLINE_EXPIRED = REGISTRY.register(Counter(
+    "voice_detection_deadline_expired_total",
+    "Requests abandoned at their deadline, by the stage that was not run",
+    ["stage"]
+))
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded before {stage}")
+        self.stage = stage
+
+
+def request_timeout(header_value, default: float) -> float:
+    """Seconds a request may take: the client's x-request-timeout-ms, capped by the default.
+
+    A default of 0 means no server-side limit, so only the client hint applies.
+    """
+    try:
+        requested = float(header_value) / 1000.0
+    except (TypeError, ValueError):
+        return default
+    if requested <= 0:
+        return default
+    return min(default, requested) if default > 0 else requested
+
+
+class Deadline:
+    """Absolute expiry of one request, checked between pipeline stages.
+
+    Work that has already started is not interrupted; the next stage is
+    simply never started, so an expired request stops using CPU as soon as
+    its current stage returns.
+    """
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.perf_counter() + seconds if seconds > 0 else None
+
+    def remaining(self) -> float | None:
+        """Seconds left (never negative), or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.perf_counter())
+
+    def nearly_spent(self, reserve: float) -> bool:
+        """True when less than ``reserve`` seconds are left."""
+        remaining = self.remaining()
+        return remaining is not None and remaining < reserve
+
+    def check(self, stage: str):
+        """Raise DeadlineExceeded if the deadline passed before ``stage`` starts."""
+        if self.expires_at is not None and time.perf_counter() >= self.expires_at:
+            DEADLINE_EXPIRED.inc(stage=stage)
+            raise DeadlineExceeded(stage)
+
+    def wait(self, future: Future, stage: str):
+        """Result of ``future``, cancelling it (if not yet running) when the deadline passes."""
+        try:
+            return future.result(timeout=self.remaining())
+        except FutureTimeoutError:
+            future.cancel()
+            DEADLINE_EXPIRED.inc(stage=stage)
+            raise DeadlineExceeded(stage)
+
+
+class DegradationPolicy:
+    """Picks the degradation modes to apply from the current load.
+
+    Load is the number of detection requests in flight in this worker. At
+    ``generic_explanation_at`` handcrafted feature extraction is skipped and
+    a generic explanation returned; at ``truncate_at`` only the central
+    ``truncate_seconds`` of each clip are scored. A threshold of 0 disables
+    its mode.
+    """
+
+    def __init__(self, generic_explanation_at: int = 0, truncate_at: int = 0, truncate_seconds: float = 10.0,
+                 load=None):
+        if truncate_seconds <= 0:
+            raise ValueError("Degradation truncate length must be positive")
+
+        self.thresholds = {"generic_explanation": generic_explanation_at, "truncated_audio": truncate_at}
+        self.truncate_seconds = truncate_seconds
+        self._load = load or REQUESTS_IN_FLIGHT.value
+        for mode, threshold in self.thresholds.items():
+            DEGRADATION_THRESHOLDS.set(threshold, mode=mode)
+
+    def modes(self) -> list:
+        """Modes whose threshold the current load has reached."""
+        enabled = [mode for mode, threshold in self.thresholds.items() if threshold > 0]
+        if not enabled:
+            return []
+        load = self._load()
+        return [mode for mode in enabled if load >= self.thresholds[mode]]
+
+    def truncate(self, audio_data: np.ndarray, sr: int) -> np.ndarray:
+        """Central truncate_seconds of the clip, as a view."""
+        length = int(self.truncate_seconds * sr)
+        if len(audio_data) <= length:
+            return audio_data
+        start = (len(audio_data) - length) // 2
+        return audio_data[start:start + length]
+
+    @staticmethod
+    def record(modes: list):
+        for mode in modes:
+            DEGRADED_REQUESTS.inc(mode=mode)
@@ -0,0 +1,212 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+PCM_DTYPES = ("float32", "int16")
+
+
+def content_key(audio_bytes: bytes) -> str:
+    """Key a clip by the hash of its encoded bytes."""
+    return hashlib.sha256(audio_bytes).hexdigest()
+
+
+class PcmStore:
+    """Decoded PCM clips in memory-mapped segment files, indexed by content hash.
+
+    Clips are appended to fixed-size segment files and located through a sqlite
+    index, so every gunicorn worker and batch process on the host shares one
+    store. Reads return views straight into the mapped segment (zero-copy for
+    float32; int16 halves the disk footprint but is converted on read). When
+    the store grows past max_bytes, the least recently read segment is deleted
+    as a whole.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 4 * 1024 ** 3, segment_bytes: int = 256 * 1024 ** 2,
+                 dtype: str = "float32", sample_rate: int = 16000):
+        if dtype not in PCM_DTYPES:
+            raise ValueError(f"Unknown PCM dtype: {dtype}. Must be one of: {', '.join(PCM_DTYPES)}")
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.dtype = np.dtype(dtype)
+        self.sample_rate = sample_rate
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._maps = {}
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._check_format()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process; sqlite connections must not cross a fork.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.path, "index.sqlite"), timeout=10.0,
+                                   check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS segments (id INTEGER PRIMARY KEY, size INTEGER NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS clips ("
+                "key TEXT PRIMARY KEY, segment INTEGER NOT NULL, offset INTEGER NOT NULL, "
+                "samples INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS clips_segment ON clips (segment)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _check_format(self):
+        expected = {"dtype": self.dtype.name, "sample_rate": str(self.sample_rate)}
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for name, value in expected.items():
+                    conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES (?, ?)", (name, value))
+                stored = dict(conn.execute("SELECT name, value FROM meta").fetchall())
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        if any(stored.get(name) != value for name, value in expected.items()):
+            raise ValueError(f"PCM store at {self.path} holds {stored}, expected {expected}")
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, f"segment-{segment:06d}.pcm")
+
+    def _view(self, segment: int, offset: int, nbytes: int):
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < offset + nbytes:
+            # The segment grew since it was mapped (or was never mapped here).
+            with open(self._segment_path(segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self._maps) > 2 * (self.max_bytes // self.segment_bytes + 1):
+                # Drop mappings of evicted segments; live views keep theirs open.
+                self._maps.clear()
+            self._maps[segment] = mapped
+        return mapped
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._connection().execute("SELECT 1 FROM clips WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Return the clip as float32 samples at sample_rate, or None if it is not stored.
+
+        float32 clips are read-only views into the mapped segment file.
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT segment, offset, samples FROM clips WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            segment, offset, samples = row
+            try:
+                mapped = self._view(segment, offset, samples * self.dtype.itemsize)
+            except FileNotFoundError:
+                # Evicted by another process since the lookup.
+                self.misses += 1
+                return None
+            conn.execute("UPDATE clips SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+
+        audio_data = np.frombuffer(mapped, dtype=self.dtype, count=samples, offset=offset)
+        if self.dtype == np.int16:
+            return audio_data.astype(np.float32) / (1 << 15)
+        return audio_data
+
+    def put(self, key: str, audio_data: np.ndarray) -> bool:
+        """Store a decoded clip; returns False if it is larger than a segment."""
+        if self.dtype == np.int16:
+            audio_data = (np.clip(audio_data, -1.0, 1.0 - 1.0 / (1 << 15)) * (1 << 15)).astype(np.int16)
+        payload = np.ascontiguousarray(audio_data, dtype=self.dtype).tobytes()
+        if len(payload) > self.segment_bytes:
+            return False
+
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            # The write transaction also serializes appends across processes.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM clips WHERE key = ?", (key,)).fetchone() is not None:
+                    conn.execute("COMMIT")
+                    return True
+
+                current = conn.execute("SELECT id, size FROM segments ORDER BY id DESC LIMIT 1").fetchone()
+                if current is None or current[1] + len(payload) > self.segment_bytes:
+                    segment, offset = (current[0] + 1 if current else 0), 0
+                    conn.execute("INSERT INTO segments (id, size) VALUES (?, 0)", (segment,))
+                else:
+                    segment, offset = current
+
+                # Bytes past the recorded size are from an aborted write and get overwritten.
+                segment_path = self._segment_path(segment)
+                with open(segment_path, "r+b" if os.path.exists(segment_path) else "wb") as f:
+                    f.seek(offset)
+                    f.write(payload)
+
+                conn.execute("UPDATE segments SET size = ? WHERE id = ?", (offset + len(payload), segment))
+                conn.execute(
+                    "INSERT INTO clips (key, segment, offset, samples, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, segment, offset, len(audio_data), now),
+                )
+                evicted = self._evict(conn, segment)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        for old_segment in evicted:
+            self._maps.pop(old_segment, None)
+            try:
+                os.remove(self._segment_path(old_segment))
+            except OSError:
+                # Already removed by another process (or still mapped, on Windows).
+                pass
+        return True
+
+    def _evict(self, conn: sqlite3.Connection, current_segment: int) -> list:
+        """Drop least recently read segments (never the one being written) until under max_bytes."""
+        evicted = []
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = conn.execute(
+                "SELECT segments.id, segments.size FROM segments LEFT JOIN clips ON clips.segment = segments.id "
+                "WHERE segments.id != ? GROUP BY segments.id ORDER BY COALESCE(MAX(clips.last_access), 0) LIMIT 1",
+                (current_segment,),
+            ).fetchone()
+            if oldest is None:
+                break
+            conn.execute("DELETE FROM clips WHERE segment = ?", (oldest[0],))
+            conn.execute("DELETE FROM segments WHERE id = ?", (oldest[0],))
+            evicted.append(oldest[0])
+            total -= oldest[1]
+        return evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connection()
+            entries = conn.execute("SELECT COUNT(*) FROM clips").fetchone()[0]
+            segments, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM segments").fetchone()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+                "segments": segments,
+                "bytes": total,
+            }
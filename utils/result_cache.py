@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(audio_bytes: bytes, language: str, fingerprint: str = "") -> str:
+    """Content-addressed key for a decoded clip and its language.
+
+    ``fingerprint`` (see config_fingerprint) ties the key to the model and
+    settings that produced the verdict, so a shared cache never serves
+    results computed under a previous configuration.
+    """
+    digest = hashlib.sha256()
+    digest.update(fingerprint.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(language.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(audio_bytes)
+    return digest.hexdigest()
+
+
+def file_version(path: str | None) -> str:
+    """Size and modification time of a model artifact ("missing" if absent)."""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return "missing"
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def config_fingerprint(settings: dict) -> str:
+    """Short, stable hash of the settings that affect a verdict."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """In-process LRU cache of detection results with TTL and memory bound."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[2])
+
+    def set(self, key: str, value: dict):
+        size = len(key) + len(json.dumps(value))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + self.ttl_seconds, size, dict(value))
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        _expires_at, size, _value = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+class SqliteResultCache:
+    """Result cache in a sqlite file, shared by every gunicorn worker on the host.
+
+    Same interface as ResultCache. Hit/miss counters are per process.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024, ttl_seconds: float = 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process; sqlite connections must not cross a fork.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value FROM results WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        payload = json.dumps(value)
+        size = len(key) + len(payload)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM results WHERE expires_at < ?", (now,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, size, now + self.ttl_seconds, now),
+                )
+                count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+                while count > self.max_entries or total > self.max_bytes:
+                    oldest = conn.execute(
+                        "SELECT key, size FROM results ORDER BY last_access LIMIT 1"
+                    ).fetchone()
+                    conn.execute("DELETE FROM results WHERE key = ?", (oldest[0],))
+                    count -= 1
+                    total -= oldest[1]
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            return {
+                "backend": self.backend,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": count,
+                "bytes": total,
+            }
+
+
+def create_result_cache(path: str = "", **kwargs):
+    """Build a sqlite-backed cache when ``path`` is set, otherwise an in-memory one."""
+    if path:
+        return SqliteResultCache(path, **kwargs)
+    return ResultCache(**kwargs)
@@ -0,0 +1,185 @@
+import contextlib
+import os
+import threading
+
+from utils.metrics import REGISTRY, Gauge
+
+AFFINITY_MODES = ("none", "auto")
+
+ACTIVE_FORWARDS = REGISTRY.register(Gauge(
+    "voice_detection_forward_passes_active",
+    "Model forward passes currently running in this process"
+))
+WAITING_FORWARDS = REGISTRY.register(Gauge(
+    "voice_detection_forward_passes_waiting",
+    "Forward passes waiting for a slot under MAX_CONCURRENT_FORWARDS"
+))
+
+# Process-wide runtime state, set by configure() and read by the models.
+_settings = {"inference_mode": True}
+_forward_slots = None
+
+
+def parse_cpu_list(spec: str) -> list:
+    """Parse a Linux-style CPU list such as "0-3,8,10-11"."""
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                first, last = part.split("-", 1)
+                cpus.update(range(int(first), int(last) + 1))
+            else:
+                cpus.add(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid CPU list: {spec}")
+    return sorted(cpus)
+
+
+def available_cpus() -> list:
+    """CPUs this process may run on (respects cgroup/taskset restrictions where visible)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def worker_cpus(affinity: str, worker_index: int = 0, workers: int = 1, cpus: list | None = None) -> list | None:
+    """CPUs a worker should be pinned to, or None to leave the affinity alone.
+
+    Args:
+        affinity: "none", "auto" (split the available CPUs into ``workers``
+            contiguous, equal slices) or an explicit CPU list shared by every
+            worker ("0-7"), optionally one list per worker separated by ";"
+            ("0-3;4-7")
+        worker_index: slot of this worker, 0 <= worker_index < workers
+        workers: number of worker processes sharing the machine
+        cpus: CPUs to split (defaults to available_cpus())
+    """
+    if affinity == "none":
+        return None
+
+    if affinity == "auto":
+        cpus = cpus if cpus is not None else available_cpus()
+        share = max(1, len(cpus) // max(1, workers))
+        start = (worker_index * share) % len(cpus)
+        return cpus[start:start + share]
+
+    per_worker = [spec for spec in affinity.split(";") if spec.strip()]
+    return parse_cpu_list(per_worker[worker_index % len(per_worker)])
+
+
+def auto_intra_op_threads(worker_cpu_count: int, max_concurrent_forwards: int) -> int:
+    """Threads per forward pass so concurrent passes together fill the worker's CPUs, no more."""
+    return max(1, worker_cpu_count // max(1, max_concurrent_forwards))
+
+
+def configure(intra_op_threads: int = 0, interop_threads: int = 1, cpus: list | None = None,
+              max_concurrent_forwards: int = 0, inference_mode: bool = True, workers: int = 1) -> dict:
+    """Apply thread counts, CPU affinity and the forward-pass guard to this process.
+
+    Call once per worker process, after forking and before the first forward
+    pass (torch cannot change its inter-op pool once it has been used).
+
+    Args:
+        intra_op_threads: torch threads per forward pass; 0 sizes them from
+            the worker's CPUs and max_concurrent_forwards
+        interop_threads: torch inter-op threads; 0 leaves torch's default
+        cpus: pin the process to these CPUs (None = leave affinity alone)
+        max_concurrent_forwards: forward passes allowed at once; 0 = unlimited
+        inference_mode: use torch.inference_mode() instead of no_grad()
+        workers: worker processes sharing the machine, used to size
+            intra_op_threads when the process is not pinned
+
+    Returns:
+        The settings actually applied, for logging
+    """
+    global _forward_slots
+
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    cpu_count = len(cpus) if cpus else max(1, len(available_cpus()) // max(1, workers))
+    if intra_op_threads <= 0:
+        intra_op_threads = auto_intra_op_threads(cpu_count, max_concurrent_forwards)
+
+    _settings["inference_mode"] = inference_mode
+    _forward_slots = threading.BoundedSemaphore(max_concurrent_forwards) if max_concurrent_forwards > 0 else None
+
+    applied = {
+        "cpus": cpus,
+        "intra_op_threads": intra_op_threads,
+        "interop_threads": interop_threads or None,
+        "max_concurrent_forwards": max_concurrent_forwards,
+        "inference_mode": inference_mode,
+    }
+
+    try:
+        import torch
+    except ImportError:
+        return applied
+
+    torch.set_num_threads(intra_op_threads)
+    if interop_threads > 0:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            # Raised once any inter-op parallel work has run in this process
+            print(f"Could not set torch inter-op threads: {str(e)}")
+            applied["interop_threads"] = torch.get_num_interop_threads()
+    return applied
+
+
+def configure_worker(config, worker_index: int = 0, workers: int = 1) -> dict:
+    """configure() from Config: TORCH_*_THREADS, CPU_AFFINITY, MAX_CONCURRENT_FORWARDS and INFERENCE_MODE."""
+    if config.CPU_AFFINITY not in AFFINITY_MODES and not config.CPU_AFFINITY[:1].isdigit():
+        raise ValueError(
+            f"Unknown CPU_AFFINITY: {config.CPU_AFFINITY}. Must be one of: {', '.join(AFFINITY_MODES)} or a CPU list"
+        )
+
+    applied = configure(
+        intra_op_threads=config.TORCH_INTRA_OP_THREADS,
+        interop_threads=config.TORCH_INTEROP_THREADS,
+        cpus=worker_cpus(config.CPU_AFFINITY, worker_index, workers),
+        max_concurrent_forwards=config.MAX_CONCURRENT_FORWARDS,
+        inference_mode=config.INFERENCE_MODE,
+        workers=workers
+    )
+    print(f"Runtime for worker {worker_index}/{workers} (pid {os.getpid()}): {applied}")
+    return applied
+
+
+@contextlib.contextmanager
+def forward_pass():
+    """Wrap one model forward pass: waits for a slot, then disables autograd.
+
+    Every torch forward in the service (classifier and WavLM) runs inside
+    this, so MAX_CONCURRENT_FORWARDS bounds them all together.
+    """
+    slots = _forward_slots
+    if slots is not None:
+        WAITING_FORWARDS.inc()
+        try:
+            slots.acquire()
+        finally:
+            WAITING_FORWARDS.dec()
+
+    ACTIVE_FORWARDS.inc()
+    try:
+        try:
+            import torch
+        except ImportError:
+            torch = None
+
+        if torch is None:
+            yield
+        elif _settings["inference_mode"]:
+            with torch.inference_mode():
+                yield
+        else:
+            with torch.no_grad():
+                yield
+    finally:
+        ACTIVE_FORWARDS.dec()
+        if slots is not None:
+            slots.release()
@@ -0,0 +1,57 @@
+import os
+import time
+from contextlib import contextmanager
+
+from utils.metrics import REGISTRY, Gauge
+
+STARTUP_PHASE_SECONDS = REGISTRY.register(Gauge(
+    "voice_detection_startup_phase_seconds",
+    "Time spent in each startup phase",
+    ["phase"],
+))
+
+# Fallback origin when the process start time cannot be read from /proc.
+IMPORTED_AT = time.perf_counter()
+
+
+def process_age(pid: int | None = None) -> float:
+    """Seconds since process ``pid`` (default: this one) started (Linux), else since this module was imported."""
+    try:
+        with open(f"/proc/{pid or 'self'}/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.perf_counter() - IMPORTED_AT
+
+
+class StartupTracker:
+    """Times the start-up phases and tracks when the process is ready to serve.
+
+    time_to_ready counts from the start of the process that created the
+    tracker. When gunicorn preloads the app that is the master, so a forked
+    worker reports the time since the master started rather than since its
+    own fork (a replacement worker therefore reports the master's age).
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.ready = False
+        self.pid = os.getpid()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.phases[name] = round(seconds, 3)
+            STARTUP_PHASE_SECONDS.set(seconds, phase=name)
+
+    def mark_ready(self):
+        seconds = process_age(self.pid)
+        self.phases["time_to_ready"] = round(seconds, 3)
+        STARTUP_PHASE_SECONDS.set(seconds, phase="time_to_ready")
+        self.ready = True
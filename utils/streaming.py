@@ -0,0 +1,256 @@
+import subprocess
+import threading
+from collections import deque
+
+import numpy as np
+
+from utils.audio_processor import pcm16_to_float32, resolve_ffmpeg
+from utils.metrics import REGISTRY, Counter, Gauge
+
+STREAM_FORMATS = ("pcm_s16le", "pcm_f32le", "mp3")
+
+ACTIVE_STREAMS = REGISTRY.register(Gauge(
+    "voice_detection_active_streams",
+    "Live audio streams currently open"
+))
+STREAM_WINDOWS = REGISTRY.register(Counter(
+    "voice_detection_stream_windows_total",
+    "Rolling windows scored across all live streams"
+))
+
+
+class RingBuffer:
+    """Fixed-capacity float32 buffer keeping the most recent samples of a stream."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self.total = 0  # samples written since the stream started
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def write(self, samples: np.ndarray):
+        count = len(samples)
+        tail = samples[-self.capacity:]
+        start = (self.total + count - len(tail)) % self.capacity
+        first = min(len(tail), self.capacity - start)
+        self._data[start:start + first] = tail[:first]
+        self._data[:len(tail) - first] = tail[first:]
+        self.total += count
+
+    def latest(self, count: int) -> np.ndarray:
+        """Copy of the last ``count`` samples (fewer if not yet written), oldest first."""
+        count = min(count, len(self))
+        end = self.total % self.capacity
+        start = (end - count) % self.capacity
+        if count == 0 or start < end:
+            return self._data[start:end].copy()
+        return np.concatenate([self._data[start:], self._data[:end]])
+
+
+class PcmDecoder:
+    """Little-endian mono PCM frames to float32 at target_sr.
+
+    Frames may split samples anywhere; the odd bytes are carried to the next
+    chunk. Other sample rates go through a streaming soxr resampler, so chunk
+    boundaries leave no artifacts.
+    """
+
+    def __init__(self, sample_format: str, sample_rate: int, target_sr: int):
+        self.dtype = np.dtype("<i2" if sample_format == "pcm_s16le" else "<f4")
+        self._pending = b""
+        self._resampler = None
+        if sample_rate != target_sr:
+            import soxr
+
+            self._resampler = soxr.ResampleStream(sample_rate, target_sr, 1, dtype="float32")
+
+    def feed(self, data: bytes) -> np.ndarray:
+        data = self._pending + data if self._pending else data
+        usable = len(data) - len(data) % self.dtype.itemsize
+        self._pending = data[usable:]
+
+        if self.dtype.kind == "i":
+            samples = pcm16_to_float32(memoryview(data)[:usable])
+        else:
+            # Read-only view of the frame; the ring buffer write is the copy
+            samples = np.frombuffer(data, dtype=self.dtype, count=usable // self.dtype.itemsize)
+            samples = samples.astype(np.float32, copy=False)
+        if self._resampler is not None:
+            samples = self._resampler.resample_chunk(samples)
+        return samples
+
+    def close(self) -> np.ndarray:
+        if self._resampler is None:
+            return np.zeros(0, dtype=np.float32)
+        return self._resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+
+class Mp3Decoder:
+    """Incremental MP3 decoding through one ffmpeg process per stream.
+
+    MP3 bytes are piped to ffmpeg's stdin as they arrive; a reader thread
+    collects the 16-bit PCM it emits, which feed() returns on the next call.
+    """
+
+    def __init__(self, target_sr: int):
+        ffmpeg_path, _ = resolve_ffmpeg()
+        if not ffmpeg_path:
+            raise ValueError("MP3 streaming requires ffmpeg on the server; send pcm_s16le frames instead")
+
+        self._process = subprocess.Popen(
+            [
+                ffmpeg_path, "-hide_banner", "-loglevel", "error",
+                "-probesize", "32", "-analyzeduration", "0", "-fflags", "nobuffer",
+                "-f", "mp3", "-i", "pipe:0",
+                "-f", "s16le", "-ac", "1", "-ar", str(target_sr), "-flush_packets", "1", "pipe:1",
+            ],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        self._pcm = PcmDecoder("pcm_s16le", target_sr, target_sr)
+        self._chunks = []
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name="mp3-stream-reader", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while True:
+            data = self._process.stdout.read1(65536)
+            if not data:
+                return
+            with self._lock:
+                self._chunks.append(data)
+
+    def _drain(self) -> np.ndarray:
+        with self._lock:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+        return self._pcm.feed(data)
+
+    def feed(self, data: bytes) -> np.ndarray:
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            raise ValueError("MP3 decoder stopped: the stream is not valid MP3")
+        return self._drain()
+
+    def close(self) -> np.ndarray:
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._reader.join(timeout=10)
+        self.abort()
+        return self._drain()
+
+    def abort(self):
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+
+
+def create_decoder(sample_format: str, sample_rate: int, target_sr: int):
+    """Decoder for one stream; raises ValueError for unsupported formats."""
+    if sample_format not in STREAM_FORMATS:
+        raise ValueError(f"Unsupported stream format. Must be one of: {', '.join(STREAM_FORMATS)}")
+    if sample_format == "mp3":
+        return Mp3Decoder(target_sr)
+    if not 8000 <= sample_rate <= 192000:
+        raise ValueError("sample_rate must be between 8000 and 192000")
+    return PcmDecoder(sample_format, sample_rate, target_sr)
+
+
+class StreamSession:
+    """One live call: decoded into a ring buffer and scored on rolling windows.
+
+    feed() returns the latest window_seconds of audio once hop_seconds of new
+    audio have arrived (windows that fell behind are skipped, not queued), the
+    caller scores it, and record() folds the prediction into the verdict: the
+    mean AI probability of the last ``history`` windows. Memory per stream is
+    the ring buffer plus that history, whatever the call length.
+    """
+
+    def __init__(self, sample_format: str, sample_rate: int, language: str, sr: int, window_seconds: float = 4.0,
+                 hop_seconds: float = 2.0, min_seconds: float = 1.0, history: int = 5):
+        if hop_seconds <= 0 or hop_seconds > window_seconds:
+            raise ValueError("Stream hop must be positive and no longer than the window")
+
+        self.decoder = create_decoder(sample_format, sample_rate, sr)
+        self.language = language
+        self.sr = sr
+        self.window = int(window_seconds * sr)
+        self.hop = int(hop_seconds * sr)
+        self.min_samples = int(min_seconds * sr)
+        self.ring = RingBuffer(self.window)
+        self.windows = 0
+
+        self._scored_at = 0
+        self._pending = None
+        self._scores = deque(maxlen=max(1, history))
+        self._closed = False
+        ACTIVE_STREAMS.inc()
+
+    def _take_window(self) -> np.ndarray:
+        self._pending = (max(self.ring.total - self.window, 0), self.ring.total)
+        self._scored_at = self.ring.total
+        return self.ring.latest(self.window)
+
+    def feed(self, data: bytes):
+        """Decode one chunk; returns a window to score when one is due, else None."""
+        self.ring.write(self.decoder.feed(data))
+        if self.ring.total < self.min_samples or self.ring.total - self._scored_at < self.hop:
+            return None
+        return self._take_window()
+
+    def finish(self):
+        """Flush the decoder; returns a last window if unscored audio remains, else None."""
+        self.ring.write(self.decoder.close())
+        if self.ring.total < self.min_samples or self.ring.total == self._scored_at:
+            return None
+        return self._take_window()
+
+    def record(self, classification: str, confidence: float, status: str = "partial") -> dict:
+        """Add the prediction for the last window and return the updated verdict."""
+        ai_probability = confidence if classification == "AI_GENERATED" else 1.0 - confidence
+        self._scores.append(ai_probability)
+        self.windows += 1
+        STREAM_WINDOWS.inc()
+
+        start, end = self._pending
+        return self.verdict(status, window={
+            "start": round(start / self.sr, 2),
+            "end": round(end / self.sr, 2),
+            "aiProbability": round(float(ai_probability), 4)
+        })
+
+    def verdict(self, status: str, window: dict | None = None) -> dict:
+        if not self._scores:
+            raise ValueError(
+                f"Stream too short: {self.ring.total / self.sr:.2f}s (minimum {self.min_samples / self.sr}s)"
+            )
+
+        ai_probability = sum(self._scores) / len(self._scores)
+        classification = "AI_GENERATED" if ai_probability >= 0.5 else "HUMAN"
+        confidence = ai_probability if classification == "AI_GENERATED" else 1.0 - ai_probability
+        update = {
+            "status": status,
+            "language": self.language,
+            "classification": classification,
+            "confidenceScore": round(float(confidence), 2),
+            "seconds": round(self.ring.total / self.sr, 2),
+            "windows": self.windows
+        }
+        if window is not None:
+            update["window"] = window
+        return update
+
+    def close(self):
+        """Release the decoder; safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        ACTIVE_STREAMS.dec()
+        if isinstance(self.decoder, Mp3Decoder):
+            self.decoder.abort()
@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def frame_energy_db(audio_data: np.ndarray, frame_length: int) -> np.ndarray:
+    """Mean power of consecutive non-overlapping frames in dBFS (last partial frame included).
+
+    Full frames are a reshaped view of the clip, so no padded copy is made.
+    """
+    full = len(audio_data) // frame_length
+    frames = audio_data[:full * frame_length].reshape(full, frame_length)
+    power = np.einsum("ij,ij->i", frames, frames) / frame_length
+    tail = audio_data[full * frame_length:]
+    if len(tail):
+        power = np.append(power, np.dot(tail, tail) / frame_length)
+    return 10.0 * np.log10(power + 1e-10)
+
+
+def speech_mask(audio_data: np.ndarray, sr: int, frame_ms: float = 30.0,
+                threshold_db: float = -50.0, range_db: float = 35.0,
+                padding_ms: float = 200.0) -> tuple:
+    """Energy-based voice activity detection.
+
+    A frame is speech when it is louder than threshold_db and within range_db
+    of the loudest frame, so quiet stretches relative to the clip are dropped
+    however loud the recording is overall. Speech frames are then padded by
+    padding_ms on each side to keep onsets, offsets and short pauses.
+
+    Returns:
+        Tuple of (boolean mask per frame, frame length in samples)
+    """
+    frame_length = max(1, int(sr * frame_ms / 1000))
+    energy_db = frame_energy_db(audio_data, frame_length)
+    if energy_db.size == 0:
+        return np.zeros(0, dtype=bool), frame_length
+
+    mask = energy_db > max(threshold_db, float(energy_db.max()) - range_db)
+
+    pad = int(round(padding_ms / frame_ms))
+    if pad > 0 and mask.any():
+        mask = np.convolve(mask, np.ones(2 * pad + 1, dtype=np.int32), mode="same") > 0
+    return mask, frame_length
+
+
+def speech_regions(audio_data: np.ndarray, sr: int, **kwargs) -> list:
+    """Speech regions as (start, end) sample offsets; kwargs go to speech_mask."""
+    mask, frame_length = speech_mask(audio_data, sr, **kwargs)
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+    return [
+        (int(start * frame_length), int(min(end * frame_length, len(audio_data))))
+        for start, end in zip(edges[::2], edges[1::2])
+    ]
+
+
+def trim_silence(audio_data: np.ndarray, sr: int, min_speech_seconds: float = 1.0, **kwargs) -> tuple:
+    """Keep only the speech regions of a clip.
+
+    The clip is returned unchanged when less than min_speech_seconds of speech
+    is found, so near-silent clips are still scored as a whole.
+
+    Returns:
+        Tuple of (audio, speech_ratio) where speech_ratio is the fraction of
+        the original clip detected as speech
+    """
+    if len(audio_data) == 0:
+        return audio_data, 0.0
+
+    # Regions rather than a per-sample mask, so only the kept audio is copied
+    regions = speech_regions(audio_data, sr, **kwargs)
+    kept = sum(end - start for start, end in regions)
+    speech_ratio = kept / len(audio_data)
+
+    if kept == len(audio_data) or kept < min_speech_seconds * sr:
+        return audio_data, speech_ratio
+    return np.concatenate([audio_data[start:end] for start, end in regions]), speech_ratio
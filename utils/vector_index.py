@@ -0,0 +1,257 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int = 20, seed: int = 0, spherical: bool = False) -> np.ndarray:
+    """Lloyd's k-means in NumPy; spherical k-means (cosine) keeps centroids unit length."""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=len(data) < k)].copy()
+    for _ in range(iterations):
+        if spherical:
+            labels = (data @ centroids.T).argmax(axis=1)
+        else:
+            distances = (centroids ** 2).sum(axis=1) - 2.0 * (data @ centroids.T)
+            labels = distances.argmin(axis=1)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        counts = np.bincount(labels, minlength=k)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # Reseed empty clusters from random points
+        centroids[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+        if spherical:
+            centroids = _normalize(centroids)
+    return centroids
+
+
+def _grow(buffer: np.ndarray, used: int, extra: int) -> np.ndarray:
+    """``buffer`` with room for ``used + extra`` rows, at least doubling its capacity when full.
+
+    Inserts then copy each row a constant number of times on average instead
+    of re-concatenating the whole array on every add.
+    """
+    needed = used + extra
+    if needed <= len(buffer):
+        return buffer
+    grown = np.empty((max(needed, 2 * len(buffer), 64),) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:used] = buffer[:used]
+    return grown
+
+
+class VectorIndex:
+    """In-process nearest-neighbour index over unit-normalized vectors (cosine similarity).
+
+    With nlist=0 the search is exact (one matrix-vector product). With nlist>0
+    vectors are bucketed by a spherical k-means coarse quantizer (IVF) and a
+    query only scans the nprobe closest buckets. pq_m>0 additionally stores
+    each vector as pq_m one-byte product-quantization codes of its residual,
+    so memory drops from 4 * dim to pq_m bytes per vector and scores are
+    approximate. IVF/PQ are trained automatically once train_size vectors have
+    been added; until then the index searches exactly.
+
+    Every vector carries a key and a JSON-serializable payload.
+    """
+
+    def __init__(self, dim: int, nlist: int = 0, pq_m: int = 0, nprobe: int = 8, train_size: int | None = None):
+        if pq_m and dim % pq_m:
+            raise ValueError(f"pq_m ({pq_m}) must divide the vector dimension ({dim})")
+
+        self.dim = dim
+        self.nlist = max(nlist, 1) if pq_m else nlist
+        self.pq_m = pq_m
+        self.nprobe = nprobe
+        self.train_size = train_size or max(40 * self.nlist, 2560 if pq_m else 0)
+
+        self.keys = []
+        self.payloads = []
+        self.centroids = None   # (nlist, dim) once trained
+        self.codebooks = None   # (pq_m, 256, dim // pq_m) once trained with PQ
+
+        self._lock = threading.Lock()
+        # Row buffers with spare capacity; only the first len(self) rows are used
+        self._vectors = np.zeros((0, dim), dtype=np.float32)  # raw vectors (all, unless PQ-trained)
+        self._codes = np.zeros((0, pq_m), dtype=np.uint8)
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._lists = []
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, vectors: np.ndarray, keys: list, payloads: list | None = None):
+        """Insert vectors (n, dim) or a single vector with their keys and payloads."""
+        vectors = _normalize(np.asarray(vectors).reshape(-1, self.dim))
+        payloads = payloads if payloads is not None else [None] * len(vectors)
+        if not (len(vectors) == len(keys) == len(payloads)):
+            raise ValueError("vectors, keys and payloads must have the same length")
+
+        with self._lock:
+            start = len(self.keys)
+            end = start + len(vectors)
+            self.keys.extend(keys)
+            self.payloads.extend(payloads)
+
+            if not self.trained:
+                self._vectors = _grow(self._vectors, start, len(vectors))
+                self._vectors[start:end] = vectors
+                if self.nlist and end >= self.train_size:
+                    self._train()
+                return
+
+            assign, codes = self._encode(vectors)
+            self._assign = _grow(self._assign, start, len(vectors))
+            self._assign[start:end] = assign
+            if self.pq_m:
+                self._codes = _grow(self._codes, start, len(vectors))
+                self._codes[start:end] = codes
+            else:
+                self._vectors = _grow(self._vectors, start, len(vectors))
+                self._vectors[start:end] = vectors
+            for offset, bucket in enumerate(assign):
+                self._lists[bucket] = np.append(self._lists[bucket], start + offset)
+
+    def _train(self):
+        """Fit the coarse quantizer (and PQ codebooks) on the vectors added so far."""
+        data = self._vectors[:len(self.keys)]
+        # k-means gains nothing from more than a few hundred points per centroid
+        rng = np.random.default_rng(0)
+        sample = data[rng.choice(len(data), size=min(len(data), 256 * self.nlist), replace=False)]
+        self.centroids = _kmeans(sample, min(self.nlist, len(sample)), spherical=True)
+        if self.pq_m:
+            sample = sample[:256 * 256]
+            residuals = sample - self.centroids[(sample @ self.centroids.T).argmax(axis=1)]
+            sub_dim = self.dim // self.pq_m
+            self.codebooks = np.stack([
+                _kmeans(residuals[:, m * sub_dim:(m + 1) * sub_dim], 256, iterations=15, seed=m)
+                for m in range(self.pq_m)
+            ])
+
+        self._assign, codes = self._encode(data)
+        if self.pq_m:
+            self._codes = codes
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._rebuild_lists()
+
+    def _encode(self, vectors: np.ndarray) -> tuple:
+        assign = (vectors @ self.centroids.T).argmax(axis=1).astype(np.int32)
+        if not self.pq_m:
+            return assign, None
+
+        residuals = vectors - self.centroids[assign]
+        sub_dim = self.dim // self.pq_m
+        codes = np.empty((len(vectors), self.pq_m), dtype=np.uint8)
+        for m, codebook in enumerate(self.codebooks):
+            sub = residuals[:, m * sub_dim:(m + 1) * sub_dim]
+            codes[:, m] = ((codebook ** 2).sum(axis=1) - 2.0 * (sub @ codebook.T)).argmin(axis=1)
+        return assign, codes
+
+    def _rebuild_lists(self):
+        assign = self._assign[:len(self.keys)]
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self.centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+
+    def search(self, query: np.ndarray, k: int = 1) -> list:
+        """Return up to k (similarity, key, payload) tuples, most similar first."""
+        query = _normalize(np.asarray(query).reshape(self.dim))
+        with self._lock:
+            if not self.keys:
+                return []
+
+            if not self.trained:
+                ids = np.arange(len(self.keys))
+                scores = self._vectors[:len(self.keys)] @ query
+            else:
+                coarse = self.centroids @ query
+                probe = np.argsort(-coarse)[:self.nprobe]
+                ids = np.concatenate([self._lists[bucket] for bucket in probe])
+                if self.pq_m:
+                    # Inner product with a PQ residual is a sum of per-subspace lookups.
+                    sub_dim = self.dim // self.pq_m
+                    tables = np.einsum("mkd,md->mk", self.codebooks, query.reshape(self.pq_m, sub_dim))
+                    scores = coarse[self._assign[ids]] + tables[np.arange(self.pq_m), self._codes[ids]].sum(axis=1)
+                else:
+                    scores = self._vectors[ids] @ query
+
+            if len(ids) == 0:
+                return []
+            if k < len(ids):
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+            else:
+                top = np.argsort(-scores)
+            return [(float(scores[i]), self.keys[ids[i]], self.payloads[ids[i]]) for i in top]
+
+    def vectors(self) -> np.ndarray:
+        """Copy of the stored vectors (len, dim); approximate, decoded from their codes, once PQ-trained."""
+        with self._lock:
+            count = len(self.keys)
+            if not (self.trained and self.pq_m):
+                return self._vectors[:count].copy()
+            residuals = [codebook[self._codes[:count, m]] for m, codebook in enumerate(self.codebooks)]
+            return _normalize(self.centroids[self._assign[:count]] + np.concatenate(residuals, axis=1))
+
+    def merge(self, other: "VectorIndex") -> int:
+        """Add the entries of ``other`` whose keys this index lacks; returns how many were added."""
+        if other.dim != self.dim:
+            raise ValueError(f"Cannot merge a {other.dim}-dimensional index into a {self.dim}-dimensional one")
+
+        known = set(self.keys)
+        picked = [i for i, key in enumerate(other.keys) if key not in known]
+        if picked:
+            self.add(other.vectors()[picked], [other.keys[i] for i in picked], [other.payloads[i] for i in picked])
+        return len(picked)
+
+    def save(self, path: str):
+        """Write the index to one .npz file (atomically replaced)."""
+        with self._lock:
+            count = len(self.keys)
+            arrays = {
+                "config": np.array(json.dumps({
+                    "dim": self.dim, "nlist": self.nlist, "pq_m": self.pq_m,
+                    "nprobe": self.nprobe, "train_size": self.train_size,
+                })),
+                "keys": np.array(json.dumps(self.keys)),
+                "payloads": np.array(json.dumps(self.payloads)),
+                "vectors": self._vectors[:count],
+                "codes": self._codes[:count],
+                "assign": self._assign[:count],
+            }
+            if self.trained:
+                arrays["centroids"] = self.centroids
+            if self.codebooks is not None:
+                arrays["codebooks"] = self.codebooks
+
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = path + ".tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "VectorIndex":
+        with np.load(path) as data:
+            index = cls(**json.loads(str(data["config"])))
+            index.keys = json.loads(str(data["keys"]))
+            index.payloads = json.loads(str(data["payloads"]))
+            index._vectors = data["vectors"]
+            index._codes = data["codes"]
+            index._assign = data["assign"]
+            if "centroids" in data:
+                index.centroids = data["centroids"]
+                index._rebuild_lists()
+            if "codebooks" in data:
+                index.codebooks = data["codebooks"]
+        return index